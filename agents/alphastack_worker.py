@@ -5,16 +5,20 @@ Replaces mock data with live market analysis for BTAI, KSS, UP, TNXP
 """
 
 import os
+import sys
 import json
 import sqlite3
-import requests
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from data.providers.alpha_providers import daily_range
+
 class AlphaStackWorker:
     def __init__(self, db_path: str = "trading_dashboard.db"):
         self.db_path = db_path
@@ -56,9 +60,6 @@ class AlphaStackWorker:
                     print(f"✅ {symbol}: Score {candidate['score']} - {candidate['bucket']}")
                 else:
                     print(f"⚠️ {symbol}: Failed analysis or below threshold")
-                    
-                # Rate limiting
-                time.sleep(0.5)
                 
             except Exception as e:
                 print(f"❌ Error analyzing {symbol}: {e}")
@@ -136,14 +137,11 @@ class AlphaStackWorker:
             today = datetime.now().date()
             yesterday = today - timedelta(days=1)
             
-            url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{yesterday}/{today}"
-            params = {"apikey": self.polygon_api_key}
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            # Cached daily aggregates (only the current session is re-fetched)
+            results = daily_range(symbol, yesterday.isoformat(), today.isoformat())
             
-            if data.get("status") == "OK" and data.get("results"):
-                latest = data["results"][-1]
+            if results:
+                latest = results[-1]
                 
                 # Get volume data for comparison
                 volume_data = self.get_volume_context(symbol)
@@ -199,14 +197,10 @@ class AlphaStackWorker:
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=35)
             
-            url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}"
-            params = {"apikey": self.polygon_api_key}
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            results = daily_range(symbol, start_date.isoformat(), end_date.isoformat())
             
-            if data.get("status") == "OK" and data.get("results"):
-                volumes = [r["v"] for r in data["results"]]
+            if results:
+                volumes = [r["v"] for r in results]
                 avg_volume = sum(volumes) / len(volumes)
                 return {"avg_volume": avg_volume}
                 
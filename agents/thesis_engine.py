@@ -7,14 +7,19 @@ Implements learning loop with thesis events tracking
 import json
 import sqlite3
 import os
+import sys
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-import requests
 from dotenv import load_dotenv
 import yaml
 
 load_dotenv()
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from data.providers.alpha_providers import daily_range
+
 class ThesisEngine:
     def __init__(self, db_path: str = "trading_dashboard.db"):
         self.db_path = db_path
@@ -217,15 +222,11 @@ class ThesisEngine:
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=90)
         
-        url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}"
-        params = {"apikey": self.polygon_api_key}
-        
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
+            # Closed sessions are served from the local aggregate cache
+            results = daily_range(symbol, start_date.isoformat(), end_date.isoformat())
             
-            if data.get("status") == "OK" and data.get("results"):
-                results = data["results"]
+            if results:
                 return {
                     "90d_high": max(r["h"] for r in results),
                     "90d_low": min(r["l"] for r in results),
@@ -15,9 +15,70 @@ load_dotenv()
 
 # Global partial results for SIGTERM handler
 partial_results = []
+checkpoint = None  # CandidateCheckpoint of the running scan (None when not configured)
 json_out_path = None
+result_limit = None  # --limit of the running scan; a SIGTERM dump is cut to it
 heartbeat_path = None
 heartbeat_timer = None
+CHECKPOINT_FSYNC_EVERY = int(os.getenv("CHECKPOINT_FSYNC_EVERY", "50"))
+
+class CandidateCheckpoint:
+    """
+    Append-only NDJSON log of scored candidates, one line each, flushed per
+    line and fsync'd every `fsync_every` lines. A candidate updated later is
+    appended again; readers keep the last line per symbol.
+    """
+
+    def __init__(self, path, fsync_every=CHECKPOINT_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.lines = 0
+        self.f = open(path, "w")  # truncate: a checkpoint covers one run
+
+    def append(self, candidate):
+        self.f.write(json.dumps(candidate) + "\n")
+        self.f.flush()
+        self.lines += 1
+        if self.lines % self.fsync_every == 0:
+            os.fsync(self.f.fileno())
+
+    def sync(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        if not self.f.closed:
+            self.sync()
+            self.f.close()
+
+    def discard(self):
+        """Close and delete the file (the run completed; nothing to salvage)"""
+        if not self.f.closed:
+            self.f.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def read_checkpoint(path):
+    """Candidates from an NDJSON checkpoint, last line per symbol wins; a torn last line is skipped"""
+    out = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    c = json.loads(line)
+                except ValueError:
+                    continue
+                out[c.get("symbol")] = c
+    except OSError:
+        return []
+    return list(out.values())
+
+def rank_candidates(candidates, limit=None):
+    """The screener's final ordering: (score, price, symbol) descending, cut to `limit`"""
+    ranked = sorted(candidates, key=lambda x: (x.get("score") or 0, x.get("price") or 0, x.get("symbol") or ""), reverse=True)
+    return ranked if limit is None else ranked[:limit]
 
 def touch_heartbeat():
     """Write current timestamp to heartbeat file"""
@@ -45,8 +106,18 @@ def write_final_json(results):
     print(f"__JSON_START__{payload}__JSON_END__")
 
 def sigterm_handler(signum, frame):
-    """Handle SIGTERM by dumping partial results"""
+    """Handle SIGTERM by dumping partial results (read back from the checkpoint when there is one), ranked and limited"""
     global partial_results
+    if checkpoint is not None:
+        try:
+            checkpoint.sync()
+            partial_results = read_checkpoint(checkpoint.path)
+        except Exception:
+            pass
+    try:
+        partial_results = rank_candidates(partial_results, result_limit)
+    except Exception:
+        pass
     try:
         print(f"⚠️ Received SIGTERM, writing partial results ({len(partial_results)} items)", file=sys.stderr)
     except:
@@ -64,10 +135,10 @@ signal.signal(signal.SIGINT, sigterm_handler)
 ROOT = Path(__file__).resolve().parents[1]
 CONF = yaml.safe_load(open(ROOT / "config" / "alpha_scoring.yml"))
 UCFG = CONF.get("universe", {})
-FEAT_PATH = ROOT / "data" / "universe_features.parquet"
 
 sys.path.append(str(ROOT))
-from data.providers.alpha_providers import minute_bars, short_metrics
+from data.providers.alpha_providers import minute_bars, minute_bars_many, short_metrics
+from data.feature_store import load_universe_features
 
 # PR Catalyst Keywords for microcap ignition detection
 PR_KEYWORDS = ['fda','approval','clearance','fast track','breakthrough','partnership',
@@ -126,8 +197,17 @@ def detect_pr_catalyst(symbol):
     except Exception:
         return {"has_pr": False, "pr_tags": [], "pr_bonus": 0}
 
-def detect_premarket_spark(symbol, prev_close, current_price):
-    """Pre-market spark detector (gap ≥10% + relvol ≥1.5x = +8)"""
+def minute_volumes(symbol, batch=None):
+    """Minute volumes (oldest first) from a prefetched MinuteBarsBatch, else a single fetch"""
+    if batch is not None:
+        return batch.volumes(symbol)
+    mins = minute_bars(symbol)
+    if not mins:
+        return np.empty(0)
+    return pd.DataFrame(mins).rename(columns=str.lower, inplace=False)['v'].to_numpy(dtype=float)
+
+def detect_premarket_spark(symbol, prev_close, current_price, batch=None, relvol_pm=None):
+    """Pre-market spark detector (gap ≥10% + relvol ≥1.5x = +8); relvol_pm skips the minute read when known"""
     try:
         if not prev_close or not current_price:
             return {"has_spark": False, "gap_pct": 0, "relvol_pm": 0, "spark_bonus": 0}
@@ -135,19 +215,20 @@ def detect_premarket_spark(symbol, prev_close, current_price):
         gap_pct = ((current_price - prev_close) / prev_close) * 100
         
         # Get pre-market or early morning relative volume
-        relvol_pm = 0.0
-        try:
-            # TODO: Replace with actual pre-market volume calculation
-            # For now, stub implementation - real implementation would check pre-market data
-            mins = minute_bars(symbol)
-            if mins and len(mins) >= 5:
-                # Calculate early session relative volume (first 15-30 minutes)
-                dfm = pd.DataFrame(mins).rename(columns=str.lower, inplace=False)
-                early_volume = float(dfm['v'].head(15).sum())  # First 15 minutes
-                # Compare to typical 15-minute volume
-                relvol_pm = early_volume / (dfm['v'].mean() * 15) if dfm['v'].mean() > 0 else 0
-        except Exception:
-            pass
+        if relvol_pm is None:
+            relvol_pm = 0.0
+            try:
+                # TODO: Replace with actual pre-market volume calculation
+                # For now, stub implementation - real implementation would check pre-market data
+                vols = minute_volumes(symbol, batch)
+                if len(vols) >= 5:
+                    # Calculate early session relative volume (first 15-30 minutes)
+                    early_volume = float(vols[:15].sum())  # First 15 minutes
+                    # Compare to typical 15-minute volume
+                    mean_v = float(vols.mean())
+                    relvol_pm = early_volume / (mean_v * 15) if mean_v > 0 else 0
+            except Exception:
+                pass
         
         # Pre-market Spark condition: gap ≥10% AND relvol ≥1.5x
         has_spark = abs(gap_pct) >= 10.0 and relvol_pm >= 1.5
@@ -313,6 +394,330 @@ def detect_early_catalysts(row):
     
     return points
 
+def score_row(row, relvol=0.0, batch=None, ctx=None):
+    """Enhanced scoring with live tape validation (per-row reference for score_frame)"""
+    ctx = ctx if ctx is not None else ScanContext(batch=batch)
+    sym = row.get("symbol", "")
+    r5 = row.get("ret_5d")
+    r21 = row.get("ret_21d")
+
+    # Start with base score
+    score = 50
+
+    # Capped momentum points (max 25)
+    score += momentum_points(r5, r21)
+
+    # Volatility bonus
+    if (row.get("atr_pct") or 0) >= 0.03: 
+        score += 10
+    elif (row.get("atr_pct") or 0) >= 0.02: 
+        score += 5
+
+    # Volume confirmation (updated tiers)
+    if relvol >= 2.0: 
+        score += 15  # +15 @≥2.0x
+    elif relvol >= 1.7: 
+        score += 10  # +10 @1.7x
+    elif relvol >= 1.5: 
+        score += 4   # +4 @1.5x
+
+    # Dollar volume bonus
+    if (row.get("avg_dollar") or 0) >= 50_000_000: 
+        score += 8
+    elif (row.get("avg_dollar") or 0) >= 20_000_000: 
+        score += 5
+
+    # Breakout bonus
+    if bool(row.get("breakout20")): 
+        score += 12
+
+    # Early catalyst detection
+    score += detect_early_catalysts(row)
+
+    # Squeeze synergy (using mock data for now)
+    score += squeeze_synergy(
+        row.get("float"), 
+        row.get("short_interest_pct"), 
+        row.get("borrow_fee_pct")
+    )
+
+    # Days to cover bonus
+    score += days_to_cover_bonus(
+        row.get("short_shares"), 
+        row.get("adv")
+    )
+
+    # NEW BONUSES - AlphaStack Upgrade
+    
+    # PR Catalyst detection (+3 per hit, max +10)
+    catalyst_data = ctx.catalyst(sym)
+    score += catalyst_data["pr_bonus"]
+    
+    # Pre-market Spark (+8 for gap ≥10% + relvol ≥1.5x)
+    spark_data = ctx.spark(sym, row.get("prev_close"), row.get("price"))
+    score += spark_data["spark_bonus"]
+    
+    # Options/GEX nudge (+6 for rising OI, ±4 for gamma)
+    options_data = ctx.options(sym, row.get("price"))
+    score += options_data["nudgePoints"]
+    
+    # Drawdown & spread penalties (-8 for HOD, -3 to -5 for spread)
+    score += drawdown_and_spread_penalties(
+        row.get("hod_drawdown_pct"),
+        row.get("bid_ask_spread_pct")
+    )
+    
+    # Live-vs-cached drift guard (-8 for ≥10% drift)
+    drift_data = ctx.drift(sym, row.get("live_price"), row.get("price"))
+    score += drift_data["drift_penalty"]
+    
+    # Theme boost (+6 for ≥2 runners in sector)
+    theme_data = ctx.theme(sym, row.get("sector"))
+    score += theme_data["theme_bonus"]
+
+    # Live tape penalties (will be 0 for now since no live data yet)
+    score += live_penalties(
+        price=row.get("live_price"),
+        vwap=row.get("live_vwap"),
+        rsi=row.get("live_rsi", row.get("rsi_14")),  # daily RSI-14 until live tape lands
+        ema9_ge_ema20=row.get("ema9_ge_ema20"),
+        drawdown_from_hod=row.get("drawdown_from_hod")
+    )
+
+    # Live vs cached sanity check
+    score = live_vs_cached_sanity_check(
+        row.get("live_price"),
+        row.get("price"),  # cached price
+        score
+    )
+
+    return max(30, min(100, score))
+
+def _num(df, name):
+    """Column as float64 (None/non-numeric -> NaN); a missing column reads as all-NaN"""
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+def _truthy(df, name):
+    """bool(value) per row, as score_row's `if row.get(name)` sees it (NaN is truthy, None is not)"""
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    col = df[name]
+    if col.dtype == object:
+        return col.map(bool).to_numpy(dtype=bool)
+    return col.to_numpy(dtype=float) != 0
+
+def _ramp(x, lo, hi, max_pts):
+    return np.where(x <= lo, 0.0, np.where(x >= hi, max_pts, max_pts * (x - lo) / (hi - lo)))
+
+def minute_signals(symbols, adv, batch):
+    """
+    Per-symbol 30-minute relvol and early-session relvol (as score_row and
+    detect_premarket_spark derive them) from one read of each symbol's minute volumes
+    """
+    relvol = np.zeros(len(symbols))
+    relvol_pm = np.zeros(len(symbols))
+    for i, (sym, a) in enumerate(zip(symbols, adv)):
+        try:
+            vols = minute_volumes(sym, batch)
+        except Exception:
+            continue
+        if len(vols) < 5:
+            continue
+        avg_min = (a / (6.5 * 60)) if a > 0 else 0
+        relvol[i] = (float(vols[-30:].sum()) / (avg_min * 30)) if avg_min > 0 else 0.0
+        mean_v = float(vols.mean())
+        relvol_pm[i] = float(vols[:15].sum()) / (mean_v * 15) if mean_v > 0 else 0
+    return relvol, relvol_pm
+
+class ScanContext:
+    """
+    Per-scan enrichment: each symbol's minute relvols and its PR, spark,
+    options, drift and theme signals are computed once and then shared by
+    scoring, thesis generation and the extended JSON. Minute data comes from
+    the scan's MinuteBarsBatch; a new feature snapshot gets a new context.
+    Scored candidates (before short-interest enrichment) are kept too, so a
+    full-universe expansion only scores the names it adds.
+    """
+
+    def __init__(self, features_version="", batch=None):
+        self.features_version = features_version
+        self.batch = batch
+        self.rows = {}     # symbol -> feature row
+        self.scored = {}   # symbol -> candidate as scored, before enrichment
+        self._minute = {}  # symbol -> (relvol, relvol_pm)
+        self._memo = {}    # (signal, symbol) -> detector output
+
+    def _once(self, name, symbol, compute):
+        key = (name, symbol)
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def minute(self, symbols, adv, batch=None):
+        """(relvol, relvol_pm) arrays for symbols; each symbol's minute volumes are read once"""
+        adv = np.asarray(adv, dtype=float)
+        todo = [i for i, s in enumerate(symbols) if s not in self._minute]
+        if todo:
+            rv, pm = minute_signals([symbols[i] for i in todo], adv[todo], self.batch if batch is None else batch)
+            self._minute.update({symbols[i]: (float(a), float(b)) for i, a, b in zip(todo, rv, pm)})
+        pairs = np.array([self._minute[s] for s in symbols], dtype=float).reshape(len(symbols), 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def relvol(self, symbol):
+        return self._minute.get(symbol, (0.0, 0.0))[0]
+
+    def catalyst(self, symbol):
+        return self._once("catalyst", symbol, lambda: detect_pr_catalyst(symbol))
+
+    def spark(self, symbol, prev_close, price):
+        known = self._minute.get(symbol)
+        return self._once("spark", symbol, lambda: detect_premarket_spark(
+            symbol, prev_close, price, self.batch, known[1] if known else None))
+
+    def options(self, symbol, price):
+        return self._once("options", symbol, lambda: detect_options_gex_nudge(symbol, price))
+
+    def drift(self, symbol, live_price, price):
+        return self._once("drift", symbol, lambda: live_vs_cached_drift_guard(live_price, price))
+
+    def theme(self, symbol, sector):
+        # there is no recent-runner feed, so the herd check sees none
+        return self._once("theme", symbol, lambda: theme_boost_sector_herd(symbol, sector, []))
+
+    def short(self, symbol):
+        return self._once("short", symbol, lambda: short_metrics(symbol) or {})
+
+    def signals(self, row):
+        """All five enrichment signals of one feature row"""
+        sym = row.get("symbol", "")
+        return {
+            "catalyst": self.catalyst(sym),
+            "spark": self.spark(sym, row.get("prev_close"), row.get("price")),
+            "options": self.options(sym, row.get("price")),
+            "drift": self.drift(sym, row.get("live_price"), row.get("price")),
+            "theme": self.theme(sym, row.get("sector")),
+        }
+
+    def bonuses(self, records):
+        """score_frame's per-symbol bonus arrays for shortlist rows"""
+        sigs = [self.signals(r) for r in records]
+        return {
+            "pr_bonus": [g["catalyst"]["pr_bonus"] for g in sigs],
+            "options_nudge": [g["options"]["nudgePoints"] for g in sigs],
+            "theme_bonus": [g["theme"]["theme_bonus"] for g in sigs],
+        }
+
+def score_frame(df, relvol, relvol_pm=None, pr_bonus=None, options_nudge=None, theme_bonus=None):
+    """
+    Column-wise score_row for a whole shortlist: same terms, same order of
+    additions, NumPy arrays instead of per-row dicts. Signals that need a
+    per-symbol lookup (minute relvol, PR, options, theme) come in as arrays;
+    omitted ones count as 0, as their stubs currently score.
+    """
+    n = len(df)
+    zeros = np.zeros(n)
+    relvol = np.asarray(relvol, dtype=float)
+    relvol_pm = zeros if relvol_pm is None else np.asarray(relvol_pm, dtype=float)
+    r5, r21 = _num(df, "ret_5d"), _num(df, "ret_21d")
+    price, adv = _num(df, "price"), _num(df, "adv")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.full(n, 50.0)
+
+        # momentum_points: min(25, p5 + p21); a NaN total caps at 25 like min() does
+        p5 = np.where(_truthy(df, "ret_5d"), _ramp(r5 * 100, 2.0, 25.0, 10), 0.0)
+        p21 = np.where(_truthy(df, "ret_21d"), _ramp(r21 * 100, 8.0, 40.0, 15), 0.0)
+        mom = p5 + p21
+        score += np.where(mom < 25, mom, 25.0)
+
+        atr = _num(df, "atr_pct")
+        score += np.where(atr >= 0.03, 10, np.where(atr >= 0.02, 5, 0))
+        score += np.where(relvol >= 2.0, 15, np.where(relvol >= 1.7, 10, np.where(relvol >= 1.5, 4, 0)))
+        dollar = _num(df, "avg_dollar")
+        score += np.where(dollar >= 50_000_000, 8, np.where(dollar >= 20_000_000, 5, 0))
+        score += np.where(_truthy(df, "breakout20"), 12, 0)
+
+        # detect_early_catalysts
+        early = zeros.copy()
+        if "recent_news" in df.columns:
+            news = df["recent_news"].fillna("").astype(str).str.lower()
+            hit = np.zeros(n, dtype=bool)
+            for kw in ['FDA', 'approval', 'partnership', 'licensing',
+                       'contract', 'uplist', 'financing', 'acquisition']:
+                hit |= news.str.contains(kw.lower(), regex=False).to_numpy()
+            early += np.where(hit, 15, 0)
+        early += np.where((_num(df, "premarket_gap_pct") >= 10) & (_num(df, "relvol_pm") >= 1.5), 12, 0)
+        score += early
+
+        # squeeze_synergy
+        flt, si, fee = _num(df, "float"), _num(df, "short_interest_pct"), _num(df, "borrow_fee_pct")
+        score += (np.where(flt <= 20_000_000, 10, 0) + np.where(fee >= 50, 10, np.where(fee >= 30, 6, 0))
+                  + np.where((si >= 15) & (fee >= 30), 6, 0))
+
+        # days_to_cover_bonus
+        dtc = _num(df, "short_shares") / adv
+        dtc = np.where(adv > 0, dtc, np.nan)
+        score += np.where(dtc >= 4, 8, np.where(dtc >= 2, 4, 0))
+
+        score += zeros if pr_bonus is None else np.asarray(pr_bonus, dtype=float)
+
+        # detect_premarket_spark
+        prev_close = _num(df, "prev_close")
+        gap = (price - prev_close) / prev_close * 100
+        spark = (prev_close != 0) & (price != 0) & (np.abs(gap) >= 10.0) & (relvol_pm >= 1.5)
+        score += np.where(spark, 8, 0)
+
+        score += zeros if options_nudge is None else np.asarray(options_nudge, dtype=float)
+
+        # drawdown_and_spread_penalties
+        spread = _num(df, "bid_ask_spread_pct")
+        score += (np.where(_num(df, "hod_drawdown_pct") >= 20.0, -8, 0)
+                  + np.where(spread > 2.0, -5, np.where(spread > 1.2, -3, 0)))
+
+        # live_vs_cached_drift_guard
+        live_price = _num(df, "live_price")
+        quoted = (live_price != 0) & (price != 0)
+        drift = np.abs(live_price - price)
+        score += np.where(quoted & (drift / price * 100 >= 10.0), -8, 0)
+
+        score += zeros if theme_bonus is None else np.asarray(theme_bonus, dtype=float)
+
+        # live_penalties (daily RSI-14 stands in until live tape lands)
+        rsi = _num(df, "live_rsi") if "live_rsi" in df.columns else _num(df, "rsi_14")
+        score += (np.where(live_price < _num(df, "live_vwap"), -8, 0) + np.where(rsi > 75, -6, 0)
+                  + np.where(_num(df, "drawdown_from_hod") >= 0.20, -8, 0))
+
+        # live_vs_cached_sanity_check, then clamp to [30, 100] the way max(30, min(100, x)) does
+        stale = quoted & (drift / price >= 0.10)
+        cut = score - 8
+        score = np.where(stale, np.where(cut > 0, cut, 0), score)
+        score = np.where(score < 100, score, 100.0)
+        return np.where(score > 30, score, 30.0)
+
+def _finite(x, default):
+    """x unless it is missing or NaN (keeps the JSON output valid)"""
+    return default if x is None or x != x else x
+
+def indicator_fields(row, relvol):
+    """
+    The candidate's "indicators" block. float is free float (0 when unknown,
+    never shares outstanding); short_interest_pct is in percent as the short
+    store keeps it, so it is not scaled again.
+    """
+    return {
+        "relvol": round(max(relvol, 1.0), 1),
+        "vwap_position": "above" if row.get("live_price", row["price"]) > row.get("live_vwap", row["price"]) else "below",
+        "ema_9_20": "bullish" if row.get("ema9_ge_ema20") else "forming",
+        "rsi": _finite(row.get("live_rsi", row.get("rsi_14")), 50),
+        "atr_pct": row.get("atr_pct", 0) * 100,
+        "float": _finite(row.get("float", row.get("float_shares")), 0),
+        "short_interest_pct": _finite(row.get("short_interest_pct"), 0),
+        "borrow_fee_pct": (row.get("borrow_fee_pct", 0) or 0) * 100,
+        "sector": _finite(row.get("sector"), None) or "Unknown"
+    }
+
 def map_action(score):
     """Map score to action with updated tier thresholds"""
     if score >= 75: return "BUY"  # Updated from 85 to 75
@@ -335,9 +740,77 @@ def map_action_with_tape(score, live_price, live_vwap, ema9_ge_ema20):
     
     return base_action
 
+def relaxation_steps(adv_pct, dol_pct, atrp_pct, step):
+    """(adv%, $vol%, atr%) at each relaxation step, ending once every floor is reached"""
+    steps = [(adv_pct, dol_pct, atrp_pct)]
+    while not (adv_pct <= 10 and dol_pct <= 10 and atrp_pct <= 20):
+        nxt = (max(10, adv_pct - step), max(10, dol_pct - step), max(20, atrp_pct - step))
+        if nxt == steps[-1]:
+            break  # step <= 0 never reaches the floors
+        adv_pct, dol_pct, atrp_pct = nxt
+        steps.append(nxt)
+    return steps
+
+class RankNarrowing:
+    """
+    Adaptive narrowing solved in one pass over a feature snapshot. Thresholds
+    for every relaxation step come from one nanpercentile call per column
+    (memoized per percentile), each row gets the first step at which it clears
+    all three, and survivor counts per step are then a cumulative histogram.
+    Picks the same step, thresholds and survivors as relaxing one step at a time.
+    """
+    COLUMNS = {"adv": "adv", "dol": "avg_dollar", "atr": "atr_pct"}
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.values = {k: np.asarray(df[c].to_numpy(), dtype=float) for k, c in self.COLUMNS.items()}
+        self.hot = ((df["ret_5d"] >= 0.10) | (df["breakout20"] == True)).to_numpy(dtype=bool)
+        self._thr = {k: {} for k in self.COLUMNS}
+
+    def thresholds(self, key, pcts):
+        """Percentile thresholds of one column, one per entry of pcts"""
+        memo, a = self._thr[key], self.values[key]
+        todo = sorted({p for p in pcts if p not in memo})
+        if todo and len(a):
+            memo.update(zip(todo, np.nanpercentile(a, todo).tolist()))
+        elif todo:
+            memo.update(dict.fromkeys(todo, np.nan))
+        return np.array([memo[p] for p in pcts], dtype=float)
+
+    def _clears(self, key, pcts):
+        """(first step each row clears, or None) plus the per-step pass matrix when thresholds are not monotone"""
+        v, thr = self.values[key], self.thresholds(key, pcts)
+        if np.isnan(thr).any():  # empty or all-NaN column: nothing clears
+            return np.full(len(v), len(thr)), None
+        if np.all(np.diff(thr) <= 0):
+            return np.searchsorted(-thr, -v, side="left"), None  # NaN values never clear
+        return None, v[:, None] >= thr[None, :]
+
+    def solve(self, adv_pct, dol_pct, atrp_pct, step, min_keep):
+        """(survivors in snapshot order, final (adv%, $vol%, atr%))"""
+        steps = relaxation_steps(adv_pct, dol_pct, atrp_pct, step)
+        n_steps = len(steps)
+        cleared = [self._clears(k, [s[i] for s in steps]) for i, k in enumerate(self.COLUMNS)]
+        if all(m is None for _, m in cleared):
+            first = np.maximum.reduce([f for f, _ in cleared])
+            first[self.hot] = 0
+            counts = np.cumsum(np.bincount(np.minimum(first, n_steps), minlength=n_steps + 1))[:n_steps]
+            k = int(np.argmax(counts >= min_keep)) if (counts >= min_keep).any() else n_steps - 1
+            keep = first <= k
+        else:  # a start below its floor makes that column's thresholds rise once; check every step
+            ok = self.hot[:, None]
+            ok = ok | np.logical_and.reduce([m if m is not None else f[:, None] <= np.arange(n_steps)
+                                             for f, m in cleared])
+            counts = ok.sum(axis=0)
+            k = int(np.argmax(counts >= min_keep)) if (counts >= min_keep).any() else n_steps - 1
+            keep = ok[:, k]
+        return self.df[keep], steps[k]
+
 class UniverseScreener:
     def __init__(self):
         self.polygon_api_key = os.getenv("POLYGON_API_KEY")
+        self.features_version = ""  # feature snapshot id of the last load
+        self._narrowing = None  # ((version, excludes), RankNarrowing) of the last load
         
         # Use config-driven defaults - EXPANDED to include penny stocks
         astrat = CONF.get('prefilter_strategy', {})
@@ -359,9 +832,9 @@ class UniverseScreener:
         exclude_list = [s.strip().upper() for s in exclude_symbols.split(',') if s.strip()] if exclude_symbols else []
         
         # Load cached features (no network here)
-        if FEAT_PATH.exists():
-            print("📦 Loading cached universe features (parquet)...", file=sys.stderr)
-            rows_df = pd.read_parquet(FEAT_PATH)
+        rows_df, self.features_version = load_universe_features()
+        if rows_df is not None:
+            print(f"📦 Loaded cached universe features (snapshot {self.features_version})", file=sys.stderr)
         else:
             print("❗ No cached features. Run: npm run universe:build2", file=sys.stderr)
             rows_df = pd.DataFrame(columns=["symbol","price","adv","avg_dollar","atr_pct","ret_5d","ret_21d","breakout20"])
@@ -371,12 +844,11 @@ class UniverseScreener:
             
         print(f"📊 Loaded features for {len(rows_df)} symbols (excluding {len(exclude_list)} holdings)", file=sys.stderr)
 
-        # Check for full universe mode activation
-        full_config = CONF.get("full_universe_mode", {})
-        if not full_universe_mode and full_config.get("enabled", False):
-            # Will check later if we need to activate full universe mode
-            pass
+        ctx = ScanContext(self.features_version)
+        return self._screen(rows_df, exclude_list, ctx, limit, full_universe_mode)
 
+    def _screen(self, rows_df, exclude_list, ctx, limit, full_universe_mode):
+        """Narrow, score and rank loaded features; names already scored in ctx are reused"""
         # Adaptive narrowing (deterministic) - NO random, keep enough names
         astrat = CONF.get("prefilter_strategy", {})
         full_config = CONF.get("full_universe_mode", {})
@@ -398,26 +870,12 @@ class UniverseScreener:
             shortlist_target = astrat.get("target_keep", 200)
             shortlist_min    = astrat.get("min_keep", 120)
 
-        def pct(a, p): 
-            a = np.array(a, dtype=float)
-            return float(np.nanpercentile(a, p)) if len(a) else np.nan
-
-        advs = rows_df["adv"].to_numpy()
-        dols = rows_df["avg_dollar"].to_numpy()
-        atrs = rows_df["atr_pct"].to_numpy()
-
-        while True:
-            a_thr = pct(advs, adv_pct)
-            d_thr = pct(dols, dol_pct)
-            t_thr = pct(atrs, atrp_pct)
-            base = rows_df[(rows_df["adv"]>=a_thr) & (rows_df["avg_dollar"]>=d_thr) & (rows_df["atr_pct"]>=t_thr)]
-            hot  = rows_df[(rows_df["ret_5d"]>=0.10) | (rows_df["breakout20"]==True)]
-            survivors_df = pd.concat([base, hot]).drop_duplicates(subset=["symbol"])
-            if len(survivors_df) >= shortlist_min or (adv_pct<=10 and dol_pct<=10 and atrp_pct<=20):
-                break
-            adv_pct   = max(10, adv_pct - step)
-            dol_pct   = max(10, dol_pct - step)
-            atrp_pct  = max(20, atrp_pct - step)
+        # Percentile thresholds are memoized per snapshot; the relaxation is solved in one pass
+        key = (self.features_version, tuple(exclude_list))
+        if self._narrowing is None or self._narrowing[0] != key:
+            self._narrowing = (key, RankNarrowing(rows_df))
+        survivors_df, (adv_pct, dol_pct, atrp_pct) = self._narrowing[1].solve(
+            adv_pct, dol_pct, atrp_pct, step, shortlist_min)
 
         # Deterministic ranking; symbol as tie-breaker for stable order
         survivors_df = survivors_df.sort_values(
@@ -426,123 +884,29 @@ class UniverseScreener:
         symbols = survivors_df["symbol"].tolist()[:shortlist_target]
         print(f"🎯 Shortlist {len(symbols)} of {len(survivors_df)} (target {shortlist_target}); thresholds → adv%={adv_pct}, $vol%={dol_pct}, atr%={atrp_pct}", file=sys.stderr)
 
+        shortlist_df = survivors_df.iloc[:shortlist_target]
+
         # Final fallback if somehow empty
         if not symbols:
             rows_df = rows_df.sort_values(["avg_dollar","atr_pct","ret_5d","symbol"], ascending=[False,False,False,True])
-            symbols = rows_df["symbol"].tolist()[:max(50, shortlist_min//2)]
+            shortlist_df = rows_df.iloc[:max(50, shortlist_min//2)]
+            symbols = shortlist_df["symbol"].tolist()
             print(f"⚠️ Fallback shortlist used: {len(symbols)}", file=sys.stderr)
 
-        # Score every survivor (NO partial sampling), then slice at the end
-        def score_row(row, relvol=0.0):
-            """Enhanced scoring with live tape validation"""
-            r5 = row.get("ret_5d")
-            r21 = row.get("ret_21d")
-
-            # Start with base score
-            score = 50
-
-            # Capped momentum points (max 25)
-            score += momentum_points(r5, r21)
-
-            # Volatility bonus
-            if (row.get("atr_pct") or 0) >= 0.03: 
-                score += 10
-            elif (row.get("atr_pct") or 0) >= 0.02: 
-                score += 5
-
-            # Volume confirmation (updated tiers)
-            if relvol >= 2.0: 
-                score += 15  # +15 @≥2.0x
-            elif relvol >= 1.7: 
-                score += 10  # +10 @1.7x
-            elif relvol >= 1.5: 
-                score += 4   # +4 @1.5x
-
-            # Dollar volume bonus
-            if (row.get("avg_dollar") or 0) >= 50_000_000: 
-                score += 8
-            elif (row.get("avg_dollar") or 0) >= 20_000_000: 
-                score += 5
-
-            # Breakout bonus
-            if bool(row.get("breakout20")): 
-                score += 12
-
-            # Early catalyst detection
-            score += detect_early_catalysts(row)
-
-            # Squeeze synergy (using mock data for now)
-            score += squeeze_synergy(
-                row.get("float"), 
-                row.get("short_interest_pct"), 
-                row.get("borrow_fee_pct")
-            )
-
-            # Days to cover bonus
-            score += days_to_cover_bonus(
-                row.get("short_shares"), 
-                row.get("adv")
-            )
-
-            # NEW BONUSES - AlphaStack Upgrade
-            
-            # PR Catalyst detection (+3 per hit, max +10)
-            catalyst_data = detect_pr_catalyst(row.get("symbol", ""))
-            score += catalyst_data["pr_bonus"]
-            
-            # Pre-market Spark (+8 for gap ≥10% + relvol ≥1.5x)
-            spark_data = detect_premarket_spark(
-                row.get("symbol", ""),
-                row.get("prev_close"),
-                row.get("price")
-            )
-            score += spark_data["spark_bonus"]
-            
-            # Options/GEX nudge (+6 for rising OI, ±4 for gamma)
-            options_data = detect_options_gex_nudge(
-                row.get("symbol", ""),
-                row.get("price")
-            )
-            score += options_data["nudgePoints"]
-            
-            # Drawdown & spread penalties (-8 for HOD, -3 to -5 for spread)
-            score += drawdown_and_spread_penalties(
-                row.get("hod_drawdown_pct"),
-                row.get("bid_ask_spread_pct")
-            )
-            
-            # Live-vs-cached drift guard (-8 for ≥10% drift)
-            drift_data = live_vs_cached_drift_guard(
-                row.get("live_price"),
-                row.get("price")
-            )
-            score += drift_data["drift_penalty"]
-            
-            # Theme boost (+6 for ≥2 runners in sector)
-            theme_data = theme_boost_sector_herd(
-                row.get("symbol", ""),
-                row.get("sector"),
-                []  # TODO: Pass recent_runners from context
-            )
-            score += theme_data["theme_bonus"]
-
-            # Live tape penalties (will be 0 for now since no live data yet)
-            score += live_penalties(
-                price=row.get("live_price"),
-                vwap=row.get("live_vwap"),
-                rsi=row.get("live_rsi"),
-                ema9_ge_ema20=row.get("ema9_ge_ema20"),
-                drawdown_from_hod=row.get("drawdown_from_hod")
-            )
+        # Only names not scored earlier in this scan (a full-universe expansion adds a delta)
+        new = [s for s in symbols if s not in ctx.scored]
+        new_df = shortlist_df if len(new) == len(symbols) else shortlist_df[shortlist_df["symbol"].isin(new)]
+        if len(new) < len(symbols):
+            print(f"♻️ Reusing {len(symbols) - len(new)} scored candidates, scoring {len(new)} new", file=sys.stderr)
 
-            # Live vs cached sanity check
-            score = live_vs_cached_sanity_check(
-                row.get("live_price"),
-                row.get("price"),  # cached price
-                score
-            )
+        # One concurrent fetch of today's minute bars for the new names
+        mbatch = minute_bars_many(new)
 
-            return max(30, min(100, score))
+        # Score them column-wise (score_frame == score_row per row)
+        records = new_df.to_dict("records")
+        ctx.rows.update((r["symbol"], r) for r in records)
+        relvols, relvols_pm = ctx.minute(new, _num(new_df, "adv"), mbatch)
+        scores = score_frame(new_df, relvols, relvols_pm, **ctx.bonuses(records))
 
         def generate_thesis(symbol, row, score, relvol, short_info=None):
             """Generate compelling investment thesis for a candidate"""
@@ -621,31 +985,23 @@ class UniverseScreener:
                 "risk_note": risk_note
             }
 
+        global partial_results
         candidates = []
+        partial_results = candidates  # in-memory fallback when no checkpoint is configured
+        new_pos = {sym: i for i, sym in enumerate(new)}
         for sym in symbols:  # score ALL shortlisted names deterministically
-            row = survivors_df.loc[survivors_df["symbol"]==sym].iloc[0].to_dict()
-
-            # Optional minute relvol (never used to DROP)
-            relvol = 0.0
-            try:
-                mins = minute_bars(sym)
-                if mins and len(mins) >= 5:
-                    dfm = pd.DataFrame(mins).rename(columns=str.lower, inplace=False)
-                    last30 = float(dfm['v'].tail(30).sum())
-                    adv = row["adv"]
-                    avg_min = (adv/(6.5*60)) if adv>0 else 0
-                    relvol = (last30/(avg_min*30)) if avg_min>0 else 0.0
-            except Exception:
-                pass
-
-            sc = score_row(row, relvol)
+            if sym not in new_pos:
+                candidates.append(dict(ctx.scored[sym]))  # scored earlier in this scan
+                continue
+            i = new_pos[sym]
+            row = records[i]
+            relvol = ctx.relvol(sym)  # optional minute relvol (never used to DROP)
+            sc = float(scores[i])
             
-            # Collect all enhancement data for extended schema
-            catalyst_data = detect_pr_catalyst(sym)
-            spark_data = detect_premarket_spark(sym, row.get("prev_close"), row.get("price"))
-            options_data = detect_options_gex_nudge(sym, row.get("price"))
-            drift_data = live_vs_cached_drift_guard(row.get("live_price"), row.get("price"))
-            theme_data = theme_boost_sector_herd(sym, row.get("sector"), [])
+            # Enhancement data for the extended schema (computed once, during scoring)
+            sig = ctx.signals(row)
+            catalyst_data, spark_data = sig["catalyst"], sig["spark"]
+            options_data, theme_data = sig["options"], sig["theme"]
             
             # Generate thesis
             thesis_data = generate_thesis(sym, row, sc, relvol)
@@ -669,17 +1025,7 @@ class UniverseScreener:
                 "thesis_tldr": thesis_data["thesis"][:100] + "..." if len(thesis_data["thesis"]) > 100 else thesis_data["thesis"],
                 
                 # Indicators
-                "indicators": {
-                    "relvol": round(max(relvol, 1.0), 1),
-                    "vwap_position": "above" if row.get("live_price", row["price"]) > row.get("live_vwap", row["price"]) else "below",
-                    "ema_9_20": "bullish" if row.get("ema9_ge_ema20") else "forming",
-                    "rsi": row.get("live_rsi", 50),
-                    "atr_pct": row.get("atr_pct", 0) * 100,
-                    "float": row.get("float_shares", 0),
-                    "short_interest_pct": (row.get("short_interest_pct", 0) or 0) * 100,
-                    "borrow_fee_pct": (row.get("borrow_fee_pct", 0) or 0) * 100,
-                    "sector": row.get("sector", "Unknown")
-                },
+                "indicators": indicator_fields(row, relvol),
                 
                 # Catalyst data
                 "catalyst": catalyst_data,
@@ -723,27 +1069,22 @@ class UniverseScreener:
             # Filter out None values from feature flags
             candidate["featureFlags"] = [f for f in candidate["featureFlags"] if f is not None]
             
-            candidates.append(candidate)
+            ctx.scored[sym] = candidate
+            candidates.append(dict(candidate))  # enrichment below edits the copy
             
-            # Update global partial results for SIGTERM handler
-            global partial_results
-            partial_results = candidates.copy()
+            # Checkpoint for the SIGTERM handler / Node salvage (one appended line per candidate)
+            if checkpoint is not None:
+                checkpoint.append(candidate)
             
-            # Touch heartbeat and flush every 10 items
+            # Touch heartbeat every 10 items
             if len(candidates) % 10 == 0:
                 touch_heartbeat()
-                # Also flush to disk for safety
-                if json_out_path:
-                    try:
-                        write_final_json(candidates)
-                    except:
-                        pass
 
         # Late short-interest enrichment for squeeze bias (deterministic; top N)
         enrich_max = int(UCFG.get("enrich_short_max", 800))
         for c in candidates[:min(enrich_max, len(candidates))]:
             try:
-                sm = short_metrics(c["symbol"]) or {}
+                sm = ctx.short(c["symbol"])
                 si  = sm.get("short_interest") or 0
                 fee = sm.get("borrow_fee") or 0
                 util= sm.get("utilization") or 0
@@ -758,10 +1099,12 @@ class UniverseScreener:
                 # Update thesis with short squeeze info if significant
                 if si > 0.15 or fee > 0.15:
                     # Regenerate thesis with short info
-                    row = survivors_df.loc[survivors_df["symbol"]==c["symbol"]].iloc[0].to_dict()
+                    row = ctx.rows[c["symbol"]]
                     relvol = c["rel_vol_30m"]
                     thesis_data = generate_thesis(c["symbol"], row, c["score"], relvol, sm)
                     c["thesis"] = thesis_data["thesis"]
+                if checkpoint is not None:
+                    checkpoint.append(c)  # supersedes the candidate's earlier line
                     
             except Exception:
                 continue
@@ -775,7 +1118,7 @@ class UniverseScreener:
         # Auto-activate full universe mode if too few candidates found
         if not full_universe_mode and len(final) < full_config.get("activate_when", 10) and full_config.get("enabled", False):
             print(f"🚀 AUTO-ACTIVATING FULL UNIVERSE MODE: Only {len(final)} candidates found, expanding search...", file=sys.stderr)
-            return self.screen_universe(limit, exclude_symbols, full_universe_mode=True)
+            return self._screen(rows_df, exclude_list, ctx, limit, full_universe_mode=True)
         
         # Cold tape recovery: Create PRE_BREAKOUT tier when markets are quiet
         if len(final) < limit and full_universe_mode:
@@ -806,7 +1149,7 @@ class UniverseScreener:
         return final
 
 def main():
-    global partial_results, json_out_path, heartbeat_path
+    global partial_results, checkpoint, json_out_path, heartbeat_path, result_limit
     
     parser = argparse.ArgumentParser(description='Deterministic Universe Stock Screener')
     parser.add_argument('--limit', type=int, default=5, help='Number of candidates to return')
@@ -817,8 +1160,15 @@ def main():
     args = parser.parse_args()
     
     # Set global JSON output path and heartbeat
+    result_limit = args.limit
     json_out_path = os.environ.get('JSON_OUT_PATH')
     heartbeat_path = os.environ.get('HEARTBEAT_PATH')
+    checkpoint_path = os.environ.get('CHECKPOINT_PATH') or (f"{json_out_path}.ndjson" if json_out_path else None)
+    if checkpoint_path:
+        try:
+            checkpoint = CandidateCheckpoint(checkpoint_path)
+        except OSError as e:
+            print(f"Failed to open checkpoint {checkpoint_path}: {e}", file=sys.stderr)
     
     # Start heartbeat
     if heartbeat_path:
@@ -835,11 +1185,16 @@ def main():
     screener = UniverseScreener()
     candidates = screener.screen_universe(args.limit, args.exclude_symbols, full_universe_mode=args.full_universe)
     
-    # Store as partial results (in case of SIGTERM)
+    # Store as partial results (in case of SIGTERM); the checkpoint is superseded
     partial_results = candidates
+    finished, checkpoint = checkpoint, None
     
     # Write final results
     write_final_json(candidates)
+    
+    # Leave no checkpoint behind for a later salvage to mistake for this run's output
+    if finished is not None:
+        finished.discard()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -26,10 +26,11 @@ load_dotenv()
 ROOT = Path(__file__).resolve().parents[1]
 CONF = yaml.safe_load(open(ROOT / "config" / "alpha_scoring.yml"))
 UCFG = CONF.get("universe", {})
-FEAT_PATH = ROOT / "data" / "universe_features.parquet"
+MINUTE_PREFETCH_CHUNK = int(os.getenv("MINUTE_PREFETCH_CHUNK", "25"))  # symbols per concurrent minute-bar fetch
 
 sys.path.append(str(ROOT))
-from data.providers.alpha_providers import minute_bars, short_metrics
+from data.providers.alpha_providers import minute_bars_many
+from data.feature_store import load_universe_features
 
 def ensure_dir(path: str):
     """Ensure parent directory exists for the given file path"""
@@ -168,6 +169,7 @@ def map_action(score):
 class UniverseScreenerV2:
     def __init__(self):
         self.polygon_api_key = os.getenv("POLYGON_API_KEY")
+        self.features_version = ""  # feature snapshot id of the last load
         self.criteria = {
             "min_price": 0.10,
             "max_price": 100.0,
@@ -190,10 +192,10 @@ class UniverseScreenerV2:
         
         if universe_mode == "cached":
             print("🔧 UNIVERSE_MODE=cached: forcing cached-only mode", file=sys.stderr)
-            if not FEAT_PATH.exists():
+            rows_df, self.features_version = load_universe_features()
+            if rows_df is None:
                 print("❌ Cached mode requested but no cached features found", file=sys.stderr)
                 return []
-            rows_df = pd.read_parquet(FEAT_PATH)
             original_count = len(rows_df)
         elif universe_mode == "live":
             print("🔧 UNIVERSE_MODE=live: attempting live fetch", file=sys.stderr)
@@ -201,7 +203,9 @@ class UniverseScreenerV2:
             # This would be where you'd call fetch_live_universe() if implemented
             try:
                 print("📦 Loading cached features (live mode fallback)...", file=sys.stderr)
-                rows_df = pd.read_parquet(FEAT_PATH)
+                rows_df, self.features_version = load_universe_features()
+                if rows_df is None:
+                    raise FileNotFoundError("No cached features found")
                 original_count = len(rows_df)
             except Exception as e:
                 print(f"❌ Live mode failed, no fallback available: {e}", file=sys.stderr)
@@ -209,11 +213,11 @@ class UniverseScreenerV2:
         else:
             # auto mode (default behavior)
             try:
-                if not FEAT_PATH.exists():
+                rows_df, self.features_version = load_universe_features()
+                if rows_df is None:
                     raise FileNotFoundError("No cached features found")
                 
-                print("📦 Loading cached universe features...", file=sys.stderr)
-                rows_df = pd.read_parquet(FEAT_PATH)
+                print(f"📦 Loaded cached universe features (snapshot {self.features_version})", file=sys.stderr)
                 original_count = len(rows_df)
             except (FileNotFoundError, Exception) as e:
                 print(f"❌ Failed to load universe features: {e}", file=sys.stderr)
@@ -313,23 +317,26 @@ class UniverseScreenerV2:
         
         print(f"🎯 Stage 3 (Momentum/Flow): {len(liquidity_filtered)} → {len(symbols)} final candidates", file=sys.stderr)
         
-        # STAGE 1.5: Quick scoring (no API calls)
+        # STAGE 1.5: Quick scoring (minute bars fetched concurrently, one chunk at a time)
         candidates = []
-        for sym in symbols[:limit * 3]:  # Process 3x limit for better selection
+        scored_symbols = symbols[:limit * 3]  # Process 3x limit for better selection
+        chunk = max(1, MINUTE_PREFETCH_CHUNK)
+        for i, sym in enumerate(scored_symbols):
             if time.time() - start_time > budget_ms / 1000:
                 print(f"⏰ Budget exceeded, returning {len(candidates)} candidates", file=sys.stderr)
                 break
+            if i % chunk == 0:  # budget still left: fetch the next chunk
+                mbatch = minute_bars_many(scored_symbols[i:i + chunk])
             
             row = momentum_filtered.loc[momentum_filtered["symbol"]==sym].iloc[0].to_dict()
             
             # Get cached relative volume if available
             relvol = 1.0  # Default if not available
             try:
-                # Try to get from minute bars with very short timeout
-                mins = minute_bars(sym)
-                if mins and len(mins) >= 5:
-                    dfm = pd.DataFrame(mins).rename(columns=str.lower, inplace=False)
-                    last30 = float(dfm['v'].tail(30).sum())
+                # Use the prefetched minute bars batch
+                vols = mbatch.volumes(sym)
+                if len(vols) >= 5:
+                    last30 = float(vols[-30:].sum())
                     adv = row.get("adv", 0)
                     avg_min = (adv/(6.5*60)) if adv>0 else 0
                     relvol = (last30/(avg_min*30)) if avg_min>0 else 1.0
@@ -467,6 +474,7 @@ def main(args):
             "schema_version": 1,
             "run_id": f"{snapshot_ts}-{args.seed or 'none'}",
             "snapshot_ts": snapshot_ts,
+            "features_version": screener.features_version,
             "duration_ms": duration_ms,
             "partial": len(candidates) < args.limit,
             "params": {
@@ -0,0 +1,516 @@
+"""
+Universe Feature Engine
+Vectorized replacement for the per-symbol feats() loop in build_universe_v2.
+Bars are compacted per symbol into dense newest-first (symbols x sessions)
+matrices and every feature is computed for the whole universe at once.
+Means are reduced over exactly each symbol's own sessions, so results match
+the per-symbol computation bit for bit. The daily-resolvable tape fields the
+scorer reads (prev close, gap, RSI-14, EMA9/EMA20 state, HOD drawdown) are
+computed in the same pass, as are the configurable lookback windows
+(returns, ATR, volume means and breakout highs per lookback).
+
+WindowBuilder fills that layout session by session while downloads are still
+in flight. RollingFeatureState keeps the same window as per-symbol ring
+buffers with rolling sums, so sliding in one new session is O(symbols)
+instead of a rebuild.
+"""
+
+import os
+import datetime as dt
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BAR_FIELDS = ("o", "h", "l", "c", "v")
+TAPE_COLUMNS = ["prev_close", "gap_pct", "rsi_14", "ema9_ge_ema20", "hod_drawdown_pct"]
+FEATURE_COLUMNS = ["symbol", "price", "adv", "avg_dollar", "atr_pct", "ret_5d", "ret_21d", "breakout20"] + TAPE_COLUMNS
+MIN_SESSIONS = 6
+RSI_PERIOD = 14
+BREAKOUT20_LOOKBACK = 21  # breakout20 has always compared against the 21 prior closes (== breakout_21d)
+WINDOW_FIELDS = ("ret_{}d", "adv_{}d", "avg_dollar_{}d", "atr_pct_{}d", "breakout_{}d")
+
+
+def _lookbacks(windows: Sequence[int]) -> List[int]:
+    return sorted({int(w) for w in windows or () if int(w) > 0})
+
+
+def window_columns(windows: Sequence[int]) -> List[str]:
+    """Columns added for the given lookbacks (names already in FEATURE_COLUMNS are not repeated)"""
+    cols = [f.format(L) for L in _lookbacks(windows) for f in WINDOW_FIELDS]
+    return [c for c in cols if c not in FEATURE_COLUMNS]
+
+
+class SessionWindow:
+    """Per-symbol bars, newest first, NaN padded past each symbol's session count (dtype follows the input columns)"""
+
+    def __init__(self, symbols: List[str], counts: np.ndarray, mats: Dict[str, np.ndarray],
+                 day: Optional[np.ndarray] = None):
+        self.symbols = list(symbols)
+        self.counts = counts
+        self.mats = mats
+        self.day = day  # session index of each cell (0 = newest session of the window, -1 = padding)
+
+    @property
+    def depth(self) -> int:
+        return self.mats["c"].shape[1]
+
+    @classmethod
+    def from_columns(cls, cols: Dict[str, np.ndarray], symbols: List[str], n_days: int) -> "SessionWindow":
+        """
+        Flat arrays (sym id, day index with 0 = newest, o/h/l/c/v) -> window.
+        Sessions a symbol did not trade are skipped, not left as gaps.
+        """
+        sym, day = cols["sym"], cols["day"]
+        order = np.lexsort((day, sym))
+        s = sym[order]
+        counts = np.bincount(s, minlength=len(symbols)).astype(np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        pos = np.arange(len(s)) - starts[s]
+        shape = (len(symbols), max(n_days, 1))
+        mats = {}
+        for f in BAR_FIELDS:
+            m = np.full(shape, np.nan, dtype=cols[f].dtype)
+            m[s, pos] = cols[f][order]
+            mats[f] = m
+        day_m = np.full(shape, -1, dtype=np.int16 if n_days < 2 ** 15 else np.int32)
+        day_m[s, pos] = day[order]
+        return cls(symbols, counts, mats, day_m)
+
+
+class WindowBuilder:
+    """
+    Streaming SessionWindow construction: each session's bars are scattered into
+    preallocated (symbols x sessions) arrays as it arrives, in any order, and
+    finish() compacts them once the last session has landed.
+    """
+
+    def __init__(self, symbols: List[str], n_days: int, dtype=np.float64):
+        self.symbols = list(symbols)
+        shape = (len(self.symbols), max(n_days, 1))
+        self.mats = {f: np.full(shape, np.nan, dtype=dtype) for f in BAR_FIELDS}
+        self.present = np.zeros(shape, dtype=bool)
+        self.sessions = 0
+
+    def add(self, day: int, cols: Dict[str, np.ndarray]):
+        """Place one session (sym ids + o/h/l/c/v) at session index `day` (0 = newest)"""
+        sym = cols["sym"]
+        for f in BAR_FIELDS:
+            self.mats[f][sym, day] = cols[f]
+        self.present[sym, day] = True
+        self.sessions += 1
+
+    def finish(self) -> SessionWindow:
+        """Compact to newest-first per-symbol bars; same window as SessionWindow.from_columns()"""
+        counts = self.present.sum(axis=1).astype(np.int64)
+        order = np.argsort(~self.present, axis=1, kind="stable")  # traded sessions first, in day order
+        filled = np.arange(order.shape[1])[None, :] < counts[:, None]
+        for f in BAR_FIELDS:
+            m = np.take_along_axis(self.mats[f], order, axis=1)
+            m[~filled] = np.nan
+            self.mats[f] = m  # swap one field at a time to bound peak memory
+        day = np.where(filled, order, -1).astype(np.int16 if order.shape[1] < 2 ** 15 else np.int32)
+        self.present = None
+        return SessionWindow(self.symbols, counts, self.mats, day)
+
+
+def _row_nanmean(mat: np.ndarray, counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """nanmean over each row's first counts[row] cells, grouped by length for exact parity"""
+    out = np.full(len(rows), np.nan)
+    n_of = counts[rows]
+    for n in np.unique(n_of):
+        sel = np.nonzero(n_of == n)[0]
+        out[sel] = np.nanmean(mat[rows[sel], :n], axis=1, dtype=np.float64)
+    return out
+
+
+def _breakout(c: np.ndarray, lookback: int, breakout_buffer: float) -> np.ndarray:
+    """
+    Breakout flag shared by breakout20 and every breakout_{L}d: the latest close
+    is at least breakout_buffer above the highest of the `lookback` prior closes
+    (c[:, 1:lookback + 1] of newest-first rows; padding and missing bars ignored).
+    """
+    hh = np.nanmax(c[:, 1:lookback + 1], axis=1) if c.shape[1] > 1 else np.full(len(c), np.nan)
+    return ~np.isnan(hh) & (c[:, 0] >= hh * (1.0 + breakout_buffer))
+
+
+def _tape_fields(closes: np.ndarray, n: np.ndarray, o0: np.ndarray, h0: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Daily tape fields from newest-first closes (NaN past n). RSI uses Wilder
+    smoothing seeded with the first 14-change average; EMAs are seeded with
+    the oldest close. Both walk the window oldest to newest.
+    """
+    R, W = closes.shape
+    c0 = closes[:, 0]
+    prev_close = closes[:, 1] if W > 1 else np.full(R, np.nan)
+    a9, a20 = 2.0 / 10.0, 2.0 / 21.0
+    ema9, ema20 = np.full(R, np.nan), np.full(R, np.nan)
+    gain, loss = np.zeros(R), np.zeros(R)
+    for k in range(W - 1, -1, -1):  # column k is k sessions back
+        x = closes[:, k]
+        live = k < n
+        first = k == n - 1
+        ema9 = np.where(first, x, np.where(live, a9 * x + (1 - a9) * ema9, ema9))
+        ema20 = np.where(first, x, np.where(live, a20 * x + (1 - a20) * ema20, ema20))
+        if k == W - 1:
+            continue
+        j = n - 1 - k  # changes seen so far, this one included
+        d = x - closes[:, k + 1]
+        up, down = np.where(d > 0, d, 0.0), np.where(d < 0, -d, 0.0)
+        seed, smooth = (j >= 1) & (j <= RSI_PERIOD), j > RSI_PERIOD
+        gain = np.where(seed, gain + up / RSI_PERIOD, np.where(smooth, (gain * (RSI_PERIOD - 1) + up) / RSI_PERIOD, gain))
+        loss = np.where(seed, loss + down / RSI_PERIOD, np.where(smooth, (loss * (RSI_PERIOD - 1) + down) / RSI_PERIOD, loss))
+    rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / np.where(loss > 0, loss, 1.0)),
+                   np.where(gain > 0, 100.0, 50.0))
+    return {
+        "prev_close": np.where(n > 1, prev_close, np.nan),
+        "gap_pct": np.where((n > 1) & (prev_close > 0), (o0 / prev_close - 1.0) * 100.0, np.nan),
+        "rsi_14": np.where(n > RSI_PERIOD, rsi, np.nan),
+        "ema9_ge_ema20": ema9 >= ema20,
+        "hod_drawdown_pct": np.where(h0 > 0, (h0 - c0) / h0 * 100.0, np.nan),
+    }
+
+
+def _window_fields(c: np.ndarray, v: np.ndarray, tr: np.ndarray, n: np.ndarray, windows: Sequence[int],
+                   breakout_buffer: float) -> Dict[str, np.ndarray]:
+    """
+    Per-lookback returns, volume / dollar-volume / ATR means and breakout flags
+    from newest-first rows (NaN past n). One set of running sums is built over
+    the matrix; each lookback's means are then a column pick. Symbols with
+    fewer than L bars average over what they have. breakout_{L}d compares with
+    the L prior closes (see _breakout), so breakout_21d equals breakout20.
+    """
+    R, W = c.shape
+    out: Dict[str, np.ndarray] = {}
+    if R == 0 or not window_columns(windows):
+        return out
+    run = {}
+    for k, x in (("v", v), ("cv", c * v), ("tr", tr)):
+        ok = ~np.isnan(x)
+        run[k] = (np.cumsum(np.where(ok, x, 0.0), axis=1, dtype=np.float64), np.cumsum(ok, axis=1))
+    idx, c0 = np.arange(R), c[:, 0]
+    for L in _lookbacks(windows):
+        last = np.clip(np.minimum(L, n) - 1, 0, W - 1)
+        mean = {}
+        for k, (total, nobs) in run.items():
+            m = nobs[idx, last]
+            mean[k] = np.where(m > 0, total[idx, last] / np.maximum(m, 1), np.nan)
+        ck = c[:, L] if L < W else np.full(R, np.nan)
+        out[f"ret_{L}d"] = np.where((n > L) & (ck != 0), c0 / ck - 1.0, 0.0)
+        out[f"adv_{L}d"] = mean["v"]
+        out[f"avg_dollar_{L}d"] = mean["cv"]
+        out[f"atr_pct_{L}d"] = np.where(c0 != 0, mean["tr"] / c0, 0.0)
+        out[f"breakout_{L}d"] = _breakout(c, L, breakout_buffer)
+    return out
+
+
+def compute_features(window: SessionWindow, breakout_buffer: float = 0.01,
+                     min_sessions: int = MIN_SESSIONS, windows: Sequence[int] = ()) -> pd.DataFrame:
+    """
+    Universe features (one row per symbol with >= min_sessions bars, sorted by
+    symbol), plus the window_columns() of each extra lookback in `windows`.
+    """
+    counts = window.counts
+    rows = np.nonzero(counts >= min_sessions)[0]
+    if len(rows) == 0:
+        return pd.DataFrame(columns=FEATURE_COLUMNS + window_columns(windows))
+    n = counts[rows]
+    h, l, c, v = (window.mats[f] for f in ("h", "l", "c", "v"))
+    c_rows = c[rows]
+    c0 = c_rows[:, 0]
+
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        adv = _row_nanmean(v, counts, rows)
+        avg_dollar = _row_nanmean(c * v, counts, rows)
+
+        # previous close; the oldest bar uses its own close
+        prev = np.empty_like(c)
+        prev[:, :-1] = c[:, 1:]
+        last = np.clip(counts - 1, 0, None)
+        all_rows = np.arange(len(counts))
+        prev[all_rows, last] = c[all_rows, last]
+        tr = np.maximum(h - l, np.maximum(np.abs(h - prev), np.abs(l - prev)))
+        atr = _row_nanmean(tr, counts, rows)
+        atr_pct = np.where(c0 != 0, atr / c0, 0.0)
+
+        def ret(k):
+            if window.depth <= k:
+                return np.zeros(len(rows))
+            ck = c_rows[:, k]
+            return np.where((n > k) & (ck != 0), c0 / ck - 1.0, 0.0)
+
+        breakout20 = _breakout(c_rows, BREAKOUT20_LOOKBACK, breakout_buffer)
+        ret_5d, ret_21d = ret(5), ret(21)
+        tape = _tape_fields(c_rows, n, window.mats["o"][rows, 0], h[rows, 0])
+        extra = _window_fields(c_rows, v[rows], tr[rows], n, windows, breakout_buffer)
+
+    df = pd.DataFrame({
+        "symbol": [window.symbols[i] for i in rows],
+        "price": c0,
+        "adv": adv,
+        "avg_dollar": avg_dollar,
+        "atr_pct": atr_pct,
+        "ret_5d": ret_5d,
+        "ret_21d": ret_21d,
+        "breakout20": breakout20,
+        **tape,
+    })
+    return _with_windows(df, extra, windows)
+
+
+def _with_windows(df: pd.DataFrame, extra: Dict[str, np.ndarray], windows: Sequence[int]) -> pd.DataFrame:
+    cols = window_columns(windows)
+    if not cols:
+        return df
+    return pd.concat([df, pd.DataFrame({c: extra[c] for c in cols}, index=df.index)], axis=1)
+
+
+STATE_PATH = Path(os.getenv("FEATURE_STATE_PATH", str(Path(__file__).resolve().parent / "cache" / "feature_state.npz")))
+RING_FIELDS = ("o", "h", "l", "c", "v", "tr")
+SUM_KEYS = ("v", "cv", "tr")
+
+
+def _true_range(h, l, prev_c):
+    return np.maximum(h - l, np.maximum(np.abs(h - prev_c), np.abs(l - prev_c)))
+
+
+def _ordinals(days: List[str]) -> np.ndarray:
+    return np.array([dt.date.fromisoformat(d).toordinal() for d in days], dtype=np.int32)
+
+
+class RollingFeatureState:
+    """
+    Per-symbol ring buffers over the session window plus rolling NaN-aware sums
+    of v, c*v and true range. Sliding the window touches only the bars that
+    enter or leave it; features are then read off the sums and ring heads.
+    """
+
+    def __init__(self, symbols: List[str], days: List[str], ring: Dict[str, np.ndarray], stamp: np.ndarray,
+                 head: np.ndarray, count: np.ndarray, sums: Dict[str, np.ndarray], nobs: Dict[str, np.ndarray]):
+        self.symbols = list(symbols)
+        self.days = list(days)  # window sessions, newest first (holidays included)
+        self.ring = ring        # field -> (symbols, capacity), slot head[s] holds the newest bar
+        self.stamp = stamp      # session ordinal per slot, -1 when empty
+        self.head = head
+        self.count = count
+        self.sums = sums
+        self.nobs = nobs
+
+    @property
+    def capacity(self) -> int:
+        return self.stamp.shape[1]
+
+    @classmethod
+    def empty(cls, symbols: List[str], days: List[str], dtype=np.float64) -> "RollingFeatureState":
+        S, W = len(symbols), max(len(days), 1)
+        return cls(
+            symbols, days,
+            {f: np.full((S, W), np.nan, dtype=dtype) for f in RING_FIELDS},
+            np.full((S, W), -1, dtype=np.int32),
+            np.full(S, W - 1, dtype=np.int64),
+            np.zeros(S, dtype=np.int64),
+            {k: np.zeros(S) for k in SUM_KEYS},
+            {k: np.zeros(S, dtype=np.int64) for k in SUM_KEYS},
+        )
+
+    @classmethod
+    def from_window(cls, window: SessionWindow, days: List[str]) -> "RollingFeatureState":
+        """Seed the ring buffers from a freshly built window (days as passed to from_columns)"""
+        st = cls.empty(window.symbols, days, window.mats["c"].dtype)  # sums stay float64 either way
+        W, n = st.capacity, window.counts
+        st.head = (n - 1) % W
+        st.count = n.astype(np.int64).copy()
+        rows, ks = np.nonzero(np.arange(window.depth)[None, :] < n[:, None])
+        slots = (st.head[rows] - ks) % W
+        for f in BAR_FIELDS:
+            st.ring[f][rows, slots] = window.mats[f][rows, ks]
+        prev_k = np.where(ks + 1 < n[rows], ks + 1, ks)  # the oldest bar uses its own close
+        st.ring["tr"][rows, slots] = _true_range(window.mats["h"][rows, ks], window.mats["l"][rows, ks],
+                                                 window.mats["c"][rows, prev_k])
+        st.stamp[rows, slots] = _ordinals(days)[window.day[rows, ks]]
+        for k, x in st._sum_inputs().items():
+            st.sums[k] = np.nansum(x, axis=1, dtype=np.float64)
+            st.nobs[k] = (~np.isnan(x)).sum(axis=1)
+        return st
+
+    def _sum_inputs(self, rows=None, slots=None) -> Dict[str, np.ndarray]:
+        pick = (lambda f: self.ring[f]) if rows is None else (lambda f: self.ring[f][rows, slots])
+        return {"v": pick("v"), "cv": pick("c") * pick("v"), "tr": pick("tr")}
+
+    def _accumulate(self, rows, slots, sign: int, keys=SUM_KEYS):
+        inputs = self._sum_inputs(rows, slots)
+        for k in keys:
+            x = inputs[k]
+            ok = ~np.isnan(x)
+            self.sums[k][rows] += sign * np.where(ok, x, 0.0)
+            self.nobs[k][rows] += sign * ok
+
+    def _evict_oldest(self, rows: np.ndarray):
+        W = self.capacity
+        o = (self.head[rows] - self.count[rows] + 1) % W
+        self._accumulate(rows, o, -1)
+        self.count[rows] -= 1
+        self.stamp[rows, o] = -1
+        for f in RING_FIELDS:
+            self.ring[f][rows, o] = np.nan
+        # the bar that becomes oldest loses its previous close
+        left = self.count[rows] > 0
+        r2, o2 = rows[left], (o[left] + 1) % W
+        self._accumulate(r2, o2, -1, ("tr",))
+        self.ring["tr"][r2, o2] = _true_range(self.ring["h"][r2, o2], self.ring["l"][r2, o2], self.ring["c"][r2, o2])
+        self._accumulate(r2, o2, +1, ("tr",))
+
+    def _append(self, rows: np.ndarray, o, h, l, c, v, ordinal: int):
+        W = self.capacity
+        prev = np.where(self.count[rows] > 0, self.ring["c"][rows, self.head[rows]], c)
+        slots = (self.head[rows] + 1) % W
+        for f, x in (("o", o), ("h", h), ("l", l), ("c", c), ("v", v), ("tr", _true_range(h, l, prev))):
+            self.ring[f][rows, slots] = x
+        self.stamp[rows, slots] = ordinal
+        self.head[rows] = slots
+        self.count[rows] += 1
+        self._accumulate(rows, slots, +1)
+
+    def slide(self, days: List[str], sessions: Dict[str, Dict[str, np.ndarray]]):
+        """
+        Move the window to `days` (same length, newest first). Bars older than the
+        new window are evicted; `sessions` supplies {date: {sym, o, h, l, c, v}} for
+        each entering date (absent = no bars, e.g. a holiday).
+        """
+        if len(days) != self.capacity:
+            raise ValueError(f"window length changed ({self.capacity} -> {len(days)})")
+        known = set(self.days)
+        entering = sorted(d for d in days if d not in known)
+        if entering and self.days and entering[0] <= self.days[0]:
+            raise ValueError("only sessions newer than the current window can be applied")
+        cutoff = int(_ordinals(days).min())
+        W = self.capacity
+        while True:
+            live = np.nonzero(self.count > 0)[0]
+            oldest = self.stamp[live, (self.head[live] - self.count[live] + 1) % W]
+            stale = live[oldest < cutoff]
+            if not len(stale):
+                break
+            self._evict_oldest(stale)
+        for d in entering:
+            bars = sessions.get(d)
+            if bars is None or not len(bars["sym"]):
+                continue
+            keep = bars["sym"] >= 0
+            self._append(bars["sym"][keep].astype(np.int64), *(bars[f][keep] for f in BAR_FIELDS),
+                         int(_ordinals([d])[0]))
+        self.days = list(days)
+
+    def backfill(self, rows: np.ndarray, sessions: Dict[str, Dict[str, np.ndarray]]):
+        """
+        Load the current window's bars for empty rows (listings new to the
+        universe after reindex); `sessions` is {date: {sym, o, h, l, c, v}} for
+        the window's sessions, absent = no bars
+        """
+        fill = np.zeros(len(self.symbols), dtype=bool)
+        fill[rows] = True
+        ordinals = dict(zip(self.days, _ordinals(self.days).tolist()))
+        for d in sorted(d for d in sessions if d in ordinals):  # oldest first, like slide()
+            bars = sessions[d]
+            keep = bars["sym"] >= 0
+            keep[keep] = fill[bars["sym"][keep]]
+            if keep.any():
+                self._append(bars["sym"][keep].astype(np.int64), *(bars[f][keep] for f in BAR_FIELDS),
+                             int(ordinals[d]))
+
+    def reindex(self, symbols: List[str]) -> "RollingFeatureState":
+        """Same window over a new symbol list (listings keep their buffers, new ones start empty)"""
+        if list(symbols) == self.symbols:
+            return self
+        pos = {s: i for i, s in enumerate(self.symbols)}
+        src = np.array([pos.get(s, -1) for s in symbols], dtype=np.int64)
+        have, idx = np.nonzero(src >= 0)[0], src[src >= 0]
+        st = RollingFeatureState.empty(symbols, self.days, self.ring["c"].dtype)
+        for f in RING_FIELDS:
+            st.ring[f][have] = self.ring[f][idx]
+        st.stamp[have] = self.stamp[idx]
+        st.head[have] = self.head[idx]
+        st.count[have] = self.count[idx]
+        for k in SUM_KEYS:
+            st.sums[k][have] = self.sums[k][idx]
+            st.nobs[k][have] = self.nobs[k][idx]
+        return st
+
+    def features(self, breakout_buffer: float = 0.01, min_sessions: int = MIN_SESSIONS,
+                 windows: Sequence[int] = ()) -> pd.DataFrame:
+        """Same columns and row set as compute_features() over the current window"""
+        rows = np.nonzero(self.count >= min_sessions)[0]
+        if len(rows) == 0:
+            return pd.DataFrame(columns=FEATURE_COLUMNS + window_columns(windows))
+        W, n, head = self.capacity, self.count[rows], self.head[rows]
+        ks = np.arange(W)
+        slots, pad = (head[:, None] - ks[None, :]) % W, ks[None, :] >= n[:, None]
+
+        def newest_first(f):
+            m = self.ring[f][rows[:, None], slots]
+            m[pad] = np.nan
+            return m
+
+        closes = newest_first("c")
+        c0 = closes[:, 0]
+
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = {k: np.where(self.nobs[k][rows] > 0, self.sums[k][rows] / self.nobs[k][rows], np.nan)
+                    for k in SUM_KEYS}
+            atr_pct = np.where(c0 != 0, mean["tr"] / c0, 0.0)
+
+            def ret(k):
+                if W <= k:
+                    return np.zeros(len(rows))
+                ck = closes[:, k]
+                return np.where((n > k) & (ck != 0), c0 / ck - 1.0, 0.0)
+
+            breakout20 = _breakout(closes, BREAKOUT20_LOOKBACK, breakout_buffer)
+            ret_5d, ret_21d = ret(5), ret(21)
+            tape = _tape_fields(closes, n, self.ring["o"][rows, head], self.ring["h"][rows, head])
+            extra = _window_fields(closes, newest_first("v"), newest_first("tr"), n, windows, breakout_buffer)
+
+        df = pd.DataFrame({
+            "symbol": [self.symbols[i] for i in rows],
+            "price": c0,
+            "adv": mean["v"],
+            "avg_dollar": mean["cv"],
+            "atr_pct": atr_pct,
+            "ret_5d": ret_5d,
+            "ret_21d": ret_21d,
+            "breakout20": breakout20,
+            **tape,
+        })
+        return _with_windows(df, extra, windows)
+
+    def save(self, path: Path = STATE_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"symbols": np.array(self.symbols, dtype=str), "days": np.array(self.days, dtype=str),
+                  "stamp": self.stamp, "head": self.head, "count": self.count}
+        arrays.update({f"ring_{f}": a for f, a in self.ring.items()})
+        arrays.update({f"sum_{k}": a for k, a in self.sums.items()})
+        arrays.update({f"nobs_{k}": a for k, a in self.nobs.items()})
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH) -> Optional["RollingFeatureState"]:
+        try:
+            z = np.load(path)
+        except (OSError, ValueError):
+            return None
+        with z:
+            if any(f"ring_{f}" not in z.files for f in RING_FIELDS):
+                return None  # saved by an older layout; rebuild
+            return cls(
+                [str(s) for s in z["symbols"]], [str(d) for d in z["days"]],
+                {f: z[f"ring_{f}"] for f in RING_FIELDS}, z["stamp"], z["head"], z["count"],
+                {k: z[f"sum_{k}"] for k in SUM_KEYS}, {k: z[f"nobs_{k}"] for k in SUM_KEYS},
+            )
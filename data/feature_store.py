@@ -0,0 +1,160 @@
+"""
+Universe Feature Store
+Immutable, versioned Arrow IPC snapshots of the universe features.
+The builder publishes a new snapshot and then atomically swaps the CURRENT
+pointer; readers memory-map whatever CURRENT names, so they never observe a
+half-written file. Each snapshot carries a manifest (version, as-of, rows,
+schema hash) whose version id downstream caches can key on.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import datetime as dt
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = Path(os.getenv("FEATURE_STORE_DIR", str(ROOT / "data" / "feature_store")))
+LEGACY_PARQUET = ROOT / "data" / "universe_features.parquet"
+KEEP_VERSIONS = int(os.getenv("FEATURE_STORE_KEEP", "5"))
+
+
+def schema_hash(schema: pa.Schema) -> str:
+    """Stable hash of column names and types (metadata ignored)"""
+    desc = ";".join(f"{f.name}:{f.type}" for f in schema)
+    return hashlib.sha1(desc.encode()).hexdigest()[:12]
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FeatureSnapshot:
+    """One published snapshot: a memory-mapped Arrow table plus its manifest"""
+
+    def __init__(self, table: pa.Table, manifest: dict):
+        self.table = table
+        self.manifest = manifest
+
+    @property
+    def version(self) -> str:
+        return self.manifest.get("version", "")
+
+    def to_pandas(self) -> pd.DataFrame:
+        # split_blocks keeps numeric columns as views over the mapped buffers
+        return self.table.to_pandas(split_blocks=True)
+
+
+class FeatureStore:
+    """<root>/snapshots/<version>.arrow + <version>.json, <root>/CURRENT, <root>/manifest.json"""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+        self.snap_dir = self.root / "snapshots"
+
+    def current_version(self) -> Optional[str]:
+        try:
+            return (self.root / "CURRENT").read_text().strip() or None
+        except OSError:
+            return None
+
+    def manifest(self, version: Optional[str] = None) -> Optional[dict]:
+        """Manifest of a version (CURRENT by default)"""
+        version = version or self.current_version()
+        if not version:
+            return None
+        try:
+            return json.loads((self.snap_dir / f"{version}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first"""
+        if not self.snap_dir.exists():
+            return []
+        return sorted(p.stem for p in self.snap_dir.glob("*.json"))
+
+    def publish(self, df: pd.DataFrame, as_of: Optional[str] = None, **meta) -> dict:
+        """Write an immutable snapshot, then point CURRENT at it; returns the manifest"""
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:  # uncompressed so it can be mapped zero-copy
+            writer.write_table(table)
+        payload = sink.getvalue().to_pybytes()
+
+        digest = hashlib.sha1(payload).hexdigest()
+        current = self.manifest()
+        if current and current.get("content_hash") == digest:
+            return current  # identical content keeps its version id
+
+        created = dt.datetime.now(dt.timezone.utc)
+        version = f"{created:%Y%m%dT%H%M%S}-{digest[:8]}"
+        manifest = {
+            "version": version,
+            "as_of": as_of,
+            "created": created.isoformat(timespec="seconds"),
+            "rows": table.num_rows,
+            "columns": table.column_names,
+            "schema_hash": schema_hash(table.schema),
+            "content_hash": digest,
+            **meta,
+        }
+        self.snap_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.snap_dir / f"{version}.arrow", payload)
+        _atomic_write(self.snap_dir / f"{version}.json", json.dumps(manifest, indent=2).encode())
+        _atomic_write(self.root / "CURRENT", (version + "\n").encode())
+        _atomic_write(self.root / "manifest.json", json.dumps(manifest, indent=2).encode())
+        self.prune()
+        return manifest
+
+    def prune(self, keep: int = KEEP_VERSIONS):
+        """Drop old snapshots (open memory maps stay valid until their readers exit)"""
+        current = self.current_version()
+        for v in self.versions()[:-keep] if keep > 0 else []:
+            if v == current:
+                continue
+            for ext in (".arrow", ".json"):
+                try:
+                    (self.snap_dir / f"{v}{ext}").unlink()
+                except OSError:
+                    pass
+
+    def load(self, version: Optional[str] = None) -> Optional[FeatureSnapshot]:
+        """Memory-map a snapshot (CURRENT by default); None if nothing is published"""
+        version = version or self.current_version()
+        if not version:
+            return None
+        manifest = self.manifest(version)
+        if manifest is None:
+            return None
+        try:
+            source = pa.memory_map(str(self.snap_dir / f"{version}.arrow"), "r")
+            table = pa.ipc.open_file(source).read_all()
+        except (OSError, ValueError, pa.ArrowInvalid) as e:
+            print(f"[feature_store] snapshot {version} unreadable: {e}", file=sys.stderr)
+            return None
+        return FeatureSnapshot(table, manifest)
+
+
+def load_universe_features(store: Optional[FeatureStore] = None) -> Tuple[Optional[pd.DataFrame], str]:
+    """
+    Current universe features and their version id. Falls back to the legacy
+    parquet (version "parquet:<mtime>") when no snapshot has been published.
+    Returns (None, "") when neither exists.
+    """
+    snap = (store or FeatureStore()).load()
+    if snap is not None:
+        return snap.to_pandas(), snap.version
+    if LEGACY_PARQUET.exists():
+        return pd.read_parquet(LEGACY_PARQUET), f"parquet:{LEGACY_PARQUET.stat().st_mtime_ns}"
+    return None, ""
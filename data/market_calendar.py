@@ -0,0 +1,193 @@
+"""
+NYSE Session Calendar
+Offline exchange calendar: full-day holidays, 1 PM early closes and the
+pre-market / regular / post-market windows, all in US/Eastern. Used by the
+universe builder, the aggregate cache, minute-bar fetches and the portfolio
+worker so none of them target a day the market was closed.
+"""
+
+import datetime as dt
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Union
+from zoneinfo import ZoneInfo
+
+ET = ZoneInfo("America/New_York")
+PREMARKET_START = dt.time(4, 0)
+REGULAR_OPEN = dt.time(9, 30)
+REGULAR_CLOSE = dt.time(16, 0)
+EARLY_CLOSE = dt.time(13, 0)
+POSTMARKET_END = dt.time(20, 0)
+EARLY_POSTMARKET_END = dt.time(17, 0)
+
+# One-off closures that no rule predicts (national days of mourning)
+SPECIAL_CLOSURES = {
+    dt.date(2018, 12, 5): "National Day of Mourning (G.H.W. Bush)",
+    dt.date(2025, 1, 9): "National Day of Mourning (J. Carter)",
+}
+
+DateLike = Union[dt.date, str]
+
+
+class Session(NamedTuple):
+    date: dt.date
+    premarket_start: dt.datetime
+    open: dt.datetime
+    close: dt.datetime
+    postmarket_end: dt.datetime
+    early_close: bool
+
+
+def _date(d: DateLike) -> dt.date:
+    return dt.date.fromisoformat(d) if isinstance(d, str) else d
+
+
+def now_et() -> dt.datetime:
+    return dt.datetime.now(ET)
+
+
+def _easter(year: int) -> dt.date:
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return dt.date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    """n-th given weekday of a month (n = -1 for the last one)"""
+    if n > 0:
+        first = dt.date(year, month, 1)
+        return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    nxt = dt.date(year + (month == 12), month % 12 + 1, 1)
+    last = nxt - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: dt.date) -> dt.date:
+    """Saturday holidays move to Friday, Sunday ones to Monday"""
+    if d.weekday() == 5:
+        return d - dt.timedelta(days=1)
+    if d.weekday() == 6:
+        return d + dt.timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=64)
+def holidays(year: int) -> Dict[dt.date, str]:
+    """Full-day NYSE closures for a year"""
+    out = {}
+    new_year = dt.date(year, 1, 1)
+    if new_year.weekday() != 5:  # a Saturday New Year's Day is not made up on Dec 31
+        out[_observed(new_year)] = "New Year's Day"
+    out[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    out[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    out[_easter(year) - dt.timedelta(days=2)] = "Good Friday"
+    out[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        out[_observed(dt.date(year, 6, 19))] = "Juneteenth"
+    out[_observed(dt.date(year, 7, 4))] = "Independence Day"
+    out[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    out[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    out[_observed(dt.date(year, 12, 25))] = "Christmas Day"
+    out.update({d: name for d, name in SPECIAL_CLOSURES.items() if d.year == year})
+    return out
+
+
+def is_holiday(d: DateLike) -> bool:
+    d = _date(d)
+    return d in holidays(d.year)
+
+
+def is_trading_day(d: Optional[DateLike] = None) -> bool:
+    d = now_et().date() if d is None else _date(d)
+    return d.weekday() < 5 and not is_holiday(d)
+
+
+def is_early_close(d: DateLike) -> bool:
+    """1 PM closes: July 3, the day after Thanksgiving and Christmas Eve (when those are sessions)"""
+    d = _date(d)
+    if not is_trading_day(d):
+        return False
+    if (d.month, d.day) in ((7, 3), (12, 24)):
+        return True
+    return d == _nth_weekday(d.year, 11, 3, 4) + dt.timedelta(days=1)
+
+
+def session(d: DateLike) -> Optional[Session]:
+    """Session times for a date (None when the exchange is closed)"""
+    d = _date(d)
+    if not is_trading_day(d):
+        return None
+    early = is_early_close(d)
+    at = lambda t: dt.datetime.combine(d, t, ET)
+    return Session(d, at(PREMARKET_START), at(REGULAR_OPEN), at(EARLY_CLOSE if early else REGULAR_CLOSE),
+                   at(EARLY_POSTMARKET_END if early else POSTMARKET_END), early)
+
+
+def previous_trading_day(d: Optional[DateLike] = None) -> dt.date:
+    """Last session strictly before d"""
+    d = (now_et().date() if d is None else _date(d)) - dt.timedelta(days=1)
+    while not is_trading_day(d):
+        d -= dt.timedelta(days=1)
+    return d
+
+
+def next_trading_day(d: Optional[DateLike] = None) -> dt.date:
+    """First session strictly after d"""
+    d = (now_et().date() if d is None else _date(d)) + dt.timedelta(days=1)
+    while not is_trading_day(d):
+        d += dt.timedelta(days=1)
+    return d
+
+
+def trading_days_before(n: int, d: Optional[DateLike] = None) -> List[dt.date]:
+    """The n sessions strictly before d, newest first"""
+    out, cur = [], (now_et().date() if d is None else _date(d))
+    while len(out) < n:
+        cur = previous_trading_day(cur)
+        out.append(cur)
+    return out
+
+
+def current_session(now: Optional[dt.datetime] = None) -> dt.date:
+    """
+    Session that intraday data refers to: today once its pre-market has
+    opened, otherwise the last session that did trade.
+    """
+    now = now.astimezone(ET) if now is not None else now_et()
+    s = session(now.date())
+    if s is not None and now >= s.premarket_start:
+        return now.date()
+    return previous_trading_day(now.date())
+
+
+def market_phase(now: Optional[dt.datetime] = None) -> str:
+    """'premarket' | 'regular' | 'postmarket' | 'closed'"""
+    now = now.astimezone(ET) if now is not None else now_et()
+    s = session(now.date())
+    if s is None or now < s.premarket_start or now >= s.postmarket_end:
+        return "closed"
+    if now < s.open:
+        return "premarket"
+    if now < s.close:
+        return "regular"
+    return "postmarket"
+
+
+def session_is_final(d: DateLike, now: Optional[dt.datetime] = None) -> bool:
+    """True once a date's bars can no longer change (post-market over, or no session at all)"""
+    d = _date(d)
+    now = now.astimezone(ET) if now is not None else now_et()
+    if d < now.date():
+        return True
+    if d > now.date():
+        return False
+    s = session(d)
+    return s is None or now >= s.postmarket_end
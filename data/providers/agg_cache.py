@@ -0,0 +1,153 @@
+"""
+Polygon Aggregate Cache
+Persistent SQLite store for aggregates keyed by endpoint/symbol/date.
+Closed sessions never change, so they are kept forever; only the current
+session carries a TTL.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import datetime as dt
+from pathlib import Path
+from typing import Dict, List, Optional
+from data.market_calendar import ET, now_et, session_is_final
+
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_PATH = os.getenv("POLYGON_AGG_CACHE", str(ROOT / "data" / "cache" / "polygon_aggs.sqlite"))
+CURRENT_SESSION_TTL_S = float(os.getenv("POLYGON_CURRENT_SESSION_TTL", "300"))
+
+
+def session_is_closed(date_iso: str) -> bool:
+    """A session is final once its post-market has ended (ET); weekends and holidays always are"""
+    return session_is_final(date_iso, now_et())
+
+
+def bar_date(bar: dict) -> str:
+    """ET session date of a Polygon aggregate (t = window start, ms since epoch)"""
+    return dt.datetime.fromtimestamp(bar["t"] / 1000.0, ET).date().isoformat()
+
+
+def iter_dates(start_iso: str, end_iso: str):
+    d = dt.date.fromisoformat(start_iso)
+    end = dt.date.fromisoformat(end_iso)
+    while d <= end:
+        yield d.isoformat()
+        d += dt.timedelta(days=1)
+
+
+class AggCache:
+    """SQLite-backed aggregate cache shared by every process on the host"""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CURRENT_SESSION_TTL_S):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS aggs (
+                    endpoint TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    payload BLOB,
+                    expires_at REAL,
+                    PRIMARY KEY (endpoint, symbol, date)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _encode(payload) -> bytes:
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 1)
+
+    @staticmethod
+    def _decode(blob: bytes):
+        return json.loads(zlib.decompress(blob))
+
+    def _expiry(self, date_iso: str) -> Optional[float]:
+        return None if session_is_closed(date_iso) else time.time() + self.ttl
+
+    def get(self, endpoint: str, symbol: str, date_iso: str):
+        """Cached payload, or None when missing/expired"""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT payload, expires_at FROM aggs WHERE endpoint = ? AND symbol = ? AND date = ?",
+                (endpoint, symbol, date_iso),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return self._decode(row[0])
+
+    def put(self, endpoint: str, symbol: str, date_iso: str, payload):
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO aggs (endpoint, symbol, date, payload, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (endpoint, symbol, date_iso, self._encode(payload), self._expiry(date_iso)),
+            )
+            conn.commit()
+
+    def get_range(self, endpoint: str, symbol: str, start_iso: str, end_iso: str) -> Optional[List[dict]]:
+        """
+        Bars for every calendar day in [start, end], or None unless every day is cached.
+        Days with no bar (weekends, holidays) are stored as explicit empty markers.
+        """
+        dates = list(iter_dates(start_iso, end_iso))
+        if not dates:
+            return []
+        now = time.time()
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT date, payload, expires_at FROM aggs WHERE endpoint = ? AND symbol = ? AND date BETWEEN ? AND ?",
+                (endpoint, symbol, start_iso, end_iso),
+            ).fetchall()
+        valid = {d: p for d, p, exp in rows if exp is None or exp >= now}
+        if len(valid) < len(dates):
+            return None
+        out = []
+        for d in dates:
+            bar = self._decode(valid[d])
+            if bar is not None:
+                out.append(bar)
+        return out
+
+    def put_range(self, endpoint: str, symbol: str, start_iso: str, end_iso: str, bars: List[dict]):
+        """Store a fetched range: one row per calendar day, empty markers where no bar came back"""
+        by_date: Dict[str, dict] = {bar_date(b): b for b in bars}
+        rows = []
+        for d in iter_dates(start_iso, end_iso):
+            rows.append((endpoint, symbol, d, self._encode(by_date.get(d)), self._expiry(d)))
+        with self._lock:
+            conn = self._db()
+            conn.executemany(
+                "INSERT OR REPLACE INTO aggs (endpoint, symbol, date, payload, expires_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_agg_cache() -> Optional[AggCache]:
+    """Process-wide cache; None when POLYGON_AGG_CACHE_ENABLED=0"""
+    global _cache
+    if os.getenv("POLYGON_AGG_CACHE_ENABLED", "1") == "0":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AggCache()
+    return _cache
@@ -4,26 +4,42 @@ Includes Polygon API wrappers for full universe screening
 """
 
 import os
-import requests
-import time
-from typing import List, Dict, Optional
+import threading
 from collections import defaultdict
 
+import numpy as np
+
+from data.providers.polygon_client import get_client, polygon_url
+from data.market_calendar import current_session, is_trading_day
+from data.providers.agg_cache import get_agg_cache, iter_dates, session_is_closed
+from data.providers.instrumentation import REGISTRY, TRACE, inc, trace
+from data.providers.short_store import get_short_store
+from data.providers.splits import get_split_ledger
+
 POLYGON = os.getenv("POLYGON_API_KEY")
 
-# metrics counters (module-level)
+# legacy flat counters (module-level); richer series live in instrumentation.REGISTRY
 METRICS = defaultdict(int)
+_METRICS_LOCK = threading.Lock()
+
+def _count(key, n=1):
+    """Bump a legacy counter (thread-safe) and mirror it into the registry"""
+    with _METRICS_LOCK:
+        METRICS[key] += n
+    inc(key, n)
+
+# Polygon response statuses that carry real data ("DELAYED" on delayed-data plans)
+OK_STATUSES = ("OK", "DELAYED")
 
 def polygon_get(url, params=None):
-    """Polygon API GET with HTTP traces and metrics"""
-    import os, requests
-    key = (os.getenv("POLYGON_API_KEY") or "").strip()
-    headers = {"X-Polygon-API-Key": key} if key else {}
-    if "Authorization" in headers: headers.pop("Authorization", None)  # belt
-    print(f"[http-trace:polygon] GET {url} params={params or {}} keyLen={len(key)} tail={key[-4:] if key else ''}")
-    r = requests.get(url, headers=headers, params=params, timeout=10)
-    print(f"[http-resp:polygon] status={r.status_code} body[:120]={r.text[:120].replace(chr(10),' ')}")
-    METRICS[f"polygon_http_{r.status_code}"] += 1
+    """Polygon API GET with metrics (request traces only when POLYGON_TRACE=1)"""
+    if TRACE:
+        shown = {k: v for k, v in (params or {}).items() if k.lower() != "apikey"}
+        trace(f"[http-trace:polygon] GET {url} params={shown}")
+    r = get_client().request(url, params=params, timeout=10)
+    if TRACE:
+        trace(f"[http-resp:polygon] status={r.status_code} bytes={len(r.content)}")
+    _count(f"polygon_http_{r.status_code}")
     r.raise_for_status()
     return r.json()
 
@@ -32,54 +48,109 @@ def _get(url, params=None):
     try:
         return polygon_get(url, params)
     except Exception as e:
-        METRICS["polygon_live_fail"] += 1
+        _count("polygon_live_fail")
         print(f"[universe] live fetch failed: {e}; falling back immediately")
         return {}
 
 def list_tickers(limit=1000, exchanges=("XNYS","XNAS","XASE")):
     """
     Return active US common stocks (no ETFs/ETNs/warrants/rights/OTC).
-    Uses Polygon v3 reference tickers with pagination.
+    Reads the local reference snapshot, refreshed (diffed) at most once a day.
     """
-    if not POLYGON:
-        return []
-    out = []
-    url = "https://api.polygon.io/v3/reference/tickers"
-    params = {
-        "market": "stocks", "active": "true", "limit": 1000, "apiKey": POLYGON
-    }
-    next_url = url
-    while next_url:
-        j = _get(next_url, params)
-        results = (j or {}).get("results", [])
-        for r in results:
-            # filters
-            if r.get("primary_exchange") not in exchanges: 
-                continue
-            ttype = (r.get("type") or "").upper()
-            if ttype in ("ETF","ETN","FUND","RIGHT","WARRANT","ADRC","ADRR"):
-                continue
-            if r.get("locale") != "us":
-                continue
-            if r.get("currency_name") != "usd":
-                continue
-            if r.get("ticker", "").startswith("OTC:") or r.get("cik") == "OTC":
-                continue
-            out.append(r["ticker"])
-        next_url = (j or {}).get("next_url")
-        params = {"apiKey": POLYGON} if next_url else None
-    # de-dup
-    return sorted(list(dict.fromkeys(out)))
+    from data.providers.reference import refresh_reference, filter_common_stocks
+    return filter_common_stocks(refresh_reference(), exchanges)
 
 def grouped_daily(date_iso, include_otc=False):
     """
     Polygon grouped daily for all US stocks on a specific date (YYYY-MM-DD).
-    Returns list of {T, o,h,l,c,v} items; handles include_otc flag.
+    Returns list of {T, o,h,l,c,v} items, split-adjusted; handles include_otc flag.
+    Unadjusted bars are cached and adjusted on read, so later splits are applied.
     """
     if not POLYGON:
         return []
-    base = f"https://api.polygon.io/v2/aggs/grouped/locale/us/market/stocks/{date_iso}"
-    return _get(base, {"adjusted":"true","include_otc": str(include_otc).lower(), "apiKey": POLYGON}).get("results", [])
+    cache = get_agg_cache()
+    cache_key = "grouped_raw_otc" if include_otc else "grouped_raw"
+    if cache is not None:
+        hit = cache.get(cache_key, "*", date_iso)
+        if hit is not None:
+            inc("provider_cache_requests_total", cache="grouped", result="hit")
+            return get_split_ledger().adjust_results(hit, date_iso)
+        inc("provider_cache_requests_total", cache="grouped", result="miss")
+    base = polygon_url(f"/v2/aggs/grouped/locale/us/market/stocks/{date_iso}")
+    j = _get(base, {"adjusted":"false","include_otc": str(include_otc).lower(), "apiKey": POLYGON})
+    results = j.get("results", [])
+    # Only cache real answers: an empty dict means the fetch failed, and an empty
+    # list on a trading day means the data is not there yet
+    if cache is not None and j.get("status") in OK_STATUSES and (results or not is_trading_day(date_iso)):
+        cache.put(cache_key, "*", date_iso, results)
+    return get_split_ledger().adjust_results(results, date_iso)
+
+def grouped_daily_raw(date_iso, include_otc=False, adjusted=True):
+    """Undecoded grouped daily body (bytes) for one date; raises on HTTP failure (None without a key)"""
+    if not POLYGON:
+        return None
+    base = polygon_url(f"/v2/aggs/grouped/locale/us/market/stocks/{date_iso}")
+    params = {"adjusted": str(adjusted).lower(), "include_otc": str(include_otc).lower(), "apiKey": POLYGON}
+    r = get_client().request(base, params=params, timeout=10)
+    _count(f"polygon_http_{r.status_code}")
+    r.raise_for_status()
+    return r.content
+
+def _fetch_daily_range(symbol, start_iso, end_iso):
+    """One unadjusted Polygon range request; None on failure"""
+    url = polygon_url(f"/v2/aggs/ticker/{symbol}/range/1/day/{start_iso}/{end_iso}")
+    response = get_client().request(url, params={"adjusted": "false", "apikey": POLYGON}, timeout=10)
+    data = response.json()
+    if data.get("status") not in OK_STATUSES:
+        return None
+    return data.get("results") or []
+
+def daily_range(symbol, start_iso, end_iso):
+    """
+    Split-adjusted daily bars for [start, end] (inclusive ISO dates), oldest first.
+    Closed sessions come from the immutable aggregate cache, which holds
+    unadjusted bars; when only the current session is stale, just that tail is
+    re-fetched. Returns None on failure.
+    """
+    bars = _daily_range_raw(symbol, str(start_iso), str(end_iso))
+    return None if bars is None else get_split_ledger().adjust_bars(symbol, bars)
+
+def _daily_range_raw(symbol, start_iso, end_iso):
+    if not POLYGON:
+        return None
+    cache = get_agg_cache()
+    if cache is None:
+        return _fetch_daily_range(symbol, start_iso, end_iso)
+
+    hit = cache.get_range("day_raw", symbol, start_iso, end_iso)
+    if hit is not None:
+        inc("provider_cache_requests_total", cache="aggs_day", result="hit")
+        return hit
+    inc("provider_cache_requests_total", cache="aggs_day", result="miss")
+
+    import datetime as dt
+    # Split off the open tail: if the closed part is already cached, fetch only the tail
+    tail_start = dt.date.fromisoformat(end_iso)
+    while tail_start >= dt.date.fromisoformat(start_iso) and not session_is_closed(tail_start.isoformat()):
+        tail_start -= dt.timedelta(days=1)
+    tail_start += dt.timedelta(days=1)
+    closed_end = (tail_start - dt.timedelta(days=1)).isoformat()
+    if tail_start.isoformat() > start_iso and tail_start.isoformat() <= end_iso:
+        head = cache.get_range("day_raw", symbol, start_iso, closed_end)
+        if head is not None:
+            tail = _fetch_daily_range(symbol, tail_start.isoformat(), end_iso)
+            if tail is None:
+                return None
+            cache.put_range("day_raw", symbol, tail_start.isoformat(), end_iso, tail)
+            return head + tail
+
+    bars = _fetch_daily_range(symbol, start_iso, end_iso)
+    if bars is None:
+        return None
+    # A range of trading days with no bars at all may just not be published yet
+    if bars or not any(is_trading_day(d) for d in iter_dates(start_iso, end_iso)):
+        cache.put_range("day_raw", symbol, start_iso, end_iso, bars)
+    return bars
 
 def daily_bars(symbol, days=30):
     """Get daily bars from Polygon API (existing function)"""
@@ -92,16 +163,10 @@ def daily_bars(symbol, days=30):
         today = dt.datetime.now().date()
         start_date = today - dt.timedelta(days=days + 15)
         
-        url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{today}"
-        params = {"apikey": POLYGON}
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if data.get("status") == "OK" and data.get("results"):
-            bars = data["results"]
+        bars = daily_range(symbol, start_date.isoformat(), today.isoformat())
+        if bars:
             # Sort by timestamp and take most recent
-            bars.sort(key=lambda x: x['t'], reverse=True)
+            bars = sorted(bars, key=lambda x: x['t'], reverse=True)
             return bars[:days]
             
     except Exception as e:
@@ -115,32 +180,132 @@ def minute_bars(symbol):
         return None
     
     try:
-        import datetime as dt
-        today = dt.datetime.now().date()
-        url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/minute/{today}/{today}"
+        # Latest real session: today once pre-market opens, else the last day the market traded
+        day = current_session()
+        url = polygon_url(f"/v2/aggs/ticker/{symbol}/range/1/minute/{day}/{day}")
         params = {"apikey": POLYGON}
         
-        response = requests.get(url, params=params, timeout=5)
+        response = get_client().request(url, params=params, timeout=5)
         data = response.json()
         
         if data.get("status") == "OK" and data.get("results"):
             return data["results"]
             
-    except Exception as e:
+    except Exception:
         # Don't log minute bar failures - they're optional
         pass
         
     return None
 
+class MinuteBarsBatch:
+    """
+    Columnar minute bars for many symbols.
+    Rows for symbols[i] live at offsets[i]:offsets[i+1] in the t/v/c arrays (oldest first).
+    """
+
+    def __init__(self, symbols, offsets, t, v, c):
+        self.symbols = list(symbols)
+        self.offsets = offsets
+        self.t = t
+        self.v = v
+        self.c = c
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return self.count(symbol) > 0
+
+    def _span(self, symbol):
+        i = self._index.get(symbol)
+        if i is None:
+            return 0, 0
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def count(self, symbol) -> int:
+        """Number of minute bars held for symbol (0 if none)"""
+        lo, hi = self._span(symbol)
+        return hi - lo
+
+    def timestamps(self, symbol) -> np.ndarray:
+        lo, hi = self._span(symbol)
+        return self.t[lo:hi]
+
+    def volumes(self, symbol) -> np.ndarray:
+        lo, hi = self._span(symbol)
+        return self.v[lo:hi]
+
+    def prices(self, symbol) -> np.ndarray:
+        lo, hi = self._span(symbol)
+        return self.c[lo:hi]
+
+def minute_bars_many(symbols) -> MinuteBarsBatch:
+    """Fetch the current session's minute bars for many symbols concurrently into one columnar batch"""
+    symbols = list(dict.fromkeys(symbols))
+    results = get_client().map(minute_bars, symbols) if POLYGON else [None] * len(symbols)
+
+    counts = np.zeros(len(symbols) + 1, dtype=np.int64)
+    for i, bars in enumerate(results):
+        counts[i + 1] = len(bars) if bars else 0
+    offsets = np.cumsum(counts)
+
+    n = int(offsets[-1])
+    t = np.empty(n, dtype=np.int64)
+    v = np.empty(n, dtype=np.float64)
+    c = np.empty(n, dtype=np.float64)
+    for i, bars in enumerate(results):
+        if not bars:
+            continue
+        lo, hi = offsets[i], offsets[i + 1]
+        t[lo:hi] = [b.get("t", 0) for b in bars]
+        v[lo:hi] = [b.get("v", 0) or 0 for b in bars]
+        c[lo:hi] = [b.get("c", np.nan) for b in bars]
+    return MinuteBarsBatch(symbols, offsets, t, v, c)
+
 def short_metrics(symbol):
-    """Get short interest and borrow fee data (placeholder for now)"""
-    # This would connect to your existing short interest data sources
-    # For now, return None to indicate no data available
-    return None
+    """
+    Short interest / borrow data from the local short store (O(1), no network).
+    Percent fields are returned as fractions; None when the symbol is unknown.
+    """
+    try:
+        r = get_short_store().row(symbol)
+    except Exception as e:
+        _count("short_store_fail")
+        trace(f"[short_store] lookup failed: {e}")
+        return None
+    inc("provider_cache_requests_total", cache="short_store", result="hit" if r else "miss")
+    if r is None:
+        return None
 
-def get_metrics():
-    """Export metrics for monitoring"""
-    return dict(METRICS)
+    def frac(v):
+        return v / 100.0 if v is not None else None
+
+    return {
+        "short_interest": frac(r["short_interest_pct"]),
+        "short_shares": r["short_interest_shares"],
+        "days_to_cover": r["days_to_cover"],
+        "borrow_fee": frac(r["borrow_fee_pct"]),
+        "borrow_fee_trend_pp7d": r["borrow_fee_trend_pp7d"],
+        "utilization": frac(r["utilization_pct"]),
+        "avg_dollar_liquidity_30d": r["avg_dollar_liquidity_30d"],
+        "adv_30d_shares": r["adv_30d_shares"],
+        "short_volume_ratio_5d": r["svr_5d"],
+        "short_volume_ratio_20d": r["svr_20d"],
+    }
+
+def get_metrics(fmt="flat"):
+    """
+    Export metrics for monitoring: the legacy flat counter dict by default,
+    the registry snapshot (counters, histograms) with fmt="registry", or
+    Prometheus text with fmt="prometheus"
+    """
+    if fmt == "prometheus":
+        return REGISTRY.prometheus()
+    if fmt == "registry":
+        return REGISTRY.snapshot()
+    with _METRICS_LOCK:
+        return dict(METRICS)
 
 def print_metrics():
     """Print metrics in standard format for log parsing"""
@@ -0,0 +1,90 @@
+"""
+Polygon Cassettes
+Record live provider responses to a directory and replay them offline with
+injected latency, so pipeline timing can be measured without network noise.
+
+  POLYGON_MODE=record  POLYGON_CASSETTE_DIR=data/cassettes  -> live calls, responses saved
+  POLYGON_MODE=replay  POLYGON_CASSETTE_DIR=data/cassettes  -> no network, served from disk
+  POLYGON_REPLAY_LATENCY_MS / POLYGON_REPLAY_JITTER_MS      -> per-request delay in replay
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+ROOT = Path(__file__).resolve().parents[2]
+CASSETTE_DIR = os.getenv("POLYGON_CASSETTE_DIR", str(ROOT / "data" / "cassettes"))
+SECRET_PARAMS = {"apikey", "apiKey"}
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+def request_key(url: str, params: Optional[dict] = None) -> str:
+    """Stable key for a request: path + sorted query (host and API key excluded)"""
+    parts = urlsplit(url)
+    query = [(k, str(v)) for k, v in parse_qsl(parts.query)]
+    query += [(k, str(v)) for k, v in (params or {}).items() if v is not None]
+    query = sorted((k, v) for k, v in query if k not in SECRET_PARAMS)
+    raw = parts.path + "?" + "&".join(f"{k}={v}" for k, v in query)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class Cassette:
+    """Directory of recorded responses, one JSON file per request key"""
+
+    def __init__(self, root: str = CASSETTE_DIR):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def record(self, url: str, params: Optional[dict], response: requests.Response):
+        key = request_key(url, params)
+        p = self.path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "path": urlsplit(url).path,
+            "params": {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+            "status": response.status_code,
+            "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            "body": response.text,
+        }
+        tmp = p.with_name(f".{p.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, p)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        p = self.path(key)
+        if not p.exists():
+            return None
+        return json.loads(p.read_text())
+
+    def response(self, url: str, params: Optional[dict] = None) -> requests.Response:
+        """Recorded response as a requests.Response (404 when the request was never recorded)"""
+        entry = self.lookup(request_key(url, params))
+        if entry is None:
+            entry = {"status": 404, "headers": {"Content-Type": "application/json"},
+                     "body": json.dumps({"status": "NOT_RECORDED", "error": "request not in cassette"})}
+        r = requests.Response()
+        r.status_code = entry["status"]
+        r.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        r._content = entry["body"].encode()
+        r.encoding = "utf-8"
+        r.url = url
+        return r
+
+
+def replay_delay():
+    """Sleep for the configured replay latency (mean +/- uniform jitter)"""
+    latency = float(os.getenv("POLYGON_REPLAY_LATENCY_MS", "0"))
+    jitter = float(os.getenv("POLYGON_REPLAY_JITTER_MS", "0"))
+    delay = max(0.0, latency + (random.uniform(-jitter, jitter) if jitter else 0.0))
+    if delay:
+        time.sleep(delay / 1000.0)
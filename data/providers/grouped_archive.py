@@ -0,0 +1,261 @@
+"""
+Grouped Daily Archive
+Append-only store of Polygon grouped daily bars, one parquet file per session.
+Closed sessions are fetched once, unadjusted, and split-adjusted on read (see
+data.providers.splits), so a later split never leaves stale prices on disk.
+Exchange holidays are archived as empty files so they are never requested
+again; an empty answer for a trading day is not archived. Responses are decoded straight into Arrow columns
+and symbols are interned to integer ids, so no per-bar Python dicts are built.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+from data.market_calendar import is_trading_day
+from data.providers.agg_cache import session_is_closed
+from data.providers.instrumentation import inc
+from data.providers.splits import get_split_ledger
+
+ROOT = Path(__file__).resolve().parents[2]
+# Unadjusted sessions; the earlier grouped_daily/ directory held adjusted bars and is not read
+ARCHIVE_DIR = Path(os.getenv("GROUPED_ARCHIVE_DIR", str(ROOT / "data" / "archive" / "grouped_daily_raw")))
+
+BAR_COLUMNS = ["T", "o", "h", "l", "c", "v"]
+SCHEMA = pa.schema([
+    ("T", pa.string()),
+    ("o", pa.float64()),
+    ("h", pa.float64()),
+    ("l", pa.float64()),
+    ("c", pa.float64()),
+    ("v", pa.float64()),
+])
+
+
+def bars_to_table(results: List[dict]) -> pa.Table:
+    """Polygon grouped results -> archive table (only the columns the builder uses)"""
+    if not results:
+        return SCHEMA.empty_table()
+    df = pd.DataFrame(results)
+    for col in BAR_COLUMNS:
+        if col not in df:
+            df[col] = None
+    return pa.Table.from_pandas(df[BAR_COLUMNS], schema=SCHEMA, preserve_index=False)
+
+
+_RESULTS_START = re.compile(rb'"results"\s*:\s*\[')
+_ITEM_SEP = re.compile(rb"\}\s*,\s*\{")
+_PARSE = pa_json.ParseOptions(explicit_schema=SCHEMA, unexpected_field_behavior="ignore")
+
+
+def decode_grouped(body: bytes) -> Tuple[dict, pa.Table]:
+    """
+    Raw grouped daily body -> (envelope without results, archive table).
+    The flat results array is rewritten as NDJSON and parsed by Arrow into typed
+    columns; anything unexpected falls back to json.loads.
+    """
+    m = _RESULTS_START.search(body)
+    if m is not None:
+        end = body.find(b"]", m.end())
+        try:
+            envelope = json.loads(body[:m.end()] + body[end:])
+            items = body[m.end():end].strip()
+            if not items:
+                return envelope, SCHEMA.empty_table()
+            table = pa_json.read_json(io.BytesIO(_ITEM_SEP.sub(b"}\n{", items)), parse_options=_PARSE)
+            return envelope, table.select(BAR_COLUMNS).cast(SCHEMA)
+        except (ValueError, pa.ArrowException):
+            pass
+    j = json.loads(body)
+    return j, bars_to_table(j.pop("results", None) or [])
+
+
+class SymbolIndex:
+    """Fixed symbol vocabulary; maps Arrow ticker columns to int32 ids (-1 = not in universe)"""
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols = sorted(set(symbols))
+        self._values = pa.array(self.symbols, pa.string())
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def ids(self, tickers: pa.ChunkedArray) -> np.ndarray:
+        idx = pc.index_in(tickers, value_set=self._values)
+        return idx.fill_null(-1).to_numpy().astype(np.int32, copy=False)
+
+
+class GroupedDailyArchive:
+    """Date-partitioned archive of unadjusted sessions: <root>/<YYYY-MM-DD>.parquet"""
+
+    def __init__(self, root: Path = ARCHIVE_DIR, include_otc: bool = False, splits=None):
+        self.root = Path(root)
+        self.include_otc = include_otc
+        self._splits = splits
+
+    @property
+    def splits(self):
+        if self._splits is None:
+            self._splits = get_split_ledger()
+        return self._splits
+
+    def adjusted(self, table: pa.Table, date_iso: str) -> pa.Table:
+        """A stored (unadjusted) session with every later split applied"""
+        return self.splits.adjust_table(table, date_iso)
+
+    def path(self, date_iso: str) -> Path:
+        return self.root / f"{date_iso}.parquet"
+
+    def has(self, date_iso: str) -> bool:
+        return self.path(date_iso).exists()
+
+    def sessions(self) -> List[str]:
+        """Archived session dates (including empty holiday markers), oldest first"""
+        if not self.root.exists():
+            return []
+        return sorted(p.stem for p in self.root.glob("*.parquet"))
+
+    def write(self, date_iso: str, table: pa.Table):
+        """Atomically publish one session; existing sessions are never rewritten"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        final = self.path(date_iso)
+        tmp = final.with_name(f".{final.name}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, final)
+
+    def fetch(self, date_iso: str) -> Optional[pa.Table]:
+        """
+        Download one unadjusted session; archived only if the session is closed.
+        None on failure, and for an empty answer on a trading day (data not there yet).
+        """
+        from data.providers.alpha_providers import OK_STATUSES, grouped_daily_raw
+        if not is_trading_day(date_iso) and session_is_closed(date_iso):
+            table = SCHEMA.empty_table()  # exchange closed: archive the empty session without a request
+            self.write(date_iso, table)
+            return table
+        try:
+            body = grouped_daily_raw(date_iso, self.include_otc, adjusted=False)
+            if body is None:
+                return None
+            envelope, table = decode_grouped(body)
+            if envelope.get("status") not in OK_STATUSES:
+                raise RuntimeError(f"status={envelope.get('status')}")
+        except Exception as e:
+            print(f"[archive] grouped {date_iso} fetch failed: {e}", file=sys.stderr)
+            return None
+        if table.num_rows == 0:
+            print(f"[archive] grouped {date_iso} came back empty on a trading day; not archived", file=sys.stderr)
+            return None
+        if session_is_closed(date_iso):
+            self.write(date_iso, table)
+        return table
+
+    def missing(self, dates: Iterable[str]) -> List[str]:
+        dates = list(dates)
+        out = [d for d in dates if not self.has(d)]
+        inc("provider_cache_requests_total", len(dates) - len(out), cache="grouped_archive", result="hit")
+        inc("provider_cache_requests_total", len(out), cache="grouped_archive", result="miss")
+        return out
+
+    def sync(self, dates: Iterable[str]) -> dict:
+        """
+        Fetch only sessions not yet on disk; returns {date: table} for what was fetched.
+        Sessions download concurrently on the shared client pool (bounded by its
+        concurrency limit and the rate governor); each worker decodes and archives
+        its session as soon as it lands, overlapping parsing with the other downloads.
+        """
+        from data.providers.polygon_client import get_client
+        todo = self.missing(dates)
+        if not todo:
+            return {}
+        tables = get_client().map(self.fetch, todo)
+        return {d: t for d, t in zip(todo, tables) if t is not None}
+
+    def _session(self, date_iso: str, live: Optional[dict]) -> Optional[pa.Table]:
+        """One session, split-adjusted (live = {date: table} just fetched by sync())"""
+        if live and date_iso in live:
+            return self.adjusted(live[date_iso], date_iso)
+        if self.has(date_iso):
+            return self.adjusted(pq.read_table(self.path(date_iso), schema=SCHEMA), date_iso)
+        return None
+
+    def session_columns(self, date_iso: str, index: SymbolIndex, live: Optional[dict] = None,
+                        dtype=np.float64) -> Optional[Dict[str, np.ndarray]]:
+        """One session as typed arrays (sym id, o/h/l/c/v as dtype) for the index's symbols; None if not available"""
+        t = self._session(date_iso, live)
+        return None if t is None else self._columns(t, index, dtype)
+
+    @staticmethod
+    def _columns(t: pa.Table, index: SymbolIndex, dtype) -> Dict[str, np.ndarray]:
+        ids = index.ids(t.column("T")) if t.num_rows else np.empty(0, np.int32)
+        keep = ids >= 0
+        out = {"sym": ids[keep]}
+        for col in BAR_COLUMNS[1:]:
+            out[col] = t.column(col).to_numpy()[keep].astype(dtype, copy=False) if t.num_rows else np.empty(0, dtype)
+        return out
+
+    def read_columns(self, dates: List[str], index: SymbolIndex, live: Optional[dict] = None,
+                     dtype=np.float64) -> Dict[str, np.ndarray]:
+        """
+        Window as flat typed arrays restricted to the index's symbols:
+        sym (int32 id), day (int16 position in dates), o/h/l/c/v (float64, or float32 for lean builds).
+        """
+        parts = {k: [] for k in ["sym", "day"] + BAR_COLUMNS[1:]}
+        for i, d in enumerate(dates):
+            cols = self.session_columns(d, index, live, dtype)
+            if cols is None or not len(cols["sym"]):
+                continue
+            parts["day"].append(np.full(len(cols["sym"]), i, dtype=np.int16))
+            for k, v in cols.items():
+                parts[k].append(v)
+        empty = {"sym": np.int32, "day": np.int16}
+        return {k: (np.concatenate(v) if v else np.empty(0, empty.get(k, dtype))) for k, v in parts.items()}
+
+    def stream(self, dates: List[str], index: SymbolIndex, dtype=np.float64,
+               todo: Optional[List[str]] = None) -> Iterator[Tuple[int, str, Optional[Dict[str, np.ndarray]]]]:
+        """
+        Yield (position in dates, date, session columns) as each session becomes
+        available. Missing sessions (`todo`, default self.missing(dates)) start
+        downloading on the client pool first and are decoded by the worker that
+        fetched them; archived sessions are read while those requests are in
+        flight, then downloads are yielded in completion order. Columns are None
+        for a session that could not be fetched.
+        """
+        from data.providers.polygon_client import get_client
+        todo = self.missing(dates) if todo is None else list(todo)
+        pos = {d: i for i, d in enumerate(dates)}
+
+        def download(d):
+            t = self.fetch(d)
+            return None if t is None else self._columns(self.adjusted(t, d), index, dtype)
+
+        pending = get_client().imap_unordered(download, todo) if todo else iter(())
+        remote = set(todo)
+        for d in dates:
+            if d not in remote:
+                yield pos[d], d, self.session_columns(d, index, dtype=dtype)
+        for d, cols in pending:
+            yield pos[d], d, cols
+
+    def read(self, dates: Iterable[str], live: Optional[dict] = None) -> pd.DataFrame:
+        """Load the window as one frame with a 'date' column (sessions with no bars are skipped)"""
+        tables = []
+        for d in dates:
+            t = self._session(d, live)
+            if t is None or t.num_rows == 0:
+                continue
+            tables.append(t.append_column("date", pa.array([d] * t.num_rows, pa.string())))
+        if not tables:
+            return pd.DataFrame(columns=BAR_COLUMNS + ["date"])
+        return pa.concat_tables(tables).to_pandas()
@@ -0,0 +1,144 @@
+"""
+Provider Instrumentation
+Thread-safe counters, gauges and fixed-bucket latency histograms for the
+Polygon client and caches, exportable as JSON or Prometheus text.
+Request tracing is off the hot path unless POLYGON_TRACE=1.
+"""
+
+import os
+import sys
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+TRACE = os.getenv("POLYGON_TRACE", "0") == "1"
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    """Label value escaped for the Prometheus text format (backslash, quote, newline)"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Cumulative-on-export histogram over fixed upper bounds"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(list(self.bounds) + ["+Inf"], self.counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": round(self.sum, 3), "count": self.count}
+
+
+class Registry:
+    """One lock guards every update; each update is a dict lookup plus an add"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self.counters[name][key] += value
+
+    def gauge_add(self, name: str, delta: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self.gauges[name][key] += delta
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            h = self.histograms[name].get(key)
+            if h is None:
+                h = self.histograms[name][key] = Histogram()
+            h.observe(value)
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view: {kind: {name: [{labels, value|histogram}]}}"""
+        with self._lock:
+            return {
+                "counters": {n: [{"labels": dict(k), "value": v} for k, v in s.items()] for n, s in self.counters.items()},
+                "gauges": {n: [{"labels": dict(k), "value": v} for k, v in s.items()] for n, s in self.gauges.items()},
+                "histograms": {n: [{"labels": dict(k), **h.to_dict()} for k, h in s.items()] for n, s in self.histograms.items()},
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        def fmt(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(key) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines += [f"{name}{fmt(k)} {v:g}" for k, v in series.items()]
+            for name, series in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines += [f"{name}{fmt(k)} {v:g}" for k, v in series.items()]
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for k, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip(list(h.bounds) + ["+Inf"], h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{fmt(k, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(k)} {h.sum:g}")
+                    lines.append(f"{name}_count{fmt(k)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+gauge_add = REGISTRY.gauge_add
+observe = REGISTRY.observe
+
+
+def endpoint_label(url: str) -> str:
+    """Low-cardinality endpoint name for a Polygon URL (symbols and dates dropped)"""
+    path = urlsplit(url).path
+    if "/aggs/grouped/" in path:
+        return "grouped_daily"
+    if "/aggs/ticker/" in path:
+        if "/range/1/minute/" in path:
+            return "aggs_minute"
+        if "/range/1/day/" in path:
+            return "aggs_day"
+        return "aggs_other"
+    if path.startswith("/v3/reference/tickers"):
+        return "reference_tickers" if path.rstrip("/") == "/v3/reference/tickers" else "reference_ticker_detail"
+    parts = [p for p in path.split("/") if p]
+    return "_".join(parts[:2]) or "root"
+
+
+def trace(msg: str):
+    """Request trace line (only when POLYGON_TRACE=1)"""
+    if TRACE:
+        print(msg, file=sys.stderr)
@@ -0,0 +1,188 @@
+"""
+Polygon HTTP Client
+Shared keep-alive session with bounded concurrency for every provider call.
+POLYGON_MODE=record|replay captures/serves responses via data.providers.cassette.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data.providers.rate_governor import get_governor, retry_after_seconds
+from data.providers.cassette import Cassette, replay_delay
+from data.providers.instrumentation import endpoint_label, gauge_add, inc, observe
+
+POLYGON_HOST = "https://api.polygon.io"
+MAX_CONCURRENCY = int(os.getenv("POLYGON_MAX_CONCURRENCY", "16"))
+DEFAULT_TIMEOUT = float(os.getenv("POLYGON_TIMEOUT", "10"))
+MAX_429_RETRIES = int(os.getenv("POLYGON_MAX_429_RETRIES", "4"))
+
+
+def polygon_url(path_or_url: str) -> str:
+    """
+    Absolute URL on the configured Polygon base (POLYGON_BASE_URL, e.g. a local
+    stand-in server). Absolute api.polygon.io URLs such as next_url are rewritten too.
+    """
+    base = (os.getenv("POLYGON_BASE_URL") or POLYGON_HOST).rstrip("/")
+    if path_or_url.startswith(POLYGON_HOST):
+        return base + path_or_url[len(POLYGON_HOST):]
+    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
+        return path_or_url
+    return base + "/" + path_or_url.lstrip("/")
+
+
+class PolygonClient:
+    """Pooled Polygon client: one TCP/TLS connection pool shared by sync and asyncio callers"""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT, governor=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.mode = (os.getenv("POLYGON_MODE") or "live").lower()  # live | record | replay
+        self.cassette = Cassette() if self.mode in ("record", "replay") else None
+        self.governor = None if self.mode == "replay" else (governor if governor is not None else get_governor())
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _headers(self) -> dict:
+        key = (os.getenv("POLYGON_API_KEY") or "").strip()
+        return {"X-Polygon-API-Key": key} if key else {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool sized to the concurrency bound (created on first use)"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix="polygon"
+                    )
+        return self._executor
+
+    def _governed(self, fn, *args):
+        """Call a governor method; a broken quota file must never take the scan down"""
+        if self.governor is None:
+            return
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"[polygon] rate governor unavailable ({e}); continuing ungoverned", file=sys.stderr)
+            self.governor = None
+
+    def request(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> requests.Response:
+        """
+        Blocking GET over the shared pool; at most max_concurrency requests are in flight.
+        Each attempt takes a token from the host-wide governor; 429s back off and retry.
+        """
+        url = polygon_url(url)
+        endpoint = endpoint_label(url)
+        attempt = 0
+        while True:
+            if self.governor is not None:
+                t_wait = time.perf_counter()
+                self._governed(self.governor.acquire)
+                observe("polygon_quota_wait_ms", (time.perf_counter() - t_wait) * 1000.0, endpoint=endpoint)
+            with self._slots:
+                gauge_add("polygon_inflight_requests", 1, endpoint=endpoint)
+                t0 = time.perf_counter()
+                try:
+                    if self.mode == "replay":
+                        replay_delay()
+                        r = self.cassette.response(url, params)
+                    else:
+                        r = self.session.get(
+                            url, headers=self._headers(), params=params, timeout=timeout or self.timeout
+                        )
+                except Exception:
+                    inc("polygon_request_errors_total", endpoint=endpoint)
+                    raise
+                finally:
+                    gauge_add("polygon_inflight_requests", -1, endpoint=endpoint)
+            observe("polygon_request_latency_ms", (time.perf_counter() - t0) * 1000.0, endpoint=endpoint)
+            inc("polygon_http_responses_total", endpoint=endpoint, status=r.status_code)
+            inc("polygon_response_bytes_total", len(r.content), endpoint=endpoint)
+            if r.status_code != 429 or self.mode == "replay":
+                if self.governor is not None:
+                    self._governed(self.governor.success)
+                if self.mode == "record":
+                    self.cassette.record(url, params, r)
+                return r
+            attempt += 1
+            inc("polygon_retries_total", endpoint=endpoint)
+            if self.governor is not None:
+                self._governed(self.governor.penalize, retry_after_seconds(r))
+            if attempt > MAX_429_RETRIES:
+                return r
+            if self.governor is None:
+                time.sleep(retry_after_seconds(r) or min(30.0, 2.0 ** attempt))
+
+    def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        """GET and decode JSON, raising on HTTP errors"""
+        r = self.request(url, params, timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def map(self, fn: Callable, items: Iterable) -> list:
+        """Run fn over items on the client pool, preserving input order"""
+        return list(self.executor.map(fn, items))
+
+    def imap_unordered(self, fn: Callable, items: Iterable) -> Iterator[Tuple[Any, Any]]:
+        """Submit fn over items on the client pool right away; iterate (item, result) as each completes"""
+        futures = {self.executor.submit(fn, item): item for item in items}
+
+        def completed():
+            for f in as_completed(futures):
+                yield futures[f], f.result()
+        return completed()
+
+    def get_many(self, reqs: Iterable[Tuple[str, Optional[dict]]], timeout: Optional[float] = None) -> List:
+        """Concurrent get_json for (url, params) pairs; failed requests come back as the exception"""
+        def one(req):
+            url, params = req
+            try:
+                return self.get_json(url, params, timeout)
+            except Exception as e:
+                return e
+        return self.map(one, list(reqs))
+
+    async def aget_json(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        """Asyncio-facing get_json; the request runs on the pooled executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: self.get_json(url, params, timeout))
+
+    async def aget_many(self, reqs: Iterable[Tuple[str, Optional[dict]]], timeout: Optional[float] = None) -> List:
+        """Asyncio-facing get_many; exceptions are returned in place of results"""
+        tasks = [self.aget_json(url, params, timeout) for url, params in reqs]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """Release pooled connections and worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> PolygonClient:
+    """Process-wide shared client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PolygonClient()
+    return _client
@@ -0,0 +1,157 @@
+"""
+Polygon Rate Governor
+Host-wide token bucket shared by every Python process through one SQLite file,
+with 429-aware adaptive backoff
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+QUOTA_DB = os.getenv("POLYGON_QUOTA_DB", "/tmp/polygon_quota.sqlite")
+RATE_PER_SEC = float(os.getenv("POLYGON_RATE_PER_SEC", "25"))
+BURST = float(os.getenv("POLYGON_RATE_BURST", "50"))
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 60.0
+MIN_RATE_FACTOR = 0.1
+
+
+class RateGovernor:
+    """
+    Token bucket stored in SQLite so concurrent screeners/builders share one quota.
+    BEGIN IMMEDIATE serialises refill+take across processes; a 429 halves the
+    effective rate for everyone and blocks the bucket until the server's Retry-After.
+    """
+
+    def __init__(self, path: str = QUOTA_DB, rate: float = RATE_PER_SEC, burst: float = BURST, name: str = "polygon"):
+        self.path = path
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.name = name
+        self._lock = threading.Lock()
+        self._conn = None
+        self._degraded = False  # last seen state, lets success() skip a write when healthy
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bucket (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    backoff REAL NOT NULL DEFAULT 0,
+                    factor REAL NOT NULL DEFAULT 1
+                )
+            """)
+            conn.execute(
+                "INSERT OR IGNORE INTO bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                (self.name, self.burst, time.time()),
+            )
+            self._conn = conn
+        return self._conn
+
+    def _txn(self, fn):
+        """Run fn(conn, row, now) inside one exclusive transaction"""
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated, blocked_until, backoff, factor FROM bucket WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                out = fn(conn, row, time.time())
+                conn.execute("COMMIT")
+                return out
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def try_acquire(self) -> float:
+        """Take one token if available; returns 0 on success, else seconds to wait"""
+        def take(conn, row, now):
+            tokens, updated, blocked_until, backoff, factor = row
+            self._degraded = factor < 1.0 or backoff > 0
+            rate = self.rate * factor
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * rate)
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate
+            conn.execute(
+                "UPDATE bucket SET tokens = ?, updated = ? WHERE name = ?", (tokens, now, self.name)
+            )
+            return wait
+        return self._txn(take)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is granted (or timeout elapses)"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Record a 429: block every process until Retry-After (or exponential backoff) and halve the rate"""
+        def hit(conn, row, now):
+            _, _, blocked_until, backoff, factor = row
+            backoff = min(BACKOFF_MAX_S, backoff * 2 if backoff else BACKOFF_BASE_S)
+            delay = retry_after if retry_after and retry_after > 0 else backoff
+            conn.execute(
+                "UPDATE bucket SET tokens = 0, updated = ?, blocked_until = ?, backoff = ?, factor = ? WHERE name = ?",
+                (now, max(blocked_until, now + delay), backoff, max(MIN_RATE_FACTOR, factor * 0.5), self.name),
+            )
+            self._degraded = True
+        self._txn(hit)
+
+    def success(self):
+        """Record a successful call: recover the rate additively once throttling has eased"""
+        if not self._degraded:
+            return
+        def ok(conn, row, now):
+            _, _, _, backoff, factor = row
+            factor = min(1.0, factor + 0.05)
+            conn.execute(
+                "UPDATE bucket SET backoff = 0, factor = ? WHERE name = ?", (factor, self.name)
+            )
+            self._degraded = factor < 1.0
+        self._txn(ok)
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Parse a numeric Retry-After header"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> Optional[RateGovernor]:
+    """Process-wide governor; None when POLYGON_RATE_GOVERNOR=0"""
+    global _governor
+    if os.getenv("POLYGON_RATE_GOVERNOR", "1") == "0":
+        return None
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = RateGovernor()
+    return _governor
@@ -0,0 +1,185 @@
+"""
+Reference Ticker Universe
+Daily snapshot of Polygon /v3/reference/tickers kept as a compact parquet file.
+A refresh diffs the active listing against the snapshot: new listings are
+appended (and enriched with sector / market cap), vanished ones are marked
+delisted, and everything else is kept as-is.
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from data.market_calendar import now_et
+
+ROOT = Path(__file__).resolve().parents[2]
+REF_DIR = Path(os.getenv("REFERENCE_DIR", str(ROOT / "data" / "reference")))
+SNAPSHOT = REF_DIR / "tickers.parquet"
+META = REF_DIR / "tickers_meta.json"
+DETAIL_MAX = int(os.getenv("REFERENCE_DETAIL_MAX", "500"))  # detail lookups per refresh (backfill spreads over days)
+
+LIST_FIELDS = ["ticker", "name", "type", "primary_exchange", "locale", "currency_name", "cik", "market"]
+DETAIL_FIELDS = ["sector", "market_cap", "shares_outstanding"]
+COLUMNS = LIST_FIELDS + DETAIL_FIELDS + ["active", "first_seen", "last_seen", "delisted_on", "details_asof"]
+EXCLUDED_TYPES = ("ETF", "ETN", "FUND", "RIGHT", "WARRANT", "ADRC", "ADRR")
+
+
+def today_iso() -> str:
+    return now_et().date().isoformat()
+
+
+def read_meta() -> dict:
+    try:
+        return json.loads(META.read_text())
+    except Exception:
+        return {}
+
+
+def load_reference(active_only: bool = True) -> pd.DataFrame:
+    """Snapshot as a DataFrame (empty frame with the snapshot columns if none yet)"""
+    if not SNAPSHOT.exists():
+        return pd.DataFrame(columns=COLUMNS)
+    df = pd.read_parquet(SNAPSHOT)
+    return df[df["active"]].reset_index(drop=True) if active_only else df
+
+
+def _write(df: pd.DataFrame, meta: dict):
+    REF_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = SNAPSHOT.with_name(f".{SNAPSHOT.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, SNAPSHOT)
+    tmp = META.with_name(f".{META.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, META)
+
+
+def _fetch_active_listing() -> Optional[pd.DataFrame]:
+    """Paginate active stock listings (list fields only); None if any page fails"""
+    from data.providers.alpha_providers import POLYGON, polygon_get
+    from data.providers.polygon_client import polygon_url
+    rows = []
+    url = polygon_url("/v3/reference/tickers")
+    params = {"market": "stocks", "active": "true", "limit": 1000, "apiKey": POLYGON}
+    try:
+        while url:
+            j = polygon_get(url, params)
+            for r in j.get("results", []):
+                rows.append({f: r.get(f) for f in LIST_FIELDS})
+            url = j.get("next_url")
+            params = {"apiKey": POLYGON} if url else None
+    except Exception as e:
+        print(f"[reference] listing refresh failed: {e}", file=sys.stderr)
+        return None
+    df = pd.DataFrame(rows, columns=LIST_FIELDS)
+    return df.drop_duplicates(subset=["ticker"]).reset_index(drop=True)
+
+
+def _fetch_details(tickers: List[str]) -> Dict[str, dict]:
+    """Sector / market cap / shares for a batch of tickers, fetched concurrently"""
+    from data.providers.alpha_providers import POLYGON, polygon_get
+    from data.providers.polygon_client import get_client, polygon_url
+
+    def one(t):
+        try:
+            r = polygon_get(polygon_url(f"/v3/reference/tickers/{t}"), {"apiKey": POLYGON}).get("results") or {}
+        except Exception:
+            return t, None
+        return t, {
+            "sector": r.get("sic_description"),
+            "market_cap": r.get("market_cap"),
+            "shares_outstanding": r.get("weighted_shares_outstanding") or r.get("share_class_shares_outstanding"),
+        }
+
+    return {t: d for t, d in get_client().map(one, tickers) if d is not None}
+
+
+def refresh_reference(force: bool = False) -> pd.DataFrame:
+    """Bring the snapshot up to today by diffing listings; returns all rows (active and delisted)"""
+    from data.providers.alpha_providers import POLYGON
+    today = today_iso()
+    meta = read_meta()
+    snap = load_reference(active_only=False)
+    if not POLYGON or (not force and meta.get("as_of") == today and len(snap)):
+        return snap
+
+    listing = _fetch_active_listing()
+    if listing is None:
+        return snap  # keep yesterday's snapshot rather than mark everything delisted
+
+    known = set(snap["ticker"]) if len(snap) else set()
+    live = set(listing["ticker"])
+    adds = listing[~listing["ticker"].isin(known)].copy()
+    for c in DETAIL_FIELDS + ["delisted_on", "details_asof"]:
+        adds[c] = None
+    adds["active"] = True
+    adds["first_seen"] = today
+    adds["last_seen"] = today
+
+    if len(snap):
+        snap = snap.copy()
+        still = snap["ticker"].isin(live)
+        relisted = still & ~snap["active"]
+        delisted = ~still & snap["active"]
+        snap.loc[still, "last_seen"] = today
+        snap.loc[relisted, "active"] = True
+        snap.loc[relisted, "delisted_on"] = None
+        snap.loc[delisted, "active"] = False
+        snap.loc[delisted, "delisted_on"] = today
+        n_delisted = int(delisted.sum())
+        df = pd.concat([snap, adds[COLUMNS]], ignore_index=True)
+    else:
+        n_delisted = 0
+        df = adds[COLUMNS].reset_index(drop=True)
+
+    # Enrich new listings first, then backfill older rows still lacking details
+    need = df[df["active"] & df["details_asof"].isna()]
+    is_new = need["ticker"].isin(adds["ticker"])
+    todo = pd.concat([need[is_new], need[~is_new]])["ticker"].tolist()[:DETAIL_MAX]
+    if todo:
+        details = _fetch_details(todo)
+        pos = {t: i for i, t in enumerate(df["ticker"])}
+        for t, d in details.items():
+            i = pos[t]
+            for k, v in d.items():
+                df.at[i, k] = v
+            df.at[i, "details_asof"] = today
+
+    df["market_cap"] = pd.to_numeric(df["market_cap"], errors="coerce")
+    df["shares_outstanding"] = pd.to_numeric(df["shares_outstanding"], errors="coerce")
+    df = df.sort_values("ticker").reset_index(drop=True)
+    _write(df, {"as_of": today, "count": int(df["active"].sum()), "adds": int(len(adds)),
+                "delists": n_delisted, "details_fetched": len(todo)})
+    print(f"📇 Reference snapshot {today}: +{len(adds)} listed, -{n_delisted} delisted, "
+          f"{len(todo)} detail lookups", file=sys.stderr)
+    return df
+
+
+def filter_common_stocks(df: pd.DataFrame, exchanges=("XNYS", "XNAS", "XASE")) -> List[str]:
+    """Active US common stocks (no ETFs/ETNs/warrants/rights/OTC), sorted"""
+    if df.empty:
+        return []
+    types = df["type"].fillna("").str.upper()
+    mask = (
+        df["active"].astype(bool)
+        & df["primary_exchange"].isin(exchanges)
+        & ~types.isin(EXCLUDED_TYPES)
+        & (df["locale"] == "us")
+        & (df["currency_name"] == "usd")
+        & ~df["ticker"].fillna("").str.startswith("OTC:")
+        & (df["cik"] != "OTC")
+    )
+    return sorted(dict.fromkeys(df.loc[mask, "ticker"].tolist()))
+
+
+def ticker_info(symbols: List[str]) -> Dict[str, dict]:
+    """Company metadata (name, type, exchange, sector, market cap, ...) for known symbols"""
+    df = load_reference(active_only=False)
+    if df.empty:
+        return {}
+    sub = df[df["ticker"].isin([s.upper() for s in symbols])]
+    sub = sub.astype(object).where(sub.notna(), None)
+    return {r["ticker"]: r for r in sub.to_dict("records")}
@@ -0,0 +1,158 @@
+"""
+Short Data Store
+Symbol-indexed columnar cache over the shipped short-interest, borrow,
+liquidity and FINRA short-volume files. The JSON sources are compiled once
+into .npy columns that are memory-mapped on load and rebuilt only when a
+source file's mtime/size changes.
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+PROVIDER_DIR = Path(__file__).resolve().parent
+STORE_DIR = Path(os.getenv("SHORT_STORE_DIR", str(PROVIDER_DIR.parents[1] / "data" / "cache" / "short_store")))
+RECHECK_S = 2.0  # how often sources are re-stat'ed for changes
+
+# source file -> fields pulled into columns
+SOURCES = {
+    "shortinterest.json": ["short_interest_shares", "short_interest_pct", "days_to_cover"],
+    "borrow.json": ["borrow_fee_pct", "borrow_fee_trend_pp7d", "utilization_pct"],
+    "liquidity.json": ["avg_dollar_liquidity_30d", "adv_30d_shares"],
+    "finra_shortvol": ["sv_5d", "sv_20d", "svr_5d", "svr_20d"],
+}
+COLUMNS = [f for fields in SOURCES.values() for f in fields]
+
+
+def latest_finra_file(provider_dir: Path = PROVIDER_DIR) -> Optional[Path]:
+    """Most recent finra_shortvol_YYYYMMDD.json"""
+    files = sorted(p for p in provider_dir.glob("finra_shortvol_*.json") if p.stem[len("finra_shortvol_"):].isdigit())
+    return files[-1] if files else None
+
+
+def source_files(provider_dir: Path = PROVIDER_DIR) -> Dict[str, Path]:
+    out = {}
+    for name in SOURCES:
+        p = latest_finra_file(provider_dir) if name == "finra_shortvol" else provider_dir / name
+        if p is not None and p.exists():
+            out[name] = p
+    return out
+
+
+def signature(files: Dict[str, Path]) -> Dict[str, list]:
+    sig = {}
+    for name, p in files.items():
+        st = p.stat()
+        sig[name] = [p.name, st.st_mtime_ns, st.st_size]
+    return sig
+
+
+class ShortStore:
+    """O(1) short/borrow lookups backed by memory-mapped columns"""
+
+    def __init__(self, provider_dir: Path = PROVIDER_DIR, store_dir: Path = STORE_DIR):
+        self.provider_dir = Path(provider_dir)
+        self.store_dir = Path(store_dir)
+        self._lock = threading.Lock()
+        self._sig = None
+        self._checked = 0.0
+        self.index: Dict[str, int] = {}
+        self.values = np.empty((0, len(COLUMNS)))
+
+    def _build(self, files: Dict[str, Path], sig: dict):
+        """Compile JSON sources into symbols.npy/values.npy + meta.json"""
+        rows: Dict[str, np.ndarray] = {}
+        col = {c: i for i, c in enumerate(COLUMNS)}
+        for name, p in files.items():
+            try:
+                data = json.loads(p.read_text())
+            except Exception:
+                continue
+            for sym, rec in (data or {}).items():
+                if not isinstance(rec, dict):
+                    continue
+                row = rows.get(sym.upper())
+                if row is None:
+                    row = rows[sym.upper()] = np.full(len(COLUMNS), np.nan)
+                for field in SOURCES[name]:
+                    v = rec.get(field)
+                    if isinstance(v, (int, float)) and not isinstance(v, bool):
+                        row[col[field]] = float(v)
+
+        symbols = sorted(rows)
+        values = np.vstack([rows[s] for s in symbols]) if symbols else np.empty((0, len(COLUMNS)))
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tag = f".{os.getpid()}.tmp"
+        for fname, arr in (("symbols.npy", np.array(symbols, dtype=str)), ("values.npy", values)):
+            tmp = self.store_dir / (fname + tag)
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, self.store_dir / fname)
+        meta = self.store_dir / ("meta.json" + tag)
+        meta.write_text(json.dumps({"columns": COLUMNS, "sources": sig}))
+        os.replace(meta, self.store_dir / "meta.json")
+
+    def _load(self):
+        symbols = np.load(self.store_dir / "symbols.npy")
+        self.values = np.load(self.store_dir / "values.npy", mmap_mode="r")
+        self.index = {str(s): i for i, s in enumerate(symbols)}
+
+    def _maybe_reload(self):
+        now = time.time()
+        if self._sig is not None and now - self._checked < RECHECK_S:
+            return
+        with self._lock:
+            if self._sig is not None and now - self._checked < RECHECK_S:
+                return
+            self._checked = now
+            files = source_files(self.provider_dir)
+            sig = signature(files)
+            if sig == self._sig:
+                return
+            try:
+                meta = json.loads((self.store_dir / "meta.json").read_text())
+                fresh = meta.get("sources") == sig and meta.get("columns") == COLUMNS
+            except Exception:
+                fresh = False
+            if not fresh:
+                self._build(files, sig)
+            self._load()
+            self._sig = sig
+
+    def row(self, symbol: str) -> Optional[dict]:
+        """All columns for one symbol (NaN -> None), or None if unknown"""
+        self._maybe_reload()
+        i = self.index.get((symbol or "").upper())
+        if i is None:
+            return None
+        return {c: (None if np.isnan(v) else float(v)) for c, v in zip(COLUMNS, self.values[i])}
+
+    def column(self, name: str, symbols: List[str]) -> np.ndarray:
+        """Vector lookup of one column for many symbols (NaN where unknown)"""
+        self._maybe_reload()
+        j = COLUMNS.index(name)
+        idx = np.array([self.index.get(s.upper(), -1) for s in symbols], dtype=np.int64)
+        out = np.full(len(symbols), np.nan)
+        hit = idx >= 0
+        if hit.any():
+            out[hit] = self.values[idx[hit], j]
+        return out
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_short_store() -> ShortStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ShortStore()
+    return _store
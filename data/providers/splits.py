@@ -0,0 +1,184 @@
+"""
+Split Ledger
+Executed stock splits from Polygon /v3/reference/splits, kept in a small JSON
+file and refreshed at most once per ET day. Bars are archived and cached
+unadjusted; the ledger applies split adjustment when they are read, so a split
+that happens after a session was stored never leaves stale prices behind.
+"""
+
+import os
+import sys
+import json
+import datetime as dt
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+import pyarrow as pa
+
+from data.market_calendar import now_et
+
+ROOT = Path(__file__).resolve().parents[2]
+SPLITS_PATH = Path(os.getenv("POLYGON_SPLITS_PATH", str(ROOT / "data" / "cache" / "splits.json")))
+LOOKBACK_DAYS = int(os.getenv("POLYGON_SPLITS_LOOKBACK_DAYS", "400"))  # history fetched per refresh
+PRICE_FIELDS = ("o", "h", "l", "c", "vw")
+
+
+def _fetch_splits(since: str, until: str) -> Optional[List[list]]:
+    """[ticker, execution_date, split_from, split_to] for splits executed in [since, until]; None on failure"""
+    from data.providers.alpha_providers import POLYGON, polygon_get
+    from data.providers.polygon_client import polygon_url
+    if not POLYGON:
+        return None
+    rows = []
+    url = polygon_url("/v3/reference/splits")
+    params = {"execution_date.gte": since, "execution_date.lte": until, "limit": 1000, "apiKey": POLYGON}
+    try:
+        while url:
+            j = polygon_get(url, params)
+            for r in j.get("results", []):
+                if r.get("ticker") and r.get("execution_date") and r.get("split_from") and r.get("split_to"):
+                    rows.append([r["ticker"], r["execution_date"], float(r["split_from"]), float(r["split_to"])])
+            url = j.get("next_url")
+            params = {"apiKey": POLYGON} if url else None
+    except Exception as e:
+        print(f"[splits] refresh failed: {e}", file=sys.stderr)
+        return None
+    return rows
+
+
+class SplitLedger:
+    """
+    Split events per ticker. A bar dated d is adjusted by every split executed
+    after d (and by today): prices times split_from/split_to, volume divided by
+    it, which is what Polygon's adjusted=true returns.
+    """
+
+    def __init__(self, path: Path = SPLITS_PATH, fetch: Callable[[str, str], Optional[List[list]]] = _fetch_splits):
+        self.path = Path(path)
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._state: Optional[dict] = None  # {"as_of", "since", "splits": [[ticker, date, from, to], ...]}
+        self._by_ticker: Dict[str, List[tuple]] = {}
+
+    def _read(self) -> Optional[dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except Exception:
+            return None
+
+    def _use(self, state: dict):
+        by: Dict[str, List[tuple]] = {}
+        for t, d, f, to in state["splits"]:
+            by.setdefault(t, []).append((d, f / to))
+        self._state, self._by_ticker = state, by
+
+    def _ensure(self, since: str):
+        today = now_et().date()
+        with self._lock:
+            st = self._state or self._read()
+            if st and st.get("as_of") == today.isoformat() and st.get("since", "9999") <= since:
+                if st is not self._state:
+                    self._use(st)
+                return
+            want = min(since, (today - dt.timedelta(days=LOOKBACK_DAYS)).isoformat())
+            rows = self._fetch(want, today.isoformat())
+            if rows is None:
+                # keep what we had (or nothing) for the rest of this process; the next one retries
+                if st is None:
+                    print("[splits] no split data; bars are served unadjusted", file=sys.stderr)
+                st = {"as_of": today.isoformat(), "since": want, "splits": (st or {}).get("splits", [])}
+                self._use(st)
+                return
+            st = {"as_of": today.isoformat(), "since": want, "splits": rows}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(st))
+            os.replace(tmp, self.path)
+            self._use(st)
+
+    def factors(self, date_iso: str) -> Dict[str, float]:
+        """Price factor per ticker with a split after date_iso (tickers not listed: 1.0)"""
+        self._ensure(date_iso)
+        out = {}
+        for t, events in self._by_ticker.items():
+            f = 1.0
+            for d, ratio in events:
+                if d > date_iso:
+                    f *= ratio
+            if f != 1.0:
+                out[t] = f
+        return out
+
+    def split_after(self, date_iso: str) -> Set[str]:
+        """Tickers with a split executed after date_iso (their earlier bars were re-adjusted)"""
+        self._ensure(date_iso)
+        return {t for t, events in self._by_ticker.items() if any(d > date_iso for d, _ in events)}
+
+    def adjust_table(self, table: pa.Table, date_iso: str) -> pa.Table:
+        """One session's grouped bars (T, o, h, l, c, v) adjusted for later splits"""
+        if table.num_rows == 0:
+            return table
+        factors = self.factors(date_iso)
+        if not factors:
+            return table
+        f = np.array([factors.get(t, 1.0) for t in table.column("T").to_pylist()])
+        if (f == 1.0).all():
+            return table
+        cols = {}
+        for name in table.column_names:
+            col = table.column(name)
+            if name in PRICE_FIELDS:
+                col = pa.array(col.to_numpy(zero_copy_only=False) * f, col.type)
+            elif name == "v":
+                col = pa.array(col.to_numpy(zero_copy_only=False) / f, col.type)
+            cols[name] = col
+        return pa.table(cols, schema=table.schema)
+
+    def adjust_results(self, results: List[dict], date_iso: str) -> List[dict]:
+        """Grouped daily result dicts ({T, o, h, l, c, v, ...}) for one date, adjusted"""
+        factors = self.factors(date_iso) if results else {}
+        return [_scaled(r, factors[r.get("T")]) if r.get("T") in factors else r for r in results]
+
+    def adjust_bars(self, symbol: str, bars: List[dict]) -> List[dict]:
+        """One symbol's aggregates (t = window start in ms), adjusted bar by bar"""
+        if not bars:
+            return bars
+        from data.providers.agg_cache import bar_date
+        dates = [bar_date(b) for b in bars]
+        self._ensure(min(dates))
+        events = self._by_ticker.get(symbol)
+        if not events:
+            return bars
+        out = []
+        for b, d in zip(bars, dates):
+            f = 1.0
+            for e, ratio in events:
+                if e > d:
+                    f *= ratio
+            out.append(_scaled(b, f) if f != 1.0 else b)
+        return out
+
+
+def _scaled(bar: dict, f: float) -> dict:
+    out = dict(bar)
+    for k in PRICE_FIELDS:
+        if out.get(k) is not None:
+            out[k] = out[k] * f
+    if out.get("v") is not None:
+        out["v"] = out["v"] / f
+    return out
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_split_ledger() -> SplitLedger:
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = SplitLedger()
+    return _ledger
@@ -16,9 +16,15 @@ import uuid
 import json
 from typing import List, Dict, Any
 
+from data.market_calendar import ET, is_trading_day, market_phase, now_et, session
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Regular-session sub-phases for the market context labels
+OPENING_HOURS = timedelta(hours=2, minutes=30)  # MARKET_OPEN runs from the open until 12:00 ET
+POWER_HOUR = timedelta(hours=1)  # last hour before the close (early closes included)
+
 class PortfolioAnalyzer:
     def __init__(self, database_url: str):
         self.database_url = database_url
@@ -258,23 +264,26 @@ class PortfolioAnalyzer:
         except Exception as e:
             logger.error(f"❌ Portfolio analysis failed: {e}")
     
-    def get_market_context(self) -> str:
-        """Determine current market context"""
-        now = datetime.now()
-        hour = now.hour
-        
-        if 6 <= hour < 7:
+    def get_market_context(self, now: datetime = None) -> str:
+        """
+        Current market context from the exchange session in ET: pre-market,
+        the first hours after the open, midday, the last hour before the
+        (possibly early) close, post-market, and closed (nights, weekends, holidays)
+        """
+        phase = market_phase(now)
+        if phase == "premarket":
             return "PRE_MARKET"
-        elif 7 <= hour < 10:
-            return "MARKET_OPEN"
-        elif 10 <= hour < 12:
-            return "MIDDAY"
-        elif 12 <= hour < 13:
-            return "POWER_HOUR"
-        elif 13 <= hour < 17:
+        if phase == "postmarket":
             return "AFTER_CLOSE"
-        else:
+        if phase != "regular":
             return "AFTER_HOURS"
+        now = now.astimezone(ET) if now is not None else now_et()
+        s = session(now.date())
+        if now >= s.close - POWER_HOUR:
+            return "POWER_HOUR"
+        if now < s.open + OPENING_HOURS:
+            return "MARKET_OPEN"
+        return "MIDDAY"
     
     def save_portfolio_health_summary(self, alerts: List[Dict], session_id: str):
         """Save overall portfolio health metrics"""
@@ -322,14 +331,21 @@ class PortfolioBackgroundWorker:
     def setup_schedule(self):
         """Setup market-aware scheduling"""
         # Pacific Time schedule (adjust for your timezone)
-        schedule.every().day.at("06:30").do(self.analyzer.run_portfolio_analysis)  # Pre-market
-        schedule.every().day.at("09:30").do(self.analyzer.run_portfolio_analysis)  # Market open
-        schedule.every().day.at("12:00").do(self.analyzer.run_portfolio_analysis)  # Midday
-        schedule.every().day.at("15:00").do(self.analyzer.run_portfolio_analysis)  # Power hour
-        schedule.every().day.at("17:00").do(self.analyzer.run_portfolio_analysis)  # After close
+        schedule.every().day.at("06:30").do(self.run_scheduled_analysis)  # Pre-market
+        schedule.every().day.at("09:30").do(self.run_scheduled_analysis)  # Market open
+        schedule.every().day.at("12:00").do(self.run_scheduled_analysis)  # Midday
+        schedule.every().day.at("15:00").do(self.run_scheduled_analysis)  # Power hour
+        schedule.every().day.at("17:00").do(self.run_scheduled_analysis)  # After close
         
         logger.info("⏰ Portfolio analysis scheduled for key market times")
     
+    def run_scheduled_analysis(self):
+        """Scheduled run; skipped on weekends and exchange holidays"""
+        if not is_trading_day():
+            logger.info("📅 Exchange closed today - skipping scheduled portfolio analysis")
+            return
+        self.analyzer.run_portfolio_analysis()
+    
     def start(self):
         """Start the portfolio manager"""
         # Initial analysis
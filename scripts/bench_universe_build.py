@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Universe build benchmark on synthetic grouped-daily sessions (no Polygon needed).
+
+  python3 scripts/bench_universe_build.py                          # 1k / 8k / 20k tickers
+  python3 scripts/bench_universe_build.py --sizes 8000 --lean      # one size, float32 window
+  python3 scripts/bench_universe_build.py --json > bench.json      # machine-readable
+
+Each size runs in its own process so peak RSS is per size. Phases mirror a
+full build_universe_v2.py run: fetch stub (synthetic response bodies), decode
+(response -> Arrow -> interned columns -> window), features, price-band filter
+and parquet write.
+"""
+
+import sys, json, time, string, argparse, subprocess, tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from data.providers.grouped_archive import GroupedDailyArchive, SymbolIndex, decode_grouped
+from data.providers.splits import SplitLedger
+from data.feature_engine import WindowBuilder, compute_features
+from scripts.build_universe_v2 import peak_rss_mb
+
+CONF = yaml.safe_load(open(ROOT / "config" / "alpha_scoring.yml"))
+U = CONF.get("universe", {})
+PHASES = ["fetch_stub", "decode", "features", "filter", "parquet_write"]
+
+
+def ticker_names(n):
+    """n distinct uppercase symbols (A..Z, AA.., AAA..), sorted"""
+    out, letters = [], string.ascii_uppercase
+    width = 1
+    while len(out) < n:
+        for i in range(26 ** width):
+            name, x = "", i
+            for _ in range(width):
+                x, r = divmod(x, 26)
+                name = letters[r] + name
+            out.append(name)
+            if len(out) == n:
+                break
+        width += 1
+    return sorted(out)
+
+
+def synthetic_sessions(tickers, sessions, missing_rate, extra, seed):
+    """
+    (universe, iterator of grouped-daily response bodies, newest session first).
+    Bodies are generated one at a time, so only one payload is alive at once,
+    as with streamed downloads. Every ticker follows a lognormal random walk;
+    each (ticker, session) bar is dropped with probability missing_rate, and
+    `extra` x tickers symbols outside the universe (OTC, warrants, ...) are
+    mixed in as the real payload has them.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array(ticker_names(int(tickers * (1 + extra))))
+    universe = sorted(rng.choice(names, tickers, replace=False).tolist())
+    close = rng.lognormal(2.5, 1.2, len(names))
+
+    def bodies():
+        for k in range(sessions):
+            close[:] = close * np.exp(rng.normal(0, 0.03, len(names)))
+            keep = rng.random(len(names)) >= missing_rate
+            c = close[keep]
+            o = c * np.exp(rng.normal(0, 0.01, len(c)))
+            h = np.maximum(o, c) * (1 + rng.random(len(c)) * 0.03)
+            l = np.minimum(o, c) * (1 - rng.random(len(c)) * 0.03)
+            v = rng.lognormal(12, 2, len(c)).round()
+            t = 1_700_000_000_000 - k * 86_400_000
+            results = [{"T": s, "v": float(vv), "vw": round(float(cc), 4), "o": round(float(oo), 4),
+                        "c": round(float(cc), 4), "h": round(float(hh), 4), "l": round(float(ll), 4),
+                        "t": t, "n": 100}
+                       for s, oo, hh, ll, cc, vv in zip(names[keep].tolist(), o, h, l, c, v)]
+            yield json.dumps({"status": "OK", "adjusted": True, "resultsCount": len(results),
+                              "results": results}).encode()
+
+    return universe, bodies()
+
+
+def run_one(tickers, sessions, missing_rate, extra, lean, seed):
+    """One timed build over a synthetic universe; returns the result row"""
+    timings = dict.fromkeys(PHASES, 0.0)
+    rss, base_rss = {}, peak_rss_mb()  # after imports, before any data
+    dtype = np.float32 if lean else np.float64
+
+    def phase(name, t0):
+        timings[name] += time.perf_counter() - t0
+        rss[name] = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    universe, bodies = synthetic_sessions(tickers, sessions, missing_rate, extra, seed)
+    scratch = Path(tempfile.gettempdir()) / "bench_universe_unused"  # no sessions are archived here
+    archive = GroupedDailyArchive(root=scratch, splits=SplitLedger(scratch / "splits.json", fetch=lambda since, until: []))
+    index = SymbolIndex(universe)
+    builder = WindowBuilder(index.symbols, sessions, dtype)
+    phase("decode", t0)
+
+    # sessions are generated and decoded one at a time, like the streamed build
+    bars, payload = 0, 0
+    for i in range(sessions):
+        t0 = time.perf_counter()
+        body = next(bodies)
+        payload += len(body)
+        phase("fetch_stub", t0)
+
+        t0 = time.perf_counter()
+        _, table = decode_grouped(body)
+        d = f"session-{i}"
+        cols = archive.session_columns(d, index, live={d: table}, dtype=dtype)
+        bars += len(cols["sym"])
+        builder.add(i, cols)
+        del body, table
+        phase("decode", t0)
+    payload_mb = payload / 2 ** 20
+
+    t0 = time.perf_counter()
+    window = builder.finish()
+    fdf = compute_features(window, breakout_buffer=CONF["monthly"].get("breakout_buffer", 0.01),
+                           windows=U.get("feature_windows", []))
+    phase("features", t0)
+
+    t0 = time.perf_counter()
+    fdf = fdf[(fdf["price"] >= U.get("price_min", 1.0)) & (fdf["price"] <= U.get("price_max", 100.0))]
+    phase("filter", t0)
+
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "universe_features.parquet"
+        fdf.to_parquet(out, index=False)
+        parquet_mb = out.stat().st_size / 2 ** 20
+    phase("parquet_write", t0)
+
+    total = sum(timings.values())
+    build = total - timings["fetch_stub"]
+    return {
+        "tickers": tickers, "sessions": sessions, "missing_rate": missing_rate, "lean": lean,
+        "bars": bars, "rows": len(fdf), "payload_mb": round(payload_mb, 1), "parquet_mb": round(parquet_mb, 2),
+        "seconds": {k: round(v, 4) for k, v in timings.items()},
+        "build_seconds": round(build, 3),
+        "bars_per_s": round(bars / build) if build > 0 else None,
+        "base_rss_mb": round(base_rss, 1),
+        "peak_rss_mb": {k: round(v, 1) for k, v in rss.items()},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the universe feature build on synthetic data")
+    ap.add_argument("--sizes", default="1000,8000,20000", help="comma-separated ticker counts")
+    ap.add_argument("--sessions", type=int, default=U.get("features_days", 30) + 10)
+    ap.add_argument("--missing-rate", type=float, default=0.05, help="share of (ticker, session) bars dropped")
+    ap.add_argument("--extra", type=float, default=0.2, help="non-universe symbols in each payload, as a share of --sizes")
+    ap.add_argument("--lean", action="store_true", help="float32 window, as build_universe_v2.py --lean")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.child:
+        print(json.dumps(run_one(sizes[0], args.sessions, args.missing_rate, args.extra, args.lean, args.seed)))
+        return
+
+    results = []
+    for n in sizes:
+        cmd = [sys.executable, __file__, "--child", "--sizes", str(n), "--sessions", str(args.sessions),
+               "--missing-rate", str(args.missing_rate), "--extra", str(args.extra), "--seed", str(args.seed)]
+        if args.lean:
+            cmd.append("--lean")
+        print(f"⏱️ {n} tickers x {args.sessions} sessions...", file=sys.stderr)
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(proc.returncode)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'tickers':>8} {'bars':>9} " + " ".join(f"{p:>13}" for p in PHASES) + f" {'bars/s':>10} {'base MB':>8} {'peak MB':>8}")
+    for r in results:
+        cells = " ".join(f"{r['seconds'][p] * 1000:>11.1f}ms" for p in PHASES)
+        print(f"{r['tickers']:>8} {r['bars']:>9} {cells} {r['bars_per_s']:>10} {r['base_rss_mb']:>8.0f} {r['peak_rss_mb']['parquet_write']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
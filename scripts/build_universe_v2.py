@@ -1,6 +1,5 @@
-import os, sys, json, math, argparse, datetime as dt
+import os, sys, json, time, argparse, resource
 from pathlib import Path
-import pandas as pd
 import numpy as np
 import yaml
 
@@ -9,29 +8,95 @@ OUT_DIR = ROOT / "data"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 sys.path.append(str(ROOT))
-from data.providers.alpha_providers import list_tickers, grouped_daily
+from data.providers.alpha_providers import list_tickers
+from data.providers.grouped_archive import GroupedDailyArchive, SymbolIndex
+from data.providers.reference import load_reference
+from data.providers.short_store import get_short_store
+from data.market_calendar import trading_days_before
+from data.feature_engine import WindowBuilder, RollingFeatureState, compute_features
+from data.feature_store import FeatureStore
 
 CONF = yaml.safe_load(open(ROOT / "config" / "alpha_scoring.yml"))
 U = CONF.get("universe", {})
 PRICE_MIN = U.get("price_min", 1.0)
 PRICE_MAX = U.get("price_max", 100.0)
+FEATURE_WINDOWS = U.get("feature_windows", [])  # extra lookbacks, all computed in the same pass
 
 def last_trading_days(n=30):
-    # take last n+10 calendar days, keep those where grouped_daily returns data
-    days = []
-    today = dt.date.today()
-    for i in range(1, n+40):  # pad for holidays/weekends
-        d = today - dt.timedelta(days=i)
-        if d.weekday() < 5:  # Mon-Fri heuristic
-            days.append(d)
-        if len(days) >= (n+10):
-            break
-    return [d.isoformat() for d in days]
+    # n+10 exchange sessions before today (ET), newest first; holidays and weekends never requested
+    return [d.isoformat() for d in trading_days_before(n + 10)]
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def roll_state(state, days, archive, index, dtype=np.float64):
+    """Slide the saved rolling state onto `days`; None when a full rebuild is needed"""
+    known = set(state.days)
+    entering = [d for d in days if d not in known]
+    if len(days) != state.capacity or not known & set(days) or (entering and max(known) >= min(entering)):
+        return None
+    fetched = archive.sync(entering)
+    sessions = {}
+    for d in entering:
+        cols = archive.session_columns(d, index, live=fetched, dtype=dtype)
+        if cols is None:
+            print(f"⚠️ Session {d} unavailable; falling back to a full rebuild", file=sys.stderr)
+            return None
+        sessions[d] = cols
+    # A split since the saved window re-adjusts all of a symbol's earlier bars:
+    # drop its buffers so it is backfilled below from the (adjusted-on-read) archive
+    resplit = archive.splits.split_after(state.days[0]) & set(state.symbols)
+    if resplit:
+        state = state.reindex([s for s in state.symbols if s not in resplit])
+        print(f"✂️ {len(resplit)} symbol(s) split since the saved window; reloading their bars")
+    # Listings new to the universe have no buffers yet: load their bars for the
+    # sessions that stay in the window, as a full rebuild would see them
+    old = set(state.symbols)
+    new_rows = np.array([i for i, s in enumerate(index.symbols) if s not in old], dtype=np.int64)
+    backfill = {}
+    if len(new_rows):
+        window = set(days)
+        for d in (d for d in state.days if d in window):
+            cols = archive.session_columns(d, index, dtype=dtype)
+            if cols is None:
+                print(f"⚠️ Session {d} not archived for {len(new_rows)} new symbol(s); falling back to a full rebuild",
+                      file=sys.stderr)
+                return None
+            backfill[d] = cols
+    t0 = time.perf_counter()
+    state = state.reindex(index.symbols)
+    if len(new_rows):
+        state.backfill(new_rows, backfill)
+        print(f"♻️ Backfilled {len(new_rows)} new symbol(s) over {len(backfill)} archived session(s)")
+    state.slide(days, sessions)
+    print(f"♻️ Incremental update: {len(entering)} new session(s) applied in {(time.perf_counter() - t0) * 1000:.1f}ms")
+    return state
+
+def attach_static_fields(fdf):
+    """
+    Sector and shares outstanding from the reference snapshot, short interest %
+    (in percent) from the short store. float stays NaN: the reference data has
+    no free-float figure, and shares outstanding would trip the low-float bonus.
+    """
+    ref = load_reference(active_only=False)
+    ref = ref.drop_duplicates(subset=["ticker"]).set_index("ticker").reindex(fdf["symbol"])
+    fdf = fdf.copy()
+    fdf["sector"] = ref["sector"].astype(object).where(ref["sector"].notna(), None).to_numpy()
+    fdf["shares_outstanding"] = ref["shares_outstanding"].astype(float).to_numpy()
+    fdf["float"] = np.nan
+    fdf["short_interest_pct"] = get_short_store().column("short_interest_pct", fdf["symbol"].tolist())
+    return fdf
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--max", type=int, default=None, help="max tickers to include from reference list (overrides config)")
-    ap.add_argument("--days", type=int, default=30, help="feature lookback days")
+    ap.add_argument("--days", type=int, default=U.get("features_days", 30), help="feature lookback days")
+    ap.add_argument("--incremental", action="store_true",
+                    help="slide the saved rolling state forward instead of rebuilding the window")
+    ap.add_argument("--lean", action="store_true",
+                    help="float32 bars and buffers (halves the window memory; features agree to float32 precision)")
     args = ap.parse_args()
 
     print("📇 Fetching full ticker list...")
@@ -46,70 +111,52 @@ def main():
 
     print("📆 Pulling grouped daily bars...")
     days = last_trading_days(args.days)
-    # Collect time-series rows per day
-    frames = []
-    for d in days:
-        res = grouped_daily(d)
-        if not res: 
-            continue
-        # Polygon returns 'T' ticker; keep only our universe
-        df = pd.DataFrame(res)[["T","o","h","l","c","v"]]
-        df = df[df["T"].isin(universe)]
-        if df.empty:
-            continue
-        df["date"] = d
-        frames.append(df)
-
-    if not frames:
-        print("❌ No grouped daily frames collected", file=sys.stderr); sys.exit(1)
+    archive = GroupedDailyArchive()
+    index = SymbolIndex(universe)
+    dtype = np.float32 if args.lean else np.float64
+    breakout_buffer = CONF["monthly"].get("breakout_buffer", 0.01)
+    too_long = [w for w in FEATURE_WINDOWS if w >= len(days)]
+    if too_long:
+        print(f"⚠️ Lookbacks {too_long} need more than the {len(days)}-session window; raise features_days "
+              f"(their returns are 0 and means cover the whole window)", file=sys.stderr)
 
-    big = pd.concat(frames, ignore_index=True)
-    # DON'T filter by price here - compute features for ALL symbols first
+    state = None
+    if args.incremental:
+        saved = RollingFeatureState.load()
+        state = roll_state(saved, days, archive, index, dtype) if saved is not None else None
+    if state is not None:
+        fdf = state.features(breakout_buffer, windows=FEATURE_WINDOWS)
+    else:
+        # Only sessions missing from the local archive hit the network; archived sessions
+        # and finished downloads are scattered into the window while the rest are in flight
+        missing = archive.missing(days)
+        remote = set(missing)
+        builder = WindowBuilder(index.symbols, len(days), dtype)
+        fetched = 0
+        t0 = time.perf_counter()
+        for i, d, cols in archive.stream(days, index, dtype, todo=missing):
+            if cols is None:
+                continue
+            fetched += d in remote
+            builder.add(i, cols)
+        print(f"🗄️ Archive: {len(days) - len(missing)} sessions on disk, fetched {fetched}/{len(missing)} missing; "
+              f"window streamed in {time.perf_counter() - t0:.1f}s")
+        if not builder.present.any():
+            print("❌ No grouped daily frames collected", file=sys.stderr); sys.exit(1)
+        # DON'T filter by price here - compute features for ALL symbols first
 
-    # ---- features per symbol ----
-    # order newest first by date (days already descending from last_trading_days)
-    big["date"] = pd.to_datetime(big["date"])
-    big.sort_values(["T","date"], ascending=[True, False], inplace=True)
-
-    def feats(df):
-        # df: rows for one symbol, newest first
-        if len(df) < 6: 
-            return None
-        c = df["c"].values
-        h = df["h"].values
-        l = df["l"].values
-        v = df["v"].values
-        # ADV & $vol (mean over lookback)
-        adv = float(np.nanmean(v))
-        avg_dollar = float(np.nanmean(c * v))
-        # ATR% (rough): mean((H-L).rolling?) / last close
-        tr = np.maximum(h - l, np.maximum(np.abs(h - np.r_[c[1:], c[-1]]), np.abs(l - np.r_[c[1:], c[-1]])))
-        atr = float(np.nanmean(tr))
-        atr_pct = float(atr / c[0]) if c[0] else 0.0
-        # momentum
-        ret_5d = float(c[0] / c[5] - 1.0) if len(c) > 5 and c[5] else 0.0
-        ret_21d = float(c[0] / c[21] - 1.0) if len(c) > 21 and c[21] else 0.0
-        # 20D breakout using closes
-        look = min(21, len(c)-1)
-        hh20 = float(np.nanmax(c[1:look+1])) if look >= 2 else np.nan
-        breakout20 = bool((not math.isnan(hh20)) and (c[0] >= hh20 * (1.0 + CONF["monthly"].get("breakout_buffer", 0.01))))
-        return {
-            "symbol": df["T"].iloc[0],
-            "price": float(c[0]),
-            "adv": adv,
-            "avg_dollar": avg_dollar,
-            "atr_pct": atr_pct,
-            "ret_5d": ret_5d,
-            "ret_21d": ret_21d,
-            "breakout20": breakout20,
-        }
-
-    print("🧮 Computing features...")
-    feats_list = []
-    for sym, sdf in big.groupby("T"):
-        f = feats(sdf)
-        if f: feats_list.append(f)
-    fdf = pd.DataFrame(feats_list)
+        # ---- features for the whole universe at once (symbols x sessions, newest first) ----
+        print("🧮 Computing features...")
+        window = builder.finish()
+        fdf = compute_features(window, breakout_buffer=breakout_buffer, windows=FEATURE_WINDOWS)
+        print(f"🧠 Session window: {sum(m.nbytes for m in window.mats.values()) / 2**20:.1f} MB "
+              f"({len(index.symbols)} symbols x {window.depth} sessions, {np.dtype(dtype).name})")
+        state = RollingFeatureState.from_window(window, days)
+        del window, builder
+    state.save()
+    fdf = attach_static_fields(fdf)
+    # the published schema does not depend on --lean
+    fdf = fdf.astype({c: np.float64 for c, t in fdf.dtypes.items() if t == np.float32})
     print(f"✅ Features for {len(fdf)} symbols")
     
     # NOW filter by latest close price only
@@ -127,12 +174,22 @@ def main():
         else:
             print(msg, file=sys.stderr)
 
-    # Save cache
+    # Publish an immutable snapshot, then swap CURRENT (readers never see a partial file)
+    manifest = FeatureStore().publish(fdf, as_of=days[0], sessions=len(days), universe=len(universe),
+                                      windows=sorted(set(FEATURE_WINDOWS)))
+    print(f"📦 Published feature snapshot {manifest['version']} ({manifest['rows']} rows, as of {manifest['as_of']})")
+
+    # Legacy cache files, replaced atomically as well
     out_parq = OUT_DIR / "universe_features.parquet"
     out_json = OUT_DIR / "universe.json"
-    fdf.to_parquet(out_parq, index=False)
-    out_json.write_text(json.dumps({"symbols": fdf["symbol"].tolist()}))
+    tmp = out_parq.with_name(f".{out_parq.name}.{os.getpid()}.tmp")
+    fdf.to_parquet(tmp, index=False)
+    os.replace(tmp, out_parq)
+    tmp = out_json.with_name(f".{out_json.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"symbols": fdf["symbol"].tolist(), "features_version": manifest["version"]}))
+    os.replace(tmp, out_json)
     print(f"💾 Wrote {out_parq} and {out_json}")
+    print(f"🧠 Peak RSS: {peak_rss_mb():.0f} MB{' (lean)' if args.lean else ''}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
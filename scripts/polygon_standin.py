@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local Polygon stand-in: serves recorded cassettes over HTTP with injected latency.
+
+  POLYGON_MODE=record python3 scripts/build_universe_v2.py          # capture once
+  python3 scripts/polygon_standin.py --port 8765 --latency-ms 80 &   # serve offline
+  POLYGON_BASE_URL=http://127.0.0.1:8765 python3 agents/universe_screener.py
+
+Unlike POLYGON_MODE=replay, requests go through real sockets, so connection
+pooling and concurrency in the client are exercised as they are in production.
+"""
+
+import os, sys, json, time, random, argparse, threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from data.providers.cassette import Cassette, CASSETTE_DIR, request_key
+
+STATS = {"served": 0, "missing": 0}
+STATS_LOCK = threading.Lock()
+
+
+def make_handler(cassette, latency_ms, jitter_ms):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self):
+            delay = max(0.0, latency_ms + (random.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0))
+            if delay:
+                time.sleep(delay / 1000.0)
+            entry = cassette.lookup(request_key(self.path))
+            with STATS_LOCK:
+                STATS["served" if entry else "missing"] += 1
+            if entry is None:
+                entry = {"status": 404, "headers": {"Content-Type": "application/json"},
+                         "body": json.dumps({"status": "NOT_RECORDED", "error": "request not in cassette"})}
+            body = entry["body"].encode()
+            self.send_response(entry["status"])
+            for k, v in (entry.get("headers") or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return StandinHandler
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve recorded Polygon responses locally")
+    ap.add_argument("--cassette-dir", default=CASSETTE_DIR, help="directory written by POLYGON_MODE=record")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=float(os.getenv("POLYGON_REPLAY_LATENCY_MS", "0")))
+    ap.add_argument("--jitter-ms", type=float, default=float(os.getenv("POLYGON_REPLAY_JITTER_MS", "0")))
+    ap.add_argument("--seed", type=int, default=None, help="seed the latency jitter for repeatable runs")
+    args = ap.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    handler = make_handler(Cassette(args.cassette_dir), args.latency_ms, args.jitter_ms)
+    srv = ThreadingHTTPServer((args.host, args.port), handler)
+    srv.daemon_threads = True
+    print(f"🎞️ Polygon stand-in on http://{args.host}:{args.port} "
+          f"(cassettes={args.cassette_dir}, latency={args.latency_ms}±{args.jitter_ms}ms)", file=sys.stderr)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[standin] served={STATS['served']} missing={STATS['missing']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 // Real AlphaStack Discovery Cache - No Mock Data
 const express = require('express');
 const { spawn } = require('child_process');
+const fs = require('fs');
+const os = require('os');
 const path = require('path');
 const router = express.Router();
 
@@ -14,6 +16,43 @@ let discoveryCache = {
 
 const CACHE_TTL = 180000; // 3 minutes (180s)
 const SCRIPT_TIMEOUT = 300000; // 5 minutes for full universe scan
+const SCAN_LIMIT = 50;
+const KILL_GRACE_MS = 15000; // SIGKILL a screener still alive this long after SIGTERM
+// Append-only NDJSON the screener writes one line per scored candidate (salvage source)
+const CHECKPOINT_PATH = process.env.DISCOVERY_CHECKPOINT_PATH || path.join(os.tmpdir(), 'alphastack_discovery.ndjson');
+
+// Final candidates from screener stdout (__JSON_START__ markers or a bare JSON array line)
+function parseScreenerStdout(stdout) {
+  const marked = stdout.match(/__JSON_START__([\s\S]*?)__JSON_END__/);
+  if (marked) return JSON.parse(marked[1]);
+  const jsonLine = stdout.split('\n').find(line => line.trim().startsWith('['));
+  return jsonLine ? JSON.parse(jsonLine) : null;
+}
+
+// Candidates scored before the screener died: last line per symbol wins, torn lines skipped
+function readCheckpoint(file, limit) {
+  let text = '';
+  try {
+    text = fs.readFileSync(file, 'utf8');
+  } catch (e) {
+    return [];
+  }
+  const bySymbol = new Map();
+  for (const line of text.split('\n')) {
+    if (!line.trim()) continue;
+    try {
+      const c = JSON.parse(line);
+      bySymbol.set(c.symbol, c);
+    } catch (e) {
+      // partial last line of a killed run
+    }
+  }
+  // Same order as the screener's final sort, rank_candidates() in agents/universe_screener.py:
+  // (score, price, symbol), descending. Change both together (tests/test_checkpoint.py pins the Python side).
+  const rank = (a, b) => (b.score || 0) - (a.score || 0) || (b.price || 0) - (a.price || 0) ||
+    (a.symbol < b.symbol ? 1 : a.symbol > b.symbol ? -1 : 0);
+  return Array.from(bySymbol.values()).sort(rank).slice(0, limit);
+}
 
 // GET /api/discoveries/latest - Real AlphaStack VIGL discoveries
 router.get('/latest', async (req, res) => {
@@ -75,10 +114,14 @@ function refreshDiscoveryCache() {
   console.log('🚀 Starting real AlphaStack VIGL discovery scan...');
   
   const scriptPath = path.resolve('agents/universe_screener.py');
-  const args = ['--limit', '50', '--full-universe', '--exclude-symbols', 'BTAI,KSS,UP,TNXP'];
+  const args = ['--limit', String(SCAN_LIMIT), '--full-universe', '--exclude-symbols', 'BTAI,KSS,UP,TNXP'];
+  
+  // A run that dies before opening its checkpoint must not salvage the previous run's
+  fs.rmSync(CHECKPOINT_PATH, { force: true });
   
   const proc = spawn('python3', [scriptPath, ...args], {
     cwd: process.cwd(),
+    env: { ...process.env, CHECKPOINT_PATH },
     stdio: ['ignore', 'pipe', 'pipe']
   });
   
@@ -93,26 +136,33 @@ function refreshDiscoveryCache() {
     stderr += data.toString();
   });
   
-  // Timeout protection
+  // Timeout protection. isRunning stays true until 'close': the dying screener
+  // still writes the checkpoint, which the next run would otherwise delete.
+  let killTimer = null;
   const timeout = setTimeout(() => {
     console.log('⚠️ AlphaStack scan timeout, terminating...');
     proc.kill('SIGTERM');
-    discoveryCache.isRunning = false;
     discoveryCache.error = 'Scan timeout';
+    killTimer = setTimeout(() => proc.kill('SIGKILL'), KILL_GRACE_MS);
   }, SCRIPT_TIMEOUT);
   
   proc.on('close', (code) => {
     clearTimeout(timeout);
+    clearTimeout(killTimer);
     discoveryCache.isRunning = false;
     
-    if (code === 0) {
+    // A killed or crashed scan still leaves its scored candidates in the checkpoint
+    const salvaged = code === 0 ? null : readCheckpoint(CHECKPOINT_PATH, SCAN_LIMIT);
+    if (salvaged && salvaged.length) {
+      console.log(`🛟 Salvaged ${salvaged.length} candidates from screener checkpoint (exit code ${code})`);
+    }
+    
+    if (code === 0 || salvaged.length) {
       try {
         // Parse JSON output from universe screener
-        const lines = stdout.split('\n');
-        const jsonLine = lines.find(line => line.trim().startsWith('['));
+        const discoveries = salvaged || parseScreenerStdout(stdout);
         
-        if (jsonLine) {
-          const discoveries = JSON.parse(jsonLine);
+        if (discoveries) {
           
           // Transform to consistent format for frontend
           discoveryCache.data = discoveries.map(d => ({
@@ -159,6 +209,7 @@ function refreshDiscoveryCache() {
   
   proc.on('error', (error) => {
     clearTimeout(timeout);
+    clearTimeout(killTimer);
     discoveryCache.isRunning = false;
     discoveryCache.error = error.message;
     console.error('❌ AlphaStack process error:', error.message);
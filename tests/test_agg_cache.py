@@ -0,0 +1,79 @@
+"""Aggregate cache behind grouped_daily / daily_range: unadjusted storage, split adjustment on read"""
+import datetime as dt
+
+import pytest
+
+from data.market_calendar import ET
+from data.providers import alpha_providers as ap
+from data.providers.agg_cache import AggCache
+from data.providers.splits import SplitLedger
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    cache = AggCache(path=str(tmp_path / "aggs.sqlite"))
+    splits = {"rows": []}
+    ledger = lambda: SplitLedger(path=tmp_path / f"splits{len(splits['rows'])}.json",
+                                 fetch=lambda since, until: splits["rows"])
+    monkeypatch.setattr(ap, "POLYGON", "test-key")
+    monkeypatch.setattr(ap, "get_agg_cache", lambda: cache)
+    monkeypatch.setattr(ap, "get_split_ledger", ledger)
+    return cache, splits
+
+
+def ms(date_iso):
+    return int(dt.datetime.combine(dt.date.fromisoformat(date_iso), dt.time(0), ET).timestamp() * 1000)
+
+
+def test_grouped_daily_caches_raw_bars_and_adjusts_on_read(env, monkeypatch):
+    cache, splits = env
+    calls = []
+
+    def get(url, params):
+        calls.append(params["adjusted"])
+        return {"status": "OK", "results": [{"T": "ZZZ", "o": 100.0, "h": 100.0, "l": 100.0, "c": 100.0, "v": 10.0}]}
+
+    monkeypatch.setattr(ap, "_get", get)
+    assert ap.grouped_daily("2025-06-09")[0]["c"] == 100.0
+    splits["rows"] = [["ZZZ", "2025-06-10", 1.0, 4.0]]  # announced after the session was cached
+    bar = ap.grouped_daily("2025-06-09")[0]
+    assert (bar["c"], bar["v"]) == (25.0, 40.0)
+    assert calls == ["false"]  # the second answer came from the cache
+    assert cache.get("grouped_raw", "*", "2025-06-09")[0]["c"] == 100.0
+
+
+def test_grouped_daily_does_not_cache_an_empty_trading_day(env, monkeypatch):
+    cache, _ = env
+    calls = []
+    monkeypatch.setattr(ap, "_get", lambda url, params: calls.append(url) or {"status": "OK", "results": []})
+    assert ap.grouped_daily("2025-06-09") == []
+    assert ap.grouped_daily("2025-06-09") == []
+    assert len(calls) == 2
+    assert cache.get("grouped_raw", "*", "2025-06-09") is None
+    assert ap.grouped_daily("2025-06-19") == []  # Juneteenth: the empty answer is final
+    assert cache.get("grouped_raw", "*", "2025-06-19") == []
+
+
+def test_daily_range_adjusts_cached_bars_for_later_splits(env, monkeypatch):
+    cache, splits = env
+    calls = []
+    bars = [{"t": ms(d), "o": p, "h": p, "l": p, "c": p, "vw": p, "v": 100.0}
+            for d, p in (("2025-06-09", 80.0), ("2025-06-10", 20.0))]
+    monkeypatch.setattr(ap, "_fetch_daily_range", lambda *a: calls.append(a) or [dict(b) for b in bars])
+
+    assert [b["c"] for b in ap.daily_range("ZZZ", "2025-06-09", "2025-06-10")] == [80.0, 20.0]
+    splits["rows"] = [["ZZZ", "2025-06-10", 1.0, 4.0]]
+    got = ap.daily_range("ZZZ", "2025-06-09", "2025-06-10")
+    assert [(b["c"], b["vw"], b["v"]) for b in got] == [(20.0, 20.0, 400.0), (20.0, 20.0, 100.0)]
+    assert len(calls) == 1
+
+
+def test_daily_range_does_not_cache_an_empty_range_of_trading_days(env, monkeypatch):
+    cache, _ = env
+    calls = []
+    monkeypatch.setattr(ap, "_fetch_daily_range", lambda *a: calls.append(a) or [])
+    assert ap.daily_range("NEW", "2025-06-09", "2025-06-10") == []
+    assert ap.daily_range("NEW", "2025-06-09", "2025-06-10") == []
+    assert len(calls) == 2
+    assert ap.daily_range("NEW", "2025-06-14", "2025-06-15") == []  # a weekend: nothing to wait for
+    assert cache.get_range("day_raw", "NEW", "2025-06-14", "2025-06-15") == []
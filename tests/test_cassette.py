@@ -0,0 +1,79 @@
+"""Record a request against the local stand-in, then replay it with the network disabled"""
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from data.providers.cassette import Cassette, request_key
+from data.providers.polygon_client import PolygonClient
+from scripts.polygon_standin import make_handler
+
+PATH = "/v2/aggs/grouped/locale/us/market/stocks/2025-07-15"
+PARAMS = {"adjusted": "false", "include_otc": "false"}
+BODY = {"status": "OK", "resultsCount": 2,
+        "results": [{"T": "AAA", "c": 10.5, "v": 1000}, {"T": "BBB", "c": 3.25, "v": 500}]}
+
+
+def seed(root):
+    """Upstream cassette the stand-in serves, as if captured from the real API earlier"""
+    r = requests.Response()
+    r.status_code = 200
+    r.headers["Content-Type"] = "application/json"
+    r._content = json.dumps(BODY).encode()
+    Cassette(str(root)).record(PATH, PARAMS, r)
+
+
+@pytest.fixture
+def standin(tmp_path):
+    seed(tmp_path / "upstream")
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(Cassette(str(tmp_path / "upstream")), 0, 0))
+    srv.daemon_threads = True
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def client(monkeypatch, mode, cassette_dir):
+    monkeypatch.setenv("POLYGON_MODE", mode)
+    monkeypatch.setenv("POLYGON_RATE_GOVERNOR", "0")
+    c = PolygonClient(max_concurrency=2)
+    c.cassette = Cassette(str(cassette_dir))
+    return c
+
+
+def test_record_against_standin_then_replay_offline(tmp_path, monkeypatch, standin):
+    recorded = tmp_path / "recorded"
+    monkeypatch.setenv("POLYGON_BASE_URL", standin)
+    monkeypatch.setenv("POLYGON_API_KEY", "secret-key")
+    live = client(monkeypatch, "record", recorded)
+    assert live.get_json(PATH, {**PARAMS, "apiKey": "secret-key"}) == BODY
+    live.close()
+
+    entry = Cassette(str(recorded)).lookup(request_key(PATH, PARAMS))
+    assert entry["status"] == 200 and json.loads(entry["body"]) == BODY
+    assert entry["headers"]["Content-Type"] == "application/json"
+    assert "secret-key" not in json.dumps(entry)
+
+    # no sockets from here on: the replay must be served from disk
+    def no_network(*args, **kwargs):
+        raise AssertionError("network used during replay")
+    monkeypatch.setattr(socket.socket, "connect", no_network)
+    monkeypatch.setattr(socket, "create_connection", no_network)
+    monkeypatch.delenv("POLYGON_BASE_URL")
+
+    offline = client(monkeypatch, "replay", recorded)
+    assert offline.governor is None
+    assert offline.get_json(PATH, PARAMS) == BODY
+    missing = offline.request(PATH, {"adjusted": "true"})
+    assert missing.status_code == 404 and missing.json()["status"] == "NOT_RECORDED"
+    offline.close()
+
+
+def test_standin_reports_unrecorded_requests(standin):
+    r = requests.get(f"{standin}/v2/aggs/grouped/locale/us/market/stocks/2025-07-16", timeout=5)
+    assert r.status_code == 404 and r.json()["status"] == "NOT_RECORDED"
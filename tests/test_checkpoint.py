@@ -0,0 +1,67 @@
+"""Candidate checkpoint: last line per symbol wins, torn tails are skipped, a clean run removes it"""
+import json
+import signal
+
+# The screener installs SIGTERM/SIGINT handlers on import; keep pytest's own
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+
+def cand(symbol, score, price):
+    return {"symbol": symbol, "score": score, "price": price}
+
+
+def test_read_checkpoint_last_line_wins_and_torn_tail_skipped(tmp_path):
+    path = tmp_path / "scan.json.ndjson"
+    cp = us.CandidateCheckpoint(str(path), fsync_every=2)
+    for c in [cand("AAA", 70, 5.0), cand("BBB", 80, 2.0), cand("CCC", 80, 3.0),
+              cand("AAA", 90, 5.5), cand("DDD", 80, 3.0)]:
+        cp.append(c)
+    cp.close()
+    with open(path, "a") as f:
+        f.write('{"symbol": "EEE", "score": 99, "pri')  # killed mid-write
+
+    got = us.read_checkpoint(str(path))
+    assert {c["symbol"]: c["score"] for c in got} == {"AAA": 90, "BBB": 80, "CCC": 80, "DDD": 80}
+    # score, then price, then symbol, all descending (the route's readCheckpoint sorts the same way)
+    assert [c["symbol"] for c in us.rank_candidates(got)] == ["AAA", "DDD", "CCC", "BBB"]
+    assert [c["symbol"] for c in us.rank_candidates(got, 2)] == ["AAA", "DDD"]
+
+
+def test_rank_candidates_missing_fields():
+    got = us.rank_candidates([{"symbol": "A"}, cand("B", None, 1.0), cand("C", 10, None)])
+    assert [c["symbol"] for c in got] == ["C", "B", "A"]
+
+
+def test_read_checkpoint_missing_file(tmp_path):
+    assert us.read_checkpoint(str(tmp_path / "absent.ndjson")) == []
+
+
+def test_main_removes_checkpoint_after_clean_run(tmp_path, monkeypatch, capsys):
+    out = tmp_path / "scan.json"
+    seen = {}
+
+    def screen_universe(self, limit, exclude_symbols, full_universe_mode=False):
+        seen["path"] = us.checkpoint.path
+        for c in [cand("AAA", 60, 1.0), cand("BBB", 75, 2.0), cand("AAA", 80, 1.0)]:
+            us.checkpoint.append(c)
+        return us.rank_candidates(us.read_checkpoint(us.checkpoint.path), limit)
+
+    for name in ("partial_results", "checkpoint", "json_out_path", "heartbeat_path", "result_limit"):
+        monkeypatch.setattr(us, name, getattr(us, name))
+    monkeypatch.setattr(us.UniverseScreener, "screen_universe", screen_universe)
+    monkeypatch.setattr(us.UniverseScreener, "__init__", lambda self: None)
+    monkeypatch.setenv("JSON_OUT_PATH", str(out))
+    monkeypatch.delenv("CHECKPOINT_PATH", raising=False)
+    monkeypatch.delenv("HEARTBEAT_PATH", raising=False)
+    monkeypatch.setattr("sys.argv", ["universe_screener.py", "--limit", "1"])
+
+    us.main()
+
+    assert seen["path"] == f"{out}.ndjson"
+    assert not (tmp_path / "scan.json.ndjson").exists()
+    assert us.checkpoint is None
+    assert json.loads(out.read_text()) == [cand("AAA", 80, 1.0)]
+    assert "__JSON_START__" in capsys.readouterr().out
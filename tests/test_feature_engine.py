@@ -0,0 +1,191 @@
+"""Vectorized feature engine vs the legacy per-symbol feats(), and rolling slides vs full rebuilds"""
+import datetime as dt
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.feature_engine import (BAR_FIELDS, FEATURE_COLUMNS, RollingFeatureState, SessionWindow,
+                                 compute_features)
+
+BUFFER = 0.01
+SYMBOLS = [f"S{i:03d}" for i in range(60)]
+
+
+def session_dates(n, end=dt.date(2025, 3, 31)):
+    """n weekdays ending at `end`, newest first"""
+    out, d = [], end
+    while len(out) < n:
+        if d.weekday() < 5:
+            out.append(d.isoformat())
+        d -= dt.timedelta(days=1)
+    return out
+
+
+def synthetic_sessions(dates, n_symbols=len(SYMBOLS), seed=0):
+    """{date: {sym, o, h, l, c, v}}; each symbol skips some sessions and a few list late"""
+    rng = np.random.default_rng(seed)
+    listed = rng.integers(0, len(dates), size=n_symbols)  # sessions (oldest first) before a symbol trades
+    listed[: n_symbols // 2] = 0
+    price = rng.uniform(1, 80, size=n_symbols)
+    out = {}
+    for k, d in enumerate(sorted(dates)):
+        sym = np.nonzero((listed <= k) & (rng.random(n_symbols) > 0.1))[0]
+        price[sym] *= np.exp(rng.normal(0, 0.04, len(sym)))
+        c = price[sym].copy()
+        o = c * np.exp(rng.normal(0, 0.02, len(sym)))
+        h = np.maximum(o, c) * (1 + rng.uniform(0, 0.05, len(sym)))
+        l = np.minimum(o, c) * (1 - rng.uniform(0, 0.05, len(sym)))
+        v = rng.integers(1_000, 5_000_000, len(sym)).astype(float)
+        out[d] = {"sym": sym.astype(np.int64), "o": o, "h": h, "l": l, "c": c, "v": v}
+    return out
+
+
+def window_of(sessions, days, n_symbols=len(SYMBOLS)):
+    """SessionWindow over `days` (newest first) built from per-session bars"""
+    parts = [(i, sessions[d]) for i, d in enumerate(days) if d in sessions]
+    cols = {"sym": np.concatenate([b["sym"] for _, b in parts]),
+            "day": np.concatenate([np.full(len(b["sym"]), i) for i, b in parts])}
+    for f in BAR_FIELDS:
+        cols[f] = np.concatenate([b[f] for _, b in parts])
+    return SessionWindow.from_columns(cols, SYMBOLS[:n_symbols], len(days))
+
+
+def legacy_feats(df):
+    """The baseline build_universe_v2 feats(), verbatim apart from the config lookup"""
+    if len(df) < 6:
+        return None
+    c = df["c"].values
+    h = df["h"].values
+    l = df["l"].values
+    v = df["v"].values
+    adv = float(np.nanmean(v))
+    avg_dollar = float(np.nanmean(c * v))
+    tr = np.maximum(h - l, np.maximum(np.abs(h - np.r_[c[1:], c[-1]]), np.abs(l - np.r_[c[1:], c[-1]])))
+    atr = float(np.nanmean(tr))
+    atr_pct = float(atr / c[0]) if c[0] else 0.0
+    ret_5d = float(c[0] / c[5] - 1.0) if len(c) > 5 and c[5] else 0.0
+    ret_21d = float(c[0] / c[21] - 1.0) if len(c) > 21 and c[21] else 0.0
+    look = min(21, len(c) - 1)
+    hh20 = float(np.nanmax(c[1:look + 1])) if look >= 2 else np.nan
+    breakout20 = bool((not math.isnan(hh20)) and (c[0] >= hh20 * (1.0 + BUFFER)))
+    return {"symbol": df["T"].iloc[0], "price": float(c[0]), "adv": adv, "avg_dollar": avg_dollar,
+            "atr_pct": atr_pct, "ret_5d": ret_5d, "ret_21d": ret_21d, "breakout20": breakout20}
+
+
+def legacy_frame(sessions, days):
+    rows = [pd.DataFrame({"T": [SYMBOLS[s] for s in b["sym"]], "date": d,
+                          **{f: b[f] for f in ("o", "h", "l", "c", "v")}})
+            for d, b in sessions.items() if d in set(days)]
+    big = pd.concat(rows, ignore_index=True)
+    big["date"] = pd.to_datetime(big["date"])
+    big.sort_values(["T", "date"], ascending=[True, False], inplace=True)
+    feats = [f for _, sdf in big.groupby("T") if (f := legacy_feats(sdf))]
+    return pd.DataFrame(feats)
+
+
+def assert_same_features(got, expected, columns=FEATURE_COLUMNS):
+    got, expected = got.reset_index(drop=True), expected.reset_index(drop=True)
+    assert got["symbol"].tolist() == expected["symbol"].tolist()
+    for col in columns:
+        if col == "symbol":
+            continue
+        a, b = got[col].to_numpy(), expected[col].to_numpy()
+        if a.dtype == bool or b.dtype == bool:
+            assert (a == b).all(), col
+        else:
+            np.testing.assert_allclose(a.astype(float), b.astype(float), rtol=1e-12, atol=0, equal_nan=True, err_msg=col)
+
+
+@pytest.fixture(scope="module")
+def bars():
+    dates = session_dates(60)
+    return dates, synthetic_sessions(dates)
+
+
+def test_compute_features_matches_legacy_feats(bars):
+    dates, sessions = bars
+    days = dates[:40]
+    got = compute_features(window_of(sessions, days), breakout_buffer=BUFFER)
+    expected = legacy_frame(sessions, days)
+    assert len(expected) > 30 and (expected["ret_21d"] != 0).any() and expected["breakout20"].any()
+    assert_same_features(got, expected, list(expected.columns))
+
+
+@pytest.mark.parametrize("step", [1, 3])
+def test_slide_equals_full_rebuild(bars, step):
+    dates, sessions = bars
+    W = 30
+    start = len(dates) - W
+    state = RollingFeatureState.from_window(window_of(sessions, dates[start:start + W]), dates[start:start + W])
+    for end in range(start - step, -1, -step):
+        days = dates[end:end + W]
+        entering = [d for d in days if d not in set(state.days)]
+        state.slide(days, {d: sessions[d] for d in entering})
+        assert_same_features(state.features(BUFFER, windows=[5, 10]),
+                             compute_features(window_of(sessions, days), BUFFER, windows=[5, 10]),
+                             FEATURE_COLUMNS + ["ret_10d", "adv_10d", "atr_pct_10d", "breakout_10d"])
+
+
+def test_slide_skips_sessions_without_bars(bars):
+    dates, sessions = bars
+    W = 25
+    state = RollingFeatureState.from_window(window_of(sessions, dates[2:2 + W]), dates[2:2 + W])
+    holiday = dict(sessions)
+    del holiday[dates[1]]  # a session with no bars at all, e.g. an exchange holiday
+    state.slide(dates[:W], {d: holiday[d] for d in dates[:2] if d in holiday})
+    assert_same_features(state.features(BUFFER), compute_features(window_of(holiday, dates[:W]), BUFFER))
+
+
+def test_slide_rejects_older_sessions(bars):
+    dates, sessions = bars
+    state = RollingFeatureState.from_window(window_of(sessions, dates[:20]), dates[:20])
+    with pytest.raises(ValueError):
+        state.slide(dates[1:21], {dates[20]: sessions[dates[20]]})
+    with pytest.raises(ValueError):
+        state.slide(dates[:19], {})
+
+
+def test_reindex_and_backfill_equal_full_build(bars):
+    dates, sessions = bars
+    W, n_old = 30, 40
+    old_days = dates[1:1 + W]
+    # a state that only knew the first n_old symbols
+    only_old = {d: {f: b[f][b["sym"] < n_old] for f in b} for d, b in sessions.items()}
+    state = RollingFeatureState.from_window(window_of(only_old, old_days, n_old), old_days)
+    state = state.reindex(SYMBOLS[:n_old][::-1] + SYMBOLS[n_old:])  # moved rows and new rows
+    new_rows = np.arange(n_old, len(SYMBOLS))
+    days = dates[:W]
+
+    def remap(b):
+        sym = b["sym"]
+        return {**b, "sym": np.where(sym < n_old, n_old - 1 - sym, sym)}
+
+    state.backfill(new_rows, {d: remap(sessions[d]) for d in old_days if d in set(days)})
+    state.slide(days, {dates[0]: remap(sessions[dates[0]])})
+    got = state.features(BUFFER).sort_values("symbol")
+    assert_same_features(got, compute_features(window_of(sessions, days), BUFFER))
+
+
+def test_save_load_round_trip(bars, tmp_path):
+    dates, sessions = bars
+    state = RollingFeatureState.from_window(window_of(sessions, dates[1:31]), dates[1:31])
+    state.save(tmp_path / "state.npz")
+    loaded = RollingFeatureState.load(tmp_path / "state.npz")
+    assert loaded.symbols == state.symbols and loaded.days == state.days
+    for s in (state, loaded):
+        s.slide(dates[:30], {dates[0]: sessions[dates[0]]})
+    assert_same_features(loaded.features(BUFFER), state.features(BUFFER))
+    assert RollingFeatureState.load(tmp_path / "missing.npz") is None
+
+
+def test_breakout_lookback_counts_prior_closes():
+    # newest first: 100 today, 90 for the 20 prior sessions, then a 120 high 21 sessions back
+    closes = np.r_[100.0, np.full(20, 90.0), 120.0, np.full(8, 80.0)]
+    n = len(closes)
+    cols = {"sym": np.zeros(n, dtype=np.int64), "day": np.arange(n), "c": closes, "o": closes, "h": closes,
+            "l": closes, "v": np.full(n, 1e5)}
+    f = compute_features(SessionWindow.from_columns(cols, ["X"], n), BUFFER, windows=[20, 21]).iloc[0]
+    assert f["breakout_20d"]
+    assert not f["breakout_21d"] and not f["breakout20"]
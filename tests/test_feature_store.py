@@ -0,0 +1,83 @@
+"""Feature store: publish/swap CURRENT, prune around the current version, legacy parquet fallback"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from data import feature_store as fs
+
+
+def features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "symbol": [f"S{i:03d}" for i in range(n)],
+        "price": rng.uniform(1, 50, n),
+        "adv": rng.lognormal(12, 1, n),
+        "breakout20": rng.random(n) < 0.1,
+        "sector": rng.choice(["Technology", None], n),
+    })
+
+
+def test_publish_swaps_current_and_round_trips(tmp_path):
+    store = fs.FeatureStore(tmp_path)
+    assert store.current_version() is None and store.load() is None
+
+    df = features(50)
+    m1 = store.publish(df, as_of="2025-07-15", build="test")
+    assert store.current_version() == m1["version"]
+    assert (m1["rows"], m1["as_of"], m1["build"]) == (50, "2025-07-15", "test")
+    assert json.loads((tmp_path / "manifest.json").read_text()) == m1
+
+    snap = store.load()
+    assert snap.version == m1["version"]
+    assert m1["schema_hash"] == fs.schema_hash(snap.table.schema)
+    pd.testing.assert_frame_equal(snap.to_pandas(), df)
+
+    # identical content keeps its version; new content swaps CURRENT and leaves the old snapshot readable
+    assert store.publish(df.copy(), as_of="2025-07-15")["version"] == m1["version"]
+    m2 = store.publish(features(60, seed=1), as_of="2025-07-16")
+    assert m2["version"] != m1["version"]
+    assert store.current_version() == m2["version"]
+    assert len(store.load().to_pandas()) == 60
+    pd.testing.assert_frame_equal(store.load(m1["version"]).to_pandas(), df)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_prune_keeps_current(tmp_path):
+    store = fs.FeatureStore(tmp_path)
+    for seed in range(4):
+        store.publish(features(10, seed))
+    versions = store.versions()
+    assert len(versions) == 4
+
+    # a rollback points CURRENT at an older snapshot; pruning must not delete it
+    (tmp_path / "CURRENT").write_text(versions[0] + "\n")
+    store.prune(keep=1)
+    assert store.versions() == [versions[0], versions[-1]]
+    assert store.load().version == versions[0]
+    assert sorted(p.name for p in store.snap_dir.iterdir()) == sorted(
+        f"{v}{ext}" for v in (versions[0], versions[-1]) for ext in (".arrow", ".json"))
+
+
+def test_load_universe_features_falls_back_to_legacy_parquet(tmp_path, monkeypatch):
+    store = fs.FeatureStore(tmp_path / "store")
+    legacy = tmp_path / "universe_features.parquet"
+    monkeypatch.setattr(fs, "LEGACY_PARQUET", legacy)
+    assert fs.load_universe_features(store) == (None, "")
+
+    df = features(20)
+    df.to_parquet(legacy, index=False)
+    got, version = fs.load_universe_features(store)
+    assert version == f"parquet:{legacy.stat().st_mtime_ns}"
+    pd.testing.assert_frame_equal(got, df)
+
+    m = store.publish(features(30, seed=2))
+    got, version = fs.load_universe_features(store)
+    assert version == m["version"] and len(got) == 30
+
+
+def test_unreadable_snapshot_loads_as_none(tmp_path):
+    store = fs.FeatureStore(tmp_path)
+    version = store.publish(features(5))["version"]
+    (store.snap_dir / f"{version}.arrow").write_bytes(b"not arrow")
+    assert store.load() is None
@@ -0,0 +1,86 @@
+"""A full-universe expansion scores only the names it adds and ends where a cold full-universe screen does"""
+import signal
+
+import numpy as np
+import pandas as pd
+
+from data.providers.alpha_providers import MinuteBarsBatch
+
+# The screener installs SIGTERM/SIGINT handlers on import; keep pytest's own
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+CONF = {
+    "prefilter_strategy": {"adv_pct_min": 60, "dollar_pct_min": 60, "atr_pct_min": 70,
+                           "step_percentile": 5, "target_keep": 40, "min_keep": 30},
+    "full_universe_mode": {"enabled": True, "target_keep": 250, "min_keep": 200, "activate_when": 10},
+}
+
+
+def frame(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "symbol": [f"S{i:04d}" for i in range(n)],
+        "price": rng.uniform(1, 90, n).round(2),
+        "prev_close": rng.uniform(1, 90, n).round(2),
+        "adv": rng.lognormal(13, 1.5, n),
+        "avg_dollar": rng.lognormal(16, 1.5, n),
+        "atr_pct": rng.uniform(0.005, 0.12, n),
+        "ret_5d": rng.normal(0.0, 0.05, n),
+        "ret_21d": rng.normal(0.0, 0.12, n),
+        "breakout20": rng.random(n) < 0.02,
+        "sector": rng.choice(["Technology", "Healthcare", None], n),
+    })
+
+
+def fake_minute_bars_many(calls):
+    def minute_bars_many(symbols):
+        symbols = list(dict.fromkeys(symbols))
+        calls.append(symbols)
+        counts = np.array([0] + [30 + int(s[1:]) % 40 for s in symbols])
+        offsets = np.cumsum(counts)
+        v = np.concatenate([np.full(k, 500.0 * (1 + int(s[1:]) % 17)) for s, k in zip(symbols, counts[1:])])
+        return MinuteBarsBatch(symbols, offsets, np.arange(len(v)), v, np.full(len(v), np.nan))
+    return minute_bars_many
+
+
+def screen(monkeypatch, full_universe_mode):
+    scored, fetched = [], []
+    real = us.score_frame
+
+    def score_frame(df, *args, **kwargs):
+        scored.append(df["symbol"].tolist())
+        return real(df, *args, **kwargs)
+
+    monkeypatch.setattr(us, "CONF", CONF)
+    monkeypatch.setattr(us, "score_frame", score_frame)
+    monkeypatch.setattr(us, "minute_bars_many", fake_minute_bars_many(fetched))
+    monkeypatch.setattr(us, "short_metrics", lambda symbol: {"short_interest": 0.25, "borrow_fee": 0.3}
+                        if int(symbol[1:]) % 5 == 0 else None)
+    monkeypatch.setattr(us, "checkpoint", None)
+    monkeypatch.setattr(us, "partial_results", [])
+
+    screener = us.UniverseScreener()
+    screener.features_version = "test"
+    out = screener._screen(frame(), [], us.ScanContext("test"), 5, full_universe_mode)
+    for c in out:
+        c["timestamps"].pop("scan_time")
+    return out, scored, fetched
+
+
+def test_expansion_scores_only_added_symbols(monkeypatch):
+    expanded, scored, fetched = screen(monkeypatch, False)
+    assert len(scored) == 2  # regular pass, then the auto-activated full-universe pass
+    first, added = scored
+    assert first and added
+    assert not set(first) & set(added)
+    assert len(set(first) | set(added)) == len(first) + len(added)
+    assert [set(f) for f in fetched] == [set(first), set(added)]
+
+    cold, cold_scored, _ = screen(monkeypatch, True)
+    assert len(cold_scored) == 1
+    assert set(cold_scored[0]) == set(first) | set(added)
+    assert expanded == cold
+    assert len(cold) == 5
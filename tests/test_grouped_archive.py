@@ -0,0 +1,73 @@
+"""Grouped daily archive: unadjusted storage, split adjustment on read, and what gets archived"""
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from data.providers import grouped_archive as ga
+from data.providers.splits import SplitLedger
+
+# ZZZ splits 4-for-1 (split_from 1, split_to 4) executing 2025-06-10
+SPLITS = [["ZZZ", "2025-06-10", 1.0, 4.0]]
+
+
+def ledger(tmp_path, rows=SPLITS):
+    return SplitLedger(path=tmp_path / "splits.json", fetch=lambda since, until: [list(r) for r in rows])
+
+
+def session(prices, tickers=("AAA", "ZZZ")):
+    p = np.asarray(prices, dtype=float)
+    return pa.table({"T": list(tickers), "o": p, "h": p * 1.1, "l": p * 0.9, "c": p, "v": np.full(len(p), 1000.0)},
+                    schema=ga.SCHEMA)
+
+
+def test_ledger_adjusts_bars_before_the_split(tmp_path):
+    led = ledger(tmp_path)
+    before = led.adjust_table(session([10.0, 100.0]), "2025-06-09").to_pydict()
+    assert before["c"] == [10.0, 25.0] and before["v"] == [1000.0, 4000.0]
+    assert before["h"][1] == pytest.approx(27.5)
+    on = led.adjust_table(session([10.0, 25.0]), "2025-06-10").to_pydict()
+    assert on["c"] == [10.0, 25.0] and on["v"] == [1000.0, 1000.0]
+    assert led.split_after("2025-06-09") == {"ZZZ"} and led.split_after("2025-06-10") == set()
+    assert json.loads((tmp_path / "splits.json").read_text())["splits"] == SPLITS
+
+
+def test_ledger_keeps_the_last_file_when_a_refresh_fails(tmp_path):
+    ledger(tmp_path).factors("2025-06-01")
+    offline = SplitLedger(path=tmp_path / "splits.json", fetch=lambda since, until: None)
+    assert offline.factors("2025-06-01") == {"ZZZ": 0.25}
+
+
+def test_archive_stores_raw_and_reads_adjusted(tmp_path):
+    arc = ga.GroupedDailyArchive(root=tmp_path / "grouped", splits=ledger(tmp_path))
+    arc.write("2025-06-09", session([10.0, 100.0]))
+    index = ga.SymbolIndex(["AAA", "ZZZ"])
+    cols = arc.session_columns("2025-06-09", index)
+    assert cols["c"].tolist() == [10.0, 25.0]
+    assert cols["v"].tolist() == [1000.0, 4000.0]
+    stored = ga.pq.read_table(arc.path("2025-06-09")).to_pydict()
+    assert stored["c"] == [10.0, 100.0]  # the file itself stays unadjusted
+    assert arc.read(["2025-06-09"])["c"].tolist() == [10.0, 25.0]
+
+
+def test_fetch_requests_unadjusted_bars_and_skips_empty_trading_days(tmp_path, monkeypatch):
+    from data.providers import alpha_providers
+    calls = []
+    bodies = {"2025-06-09": {"status": "OK", "results": []},
+              "2025-06-06": {"status": "OK", "results": [{"T": "AAA", "o": 1, "h": 1, "l": 1, "c": 1, "v": 5}]}}
+
+    def raw(date_iso, include_otc=False, adjusted=True):
+        calls.append((date_iso, adjusted))
+        return json.dumps(bodies[date_iso]).encode()
+
+    monkeypatch.setattr(alpha_providers, "grouped_daily_raw", raw)
+    monkeypatch.setattr(ga, "session_is_closed", lambda d: True)
+    arc = ga.GroupedDailyArchive(root=tmp_path / "grouped", splits=ledger(tmp_path))
+
+    assert arc.fetch("2025-06-09") is None  # a trading day with no bars is not final data
+    assert not arc.has("2025-06-09")
+    assert arc.fetch("2025-06-06").num_rows == 1 and arc.has("2025-06-06")
+    assert arc.fetch("2025-06-19").num_rows == 0  # Juneteenth: archived empty without a request
+    assert arc.has("2025-06-19")
+    assert calls == [("2025-06-09", False), ("2025-06-06", False)]
@@ -0,0 +1,98 @@
+"""build_universe_v2 --incremental: a symbol that enters the universe mid-window gets full-build features"""
+import datetime as dt
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import scripts.build_universe_v2 as build
+from data.feature_engine import RollingFeatureState, SessionWindow, compute_features
+from data.providers.grouped_archive import SCHEMA, GroupedDailyArchive, SymbolIndex
+from data.providers.splits import SplitLedger
+
+W = 25
+BUFFER = 0.01
+
+
+def weekdays(n, end=dt.date(2025, 6, 27)):
+    out, d = [], end
+    while len(out) < n:
+        if d.weekday() < 5:
+            out.append(d.isoformat())
+        d -= dt.timedelta(days=1)
+    return out  # newest first
+
+
+def ledger(tmp_path, rows):
+    return SplitLedger(path=tmp_path / f"splits{len(rows)}.json", fetch=lambda since, until: rows)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Every session archived (so nothing is fetched); NEWCO lists ten sessions into the window"""
+    days = weekdays(W + 1)
+    rng = np.random.default_rng(7)
+    arc = GroupedDailyArchive(root=tmp_path / "grouped", splits=ledger(tmp_path, []))
+    tickers = [f"T{i:02d}" for i in range(20)]
+    for k, d in enumerate(reversed(days)):  # oldest first
+        names = [t for t in tickers if rng.random() > 0.1] + (["NEWCO"] if k >= 10 else [])
+        c = rng.uniform(2, 50, len(names))
+        arc.write(d, pa.table({"T": names, "o": c * 0.99, "h": c * 1.03, "l": c * 0.96, "c": c,
+                               "v": rng.integers(1_000, 900_000, len(names)).astype(float)}, schema=SCHEMA))
+    return arc, days, tickers
+
+
+def full_build(arc, days, index):
+    cols = arc.read_columns(days, index)
+    return compute_features(SessionWindow.from_columns(cols, index.symbols, len(days)), BUFFER)
+
+
+def test_symbol_entering_universe_matches_full_build(archive):
+    arc, days, tickers = archive
+    old_days, new_days = days[1:], days[:W]
+
+    # yesterday's build did not have NEWCO in its universe
+    old_index = SymbolIndex(tickers)
+    cols = arc.read_columns(old_days, old_index)
+    state = RollingFeatureState.from_window(SessionWindow.from_columns(cols, old_index.symbols, W), old_days)
+    assert "NEWCO" not in state.features(BUFFER)["symbol"].tolist()
+
+    index = SymbolIndex(tickers + ["NEWCO"])
+    rolled = build.roll_state(state, new_days, arc, index)
+    assert rolled is not None
+
+    got = rolled.features(BUFFER).reset_index(drop=True)
+    expected = full_build(arc, new_days, index).reset_index(drop=True)
+    assert "NEWCO" in got["symbol"].tolist()
+    assert got["symbol"].tolist() == expected["symbol"].tolist()
+    for col in expected.columns[1:]:
+        np.testing.assert_allclose(got[col].to_numpy(float), expected[col].to_numpy(float),
+                                   rtol=1e-12, equal_nan=True, err_msg=col)
+
+
+def test_unarchived_backfill_session_falls_back_to_rebuild(archive):
+    arc, days, tickers = archive
+    old_index = SymbolIndex(tickers)
+    cols = arc.read_columns(days[1:], old_index)
+    state = RollingFeatureState.from_window(SessionWindow.from_columns(cols, old_index.symbols, W), days[1:])
+    arc.path(days[5]).unlink()  # NEWCO's bars for this session cannot be backfilled
+    assert build.roll_state(state, days[:W], arc, SymbolIndex(tickers + ["NEWCO"])) is None
+
+
+def test_symbol_split_since_the_saved_window_is_reloaded(archive, tmp_path):
+    arc, days, tickers = archive
+    index = SymbolIndex(tickers)
+    cols = arc.read_columns(days[1:], index)
+    state = RollingFeatureState.from_window(SessionWindow.from_columns(cols, index.symbols, W), days[1:])
+
+    # T03 splits 3-for-1 on the new session: every bar the state holds for it is now stale
+    split = GroupedDailyArchive(root=arc.root, splits=ledger(tmp_path, [["T03", days[0], 1.0, 3.0]]))
+    rolled = build.roll_state(state, days[:W], split, index)
+    got = rolled.features(BUFFER).reset_index(drop=True)
+    expected = full_build(split, days[:W], index).reset_index(drop=True)
+    assert got["symbol"].tolist() == expected["symbol"].tolist()
+    for col in expected.columns[1:]:
+        np.testing.assert_allclose(got[col].to_numpy(float), expected[col].to_numpy(float),
+                                   rtol=1e-12, equal_nan=True, err_msg=col)
+    unadjusted = full_build(arc, days[:W], index)
+    assert expected.loc[expected["symbol"] == "T03", "adv"].iloc[0] != unadjusted.loc[unadjusted["symbol"] == "T03", "adv"].iloc[0]
@@ -0,0 +1,67 @@
+"""Provider metrics: counters, gauges, histograms and their Prometheus text export"""
+import threading
+
+from data.providers import instrumentation as ins
+
+
+def test_counters_and_gauges():
+    reg = ins.Registry()
+    reg.inc("polygon_requests_total", endpoint="aggs_day", status=200)
+    reg.inc("polygon_requests_total", 2, status="200", endpoint="aggs_day")
+    reg.inc("polygon_requests_total", endpoint="grouped_daily", status=429)
+    reg.gauge_add("polygon_inflight", 3)
+    reg.gauge_add("polygon_inflight", -1)
+
+    snap = reg.snapshot()
+    values = {tuple(sorted(s["labels"].items())): s["value"] for s in snap["counters"]["polygon_requests_total"]}
+    assert values == {(("endpoint", "aggs_day"), ("status", "200")): 3,
+                      (("endpoint", "grouped_daily"), ("status", "429")): 1}
+    assert snap["gauges"]["polygon_inflight"] == [{"labels": {}, "value": 2}]
+
+
+def test_counter_is_thread_safe():
+    reg = ins.Registry()
+
+    def work():
+        for _ in range(2000):
+            reg.inc("hits", endpoint="x")
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert reg.snapshot()["counters"]["hits"][0]["value"] == 16000
+
+
+def test_histogram_buckets():
+    h = ins.Histogram(bounds=(10, 100))
+    for v in (1, 10, 11, 100, 5000):
+        h.observe(v)
+    assert h.to_dict() == {"buckets": {"10": 2, "100": 4, "+Inf": 5}, "sum": 5122.0, "count": 5}
+
+
+def test_prometheus_text():
+    reg = ins.Registry()
+    reg.inc("cache_hits_total", 4, cache="agg")
+    reg.gauge_add("inflight", 1)
+    reg.observe("latency_ms", 7, endpoint="aggs_day")
+    reg.observe("latency_ms", 20000, endpoint="aggs_day")
+    text = reg.prometheus()
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert lines[:4] == ['# TYPE cache_hits_total counter', 'cache_hits_total{cache="agg"} 4',
+                         '# TYPE inflight gauge', 'inflight 1']
+    assert '# TYPE latency_ms histogram' in lines
+    assert 'latency_ms_bucket{endpoint="aggs_day",le="5"} 0' in lines
+    assert 'latency_ms_bucket{endpoint="aggs_day",le="10"} 1' in lines
+    assert 'latency_ms_bucket{endpoint="aggs_day",le="10000"} 1' in lines
+    assert 'latency_ms_bucket{endpoint="aggs_day",le="+Inf"} 2' in lines
+    assert 'latency_ms_sum{endpoint="aggs_day"} 20007' in lines
+    assert 'latency_ms_count{endpoint="aggs_day"} 2' in lines
+
+
+def test_prometheus_escapes_label_values():
+    reg = ins.Registry()
+    reg.inc("errors_total", error='bad "quote"\\path\nline two')
+    assert reg.prometheus().splitlines()[1] == r'errors_total{error="bad \"quote\"\\path\nline two"} 1'
@@ -0,0 +1,86 @@
+"""NYSE session calendar: holidays, early closes, session times and finality"""
+import datetime as dt
+
+import pytest
+
+from data import market_calendar as mc
+
+D = dt.date
+ET = mc.ET
+
+HOLIDAYS_2025 = [D(2025, 1, 1), D(2025, 1, 9), D(2025, 1, 20), D(2025, 2, 17), D(2025, 4, 18), D(2025, 5, 26),
+                 D(2025, 6, 19), D(2025, 7, 4), D(2025, 9, 1), D(2025, 11, 27), D(2025, 12, 25)]
+HOLIDAYS_2026 = [D(2026, 1, 1), D(2026, 1, 19), D(2026, 2, 16), D(2026, 4, 3), D(2026, 5, 25), D(2026, 6, 19),
+                 D(2026, 7, 3), D(2026, 9, 7), D(2026, 11, 26), D(2026, 12, 25)]
+HOLIDAYS_2027 = [D(2027, 1, 1), D(2027, 1, 18), D(2027, 2, 15), D(2027, 3, 26), D(2027, 5, 31), D(2027, 6, 18),
+                 D(2027, 7, 5), D(2027, 9, 6), D(2027, 11, 25), D(2027, 12, 24)]
+
+
+@pytest.mark.parametrize("year, expected", [(2025, HOLIDAYS_2025), (2026, HOLIDAYS_2026), (2027, HOLIDAYS_2027)])
+def test_holidays_match_published_lists(year, expected):
+    assert sorted(mc.holidays(year)) == expected
+
+
+def test_saturday_new_year_is_not_observed_on_friday():
+    assert mc.is_trading_day(D(2021, 12, 31))
+    assert D(2022, 1, 1) not in mc.holidays(2022)
+
+
+def test_trading_days_skip_weekends_and_holidays():
+    assert not mc.is_trading_day(D(2025, 7, 5))  # Saturday
+    assert not mc.is_trading_day("2025-11-27")
+    assert mc.is_trading_day("2025-11-28")
+    assert mc.previous_trading_day(D(2025, 12, 26)) == D(2025, 12, 24)
+    assert mc.next_trading_day(D(2025, 4, 17)) == D(2025, 4, 21)  # over Good Friday and the weekend
+    assert mc.trading_days_before(3, D(2025, 1, 21)) == [D(2025, 1, 17), D(2025, 1, 16), D(2025, 1, 15)]
+
+
+@pytest.mark.parametrize("day, early", [
+    (D(2025, 7, 3), True), (D(2025, 11, 28), True), (D(2025, 12, 24), True),
+    (D(2026, 7, 2), False),  # July 3 is the observed holiday, not an early close
+    (D(2026, 11, 27), True), (D(2026, 12, 24), True),
+    (D(2027, 12, 24), False),  # observed Christmas: closed all day
+    (D(2025, 12, 23), False),
+])
+def test_early_closes(day, early):
+    assert mc.is_early_close(day) is early
+
+
+def test_session_times():
+    s = mc.session("2025-11-28")
+    assert s.early_close
+    assert (s.open.time(), s.close.time(), s.postmarket_end.time()) == (dt.time(9, 30), dt.time(13), dt.time(17))
+    s = mc.session("2025-12-01")
+    assert not s.early_close
+    assert (s.premarket_start.time(), s.close.time(), s.postmarket_end.time()) == (dt.time(4), dt.time(16), dt.time(20))
+    assert mc.session("2025-12-25") is None
+
+
+def test_market_phase_and_current_session():
+    at = lambda *a: dt.datetime(*a, tzinfo=ET)
+    assert mc.market_phase(at(2025, 12, 1, 3, 59)) == "closed"
+    assert mc.market_phase(at(2025, 12, 1, 4)) == "premarket"
+    assert mc.market_phase(at(2025, 12, 1, 9, 30)) == "regular"
+    assert mc.market_phase(at(2025, 11, 28, 13)) == "postmarket"
+    assert mc.market_phase(at(2025, 11, 28, 17)) == "closed"
+    assert mc.current_session(at(2025, 12, 1, 3)) == D(2025, 11, 28)
+    assert mc.current_session(at(2025, 12, 1, 4)) == D(2025, 12, 1)
+    assert mc.current_session(at(2025, 12, 25, 12)) == D(2025, 12, 24)
+
+
+def test_session_is_final():
+    at = lambda *a: dt.datetime(*a, tzinfo=ET)
+    now = at(2025, 12, 1, 12)
+    assert mc.session_is_final("2025-11-28", now)
+    assert not mc.session_is_final("2025-12-02", now)
+    assert not mc.session_is_final("2025-12-01", now)
+    assert not mc.session_is_final("2025-12-01", at(2025, 12, 1, 19, 59))
+    assert mc.session_is_final("2025-12-01", at(2025, 12, 1, 20))
+    # early close: post-market ends at 17:00
+    assert not mc.session_is_final("2025-11-28", at(2025, 11, 28, 16, 59))
+    assert mc.session_is_final("2025-11-28", at(2025, 11, 28, 17))
+    # no session at all: nothing will trade, so the (empty) day is final at once
+    assert mc.session_is_final("2025-12-25", at(2025, 12, 25, 9))
+    assert mc.session_is_final("2025-12-06", at(2025, 12, 6, 9))
+    # callers in other timezones are converted to ET
+    assert mc.session_is_final("2025-12-01", dt.datetime(2025, 12, 2, 1, 0, tzinfo=dt.timezone.utc))
@@ -0,0 +1,41 @@
+"""Portfolio worker market context follows the ET exchange session, early closes and holidays included"""
+import datetime as dt
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("schedule")
+
+from data.market_calendar import ET
+from portfolio_background_worker import PortfolioAnalyzer
+
+
+def at(y, m, d, hh, mm):
+    return dt.datetime(y, m, d, hh, mm, tzinfo=ET)
+
+
+@pytest.mark.parametrize("now, expected", [
+    (at(2025, 7, 15, 3, 59), "AFTER_HOURS"),
+    (at(2025, 7, 15, 4, 0), "PRE_MARKET"),
+    (at(2025, 7, 15, 9, 29), "PRE_MARKET"),
+    (at(2025, 7, 15, 9, 30), "MARKET_OPEN"),
+    (at(2025, 7, 15, 11, 59), "MARKET_OPEN"),
+    (at(2025, 7, 15, 12, 0), "MIDDAY"),
+    (at(2025, 7, 15, 14, 59), "MIDDAY"),
+    (at(2025, 7, 15, 15, 0), "POWER_HOUR"),
+    (at(2025, 7, 15, 15, 59), "POWER_HOUR"),
+    (at(2025, 7, 15, 16, 0), "AFTER_CLOSE"),
+    (at(2025, 7, 15, 19, 59), "AFTER_CLOSE"),
+    (at(2025, 7, 15, 20, 0), "AFTER_HOURS"),
+    # early close (day after Thanksgiving): the power hour ends at 13:00, post-market at 17:00
+    (at(2025, 11, 28, 12, 0), "POWER_HOUR"),
+    (at(2025, 11, 28, 13, 0), "AFTER_CLOSE"),
+    (at(2025, 11, 28, 17, 0), "AFTER_HOURS"),
+    # weekend and holiday
+    (at(2025, 7, 12, 10, 0), "AFTER_HOURS"),
+    (at(2025, 7, 4, 10, 0), "AFTER_HOURS"),
+    # a Pacific clock reads the same instant
+    (dt.datetime(2025, 7, 15, 6, 45, tzinfo=dt.timezone(dt.timedelta(hours=-7))), "MARKET_OPEN"),
+])
+def test_market_context(now, expected):
+    assert PortfolioAnalyzer.get_market_context(None, now) == expected
@@ -0,0 +1,68 @@
+"""minute_bars_many: one columnar batch, deduplicated symbols, empty spans for symbols without bars"""
+import threading
+
+import numpy as np
+import pytest
+
+from data.providers import alpha_providers as ap
+from data.providers.polygon_client import PolygonClient
+
+BARS = {
+    "AAA": [{"t": 1000, "v": 10, "c": 1.0}, {"t": 2000, "v": 20, "c": 1.1}, {"t": 3000, "v": None, "c": 1.2}],
+    "BBB": [],
+    "CCC": None,
+    "DDD": [{"t": 4000, "v": 5, "c": 9.5}],
+}
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    monkeypatch.setenv("POLYGON_RATE_GOVERNOR", "0")
+    calls, lock = [], threading.Lock()
+
+    def minute_bars(symbol):
+        with lock:
+            calls.append(symbol)
+        return BARS.get(symbol)
+
+    client = PolygonClient(max_concurrency=3)
+    monkeypatch.setattr(ap, "POLYGON", "test-key")
+    monkeypatch.setattr(ap, "minute_bars", minute_bars)
+    monkeypatch.setattr(ap, "get_client", lambda: client)
+    yield calls
+    client.close()
+
+
+def test_offsets_and_columns(fetched):
+    batch = ap.minute_bars_many(["AAA", "BBB", "CCC", "DDD"])
+    assert len(batch) == 4
+    assert batch.offsets.tolist() == [0, 3, 3, 3, 4]
+    assert batch.t.tolist() == [1000, 2000, 3000, 4000]
+    assert batch.v.tolist() == [10, 20, 0, 5]  # a missing volume reads as 0
+    assert batch.timestamps("AAA").tolist() == [1000, 2000, 3000]
+    assert batch.volumes("DDD").tolist() == [5]
+    assert batch.prices("AAA").tolist() == [1.0, 1.1, 1.2]
+
+
+def test_symbols_without_bars(fetched):
+    batch = ap.minute_bars_many(["BBB", "AAA", "CCC", "ZZZ"])
+    assert [batch.count(s) for s in ("AAA", "BBB", "CCC", "ZZZ", "NOT_ASKED")] == [3, 0, 0, 0, 0]
+    assert "AAA" in batch
+    assert "BBB" not in batch and "CCC" not in batch and "ZZZ" not in batch and "NOT_ASKED" not in batch
+    assert batch.volumes("BBB").size == 0 and batch.prices("NOT_ASKED").size == 0
+
+
+def test_symbols_deduplicated_in_order(fetched):
+    batch = ap.minute_bars_many(["DDD", "AAA", "DDD", "AAA", "BBB"])
+    assert batch.symbols == ["DDD", "AAA", "BBB"]
+    assert sorted(fetched) == ["AAA", "BBB", "DDD"]  # one fetch per symbol
+    assert batch.offsets.tolist() == [0, 1, 4, 4]
+    assert batch.volumes("AAA").tolist() == [10, 20, 0]
+
+
+def test_no_key_no_fetch(fetched, monkeypatch):
+    monkeypatch.setattr(ap, "POLYGON", None)
+    batch = ap.minute_bars_many(["AAA", "BBB"])
+    assert fetched == []
+    assert batch.offsets.tolist() == [0, 0, 0] and batch.t.dtype == np.int64
+    assert "AAA" not in batch
@@ -0,0 +1,115 @@
+"""PolygonClient: in-flight requests stay under max_concurrency; 429s retry, then give up"""
+import threading
+import time
+import types
+
+import pytest
+import requests
+
+from data.providers import polygon_client
+
+URL = "/v2/aggs/ticker/AAA/range/1/day/2025-07-01/2025-07-15"
+
+
+def response(status, retry_after=None, body=b'{"status": "OK"}'):
+    r = requests.Response()
+    r.status_code = status
+    if retry_after is not None:
+        r.headers["Retry-After"] = retry_after
+    r._content = body
+    return r
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    monkeypatch.delenv("POLYGON_MODE", raising=False)
+    monkeypatch.setenv("POLYGON_RATE_GOVERNOR", "0")
+    clients = []
+
+    def make(max_concurrency, get):
+        c = polygon_client.PolygonClient(max_concurrency=max_concurrency)
+        monkeypatch.setattr(c.session, "get", get)
+        clients.append(c)
+        return c
+    yield make
+    for c in clients:
+        c.close()
+
+
+class InFlight:
+    """session.get stand-in that holds each request briefly and records the peak concurrency"""
+
+    def __init__(self, hold=0.01):
+        self.hold = hold
+        self.lock = threading.Lock()
+        self.now = self.peak = self.calls = 0
+
+    def __call__(self, url, **kw):
+        with self.lock:
+            self.now += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.now)
+        time.sleep(self.hold)
+        with self.lock:
+            self.now -= 1
+        if "FAIL" in url:
+            return response(500)
+        return response(200, body=('{"url": "%s"}' % url).encode())
+
+
+def test_imap_unordered_stays_under_max_concurrency(make_client):
+    get = InFlight()
+    client = make_client(4, get)
+    urls = [f"/v2/aggs/ticker/S{i}/range/1/minute/2025-07-15/2025-07-15" for i in range(40)]
+    got = dict(client.imap_unordered(lambda u: client.get_json(u)["url"], urls))
+    assert got == {u: polygon_client.polygon_url(u) for u in urls}
+    assert get.calls == 40
+    assert 1 < get.peak <= 4
+
+
+def test_request_bounds_callers_outside_the_pool(make_client):
+    get = InFlight()
+    client = make_client(3, get)
+    threads = [threading.Thread(target=client.request, args=(URL,)) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert get.calls == 12
+    assert get.peak <= 3
+
+
+def test_get_many_returns_errors_in_place(make_client):
+    get = InFlight(hold=0.0)
+    client = make_client(2, get)
+    out = client.get_many([("/v2/a", None), ("/v2/FAIL", None), ("/v2/b", {"x": 1})])
+    assert out[0] == {"url": polygon_client.polygon_url("/v2/a")}
+    assert isinstance(out[1], requests.HTTPError)
+    assert out[2] == {"url": polygon_client.polygon_url("/v2/b")}
+
+
+def test_429_retries_then_succeeds(make_client, monkeypatch):
+    slept = []
+    monkeypatch.setattr(polygon_client, "time", types.SimpleNamespace(perf_counter=time.perf_counter,
+                                                                       sleep=slept.append))
+    replies = [response(429, "1.5"), response(429), response(200)]
+    client = make_client(1, lambda url, **kw: replies.pop(0))
+    assert client.request(URL).status_code == 200
+    assert replies == []
+    assert slept == [1.5, 4.0]  # Retry-After when given, else exponential backoff
+
+
+def test_429_gives_up_after_max_retries(make_client, monkeypatch):
+    slept, calls = [], []
+    monkeypatch.setattr(polygon_client, "time", types.SimpleNamespace(perf_counter=time.perf_counter,
+                                                                       sleep=slept.append))
+
+    def get(url, **kw):
+        calls.append(url)
+        return response(429)
+    client = make_client(1, get)
+    assert client.request(URL).status_code == 429
+    assert len(calls) == polygon_client.MAX_429_RETRIES + 1
+    assert slept == [min(30.0, 2.0 ** a) for a in range(1, polygon_client.MAX_429_RETRIES + 1)]
+    with pytest.raises(requests.HTTPError):
+        client.get_json(URL)
@@ -0,0 +1,104 @@
+"""RankNarrowing must pick the same step, thresholds and survivors as relaxing one step at a time"""
+import signal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The screener installs SIGTERM/SIGINT handlers on import; keep pytest's own
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+ORDER = dict(by=["avg_dollar", "atr_pct", "ret_5d", "symbol"], ascending=[False, False, False, True])
+
+
+def baseline(rows_df, adv_pct, dol_pct, atrp_pct, step, shortlist_min):
+    """The relax-and-rescan loop RankNarrowing replaced, verbatim"""
+    def pct(a, p):
+        a = np.array(a, dtype=float)
+        return float(np.nanpercentile(a, p)) if len(a) else np.nan
+
+    advs = rows_df["adv"].to_numpy()
+    dols = rows_df["avg_dollar"].to_numpy()
+    atrs = rows_df["atr_pct"].to_numpy()
+
+    while True:
+        a_thr = pct(advs, adv_pct)
+        d_thr = pct(dols, dol_pct)
+        t_thr = pct(atrs, atrp_pct)
+        base = rows_df[(rows_df["adv"]>=a_thr) & (rows_df["avg_dollar"]>=d_thr) & (rows_df["atr_pct"]>=t_thr)]
+        hot  = rows_df[(rows_df["ret_5d"]>=0.10) | (rows_df["breakout20"]==True)]
+        survivors_df = pd.concat([base, hot]).drop_duplicates(subset=["symbol"])
+        if len(survivors_df) >= shortlist_min or (adv_pct<=10 and dol_pct<=10 and atrp_pct<=20):
+            break
+        adv_pct   = max(10, adv_pct - step)
+        dol_pct   = max(10, dol_pct - step)
+        atrp_pct  = max(20, atrp_pct - step)
+    return survivors_df, (adv_pct, dol_pct, atrp_pct)
+
+
+def frame(n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "symbol": [f"S{i:04d}" for i in range(n)],
+        "adv": rng.lognormal(13, 2, n),
+        "avg_dollar": rng.lognormal(16, 2, n),
+        "atr_pct": rng.uniform(0.005, 0.15, n),
+        "ret_5d": rng.normal(0.0, 0.06, n),
+        "breakout20": rng.random(n) < 0.03,
+    })
+    # missing values and ties, as real snapshots have
+    for col in ("adv", "avg_dollar", "atr_pct"):
+        df.loc[rng.random(n) < 0.05, col] = np.nan
+    df.loc[rng.random(n) < 0.05, "avg_dollar"] = 1e6
+    return df
+
+
+def shortlist(df):
+    return df.sort_values(**ORDER)["symbol"].tolist()
+
+
+# (adv%, $vol%, atr%, step, min_keep): config defaults, full-universe mode, never satisfied,
+# satisfied at the start, starts below the floors, and a step that never reaches them
+CASES = [
+    (40, 40, 60, 5, 120),
+    (20, 20, 30, 2, 1000),
+    (40, 40, 60, 5, 10_000),
+    (40, 40, 60, 5, 1),
+    (5, 40, 15, 5, 400),
+    (40, 40, 60, 0, 300),
+]
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("adv_pct,dol_pct,atrp_pct,step,min_keep", CASES)
+def test_rank_narrowing_matches_relaxation_loop(seed, adv_pct, dol_pct, atrp_pct, step, min_keep):
+    df = frame(1500, seed)
+    narrowing = us.RankNarrowing(df)
+    if step <= 0:
+        # the loop never ends with a zero step unless it is satisfied; give it a reachable target
+        min_keep = len(baseline(df, adv_pct, dol_pct, atrp_pct, 1, 1)[0])
+    want, want_pcts = baseline(df, adv_pct, dol_pct, atrp_pct, step, min_keep)
+    got, got_pcts = narrowing.solve(adv_pct, dol_pct, atrp_pct, step, min_keep)
+    assert got_pcts == want_pcts
+    assert shortlist(got) == shortlist(want)
+
+
+def test_rank_narrowing_memoized_across_solves():
+    df = frame(800, 2)
+    narrowing = us.RankNarrowing(df)
+    for args in [(40, 40, 60, 5, 120), (20, 20, 30, 2, 500), (40, 40, 60, 5, 120)]:
+        got, pcts = narrowing.solve(*args)
+        want, want_pcts = baseline(df, *args)
+        assert pcts == want_pcts
+        assert shortlist(got) == shortlist(want)
+
+
+def test_rank_narrowing_empty_frame():
+    df = frame(0, 3)
+    got, pcts = us.RankNarrowing(df).solve(40, 40, 60, 5, 120)
+    want, want_pcts = baseline(df, 40, 40, 60, 5, 120)
+    assert got.empty and want.empty
+    assert pcts == want_pcts
@@ -0,0 +1,104 @@
+"""SQLite token bucket: refill/acquire on a fake clock, and backoff after a 429"""
+import pytest
+
+from data.providers import polygon_client
+from data.providers import rate_governor as rg
+
+
+class FakeClock:
+    """Stands in for the time module inside rate_governor; sleep() just advances the clock"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, s):
+        self.slept.append(s)
+        self.now += s
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(rg, "time", c)
+    return c
+
+
+def governor(tmp_path, **kw):
+    return rg.RateGovernor(path=str(tmp_path / "quota.sqlite"), **{"rate": 2.0, "burst": 3.0, **kw})
+
+
+def test_burst_then_refill(tmp_path, clock):
+    g = governor(tmp_path)
+    assert [g.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert g.try_acquire() == pytest.approx(0.5)  # 1 token at 2/s
+    clock.now += 0.25
+    assert g.try_acquire() == pytest.approx(0.25)
+    clock.now += 0.25
+    assert g.try_acquire() == 0.0
+    clock.now += 100  # refill is capped at the burst
+    assert [g.try_acquire() for _ in range(4)][-1] == pytest.approx(0.5)
+
+
+def test_acquire_waits_for_a_token(tmp_path, clock):
+    g = governor(tmp_path)
+    for _ in range(3):
+        assert g.acquire()
+    start = clock.now
+    assert g.acquire()
+    assert clock.now - start == pytest.approx(0.5)
+    assert not g.acquire(timeout=0.1)  # the next token is 0.5s away
+
+
+def test_processes_share_one_bucket(tmp_path, clock):
+    a, b = governor(tmp_path), governor(tmp_path)
+    assert a.try_acquire() == 0.0 and b.try_acquire() == 0.0 and a.try_acquire() == 0.0
+    assert b.try_acquire() > 0
+
+
+def test_429_blocks_and_halves_the_rate(tmp_path, clock):
+    g = governor(tmp_path)
+    g.penalize()  # no Retry-After: exponential backoff from 1s
+    assert g.try_acquire() == pytest.approx(1.0)
+    clock.now += 1.0
+    assert g.try_acquire() == 0.0  # the bucket was emptied and refilled one token at 1/s
+    assert g.try_acquire() == pytest.approx(1.0)  # half of the 2/s rate
+
+    g.penalize()
+    assert g.try_acquire() == pytest.approx(2.0)  # backoff doubled
+    g.penalize(retry_after=5)
+    assert g.try_acquire() == pytest.approx(5.0)  # the server's Retry-After wins
+
+    clock.now += 5.0  # rate is now 2/s * 0.125
+    assert g.try_acquire() == 0.0
+    assert g.try_acquire() == pytest.approx(3.0)
+
+    g.success()  # backoff resets; the rate recovers additively
+    g.penalize()
+    assert g.try_acquire() == pytest.approx(1.0)
+
+
+def test_client_backs_off_after_429(tmp_path, clock, monkeypatch):
+    class Response:
+        def __init__(self, status, retry_after=None):
+            self.status_code = status
+            self.headers = {"Retry-After": retry_after} if retry_after else {}
+            self.content = b"{}"
+
+    replies = [Response(429, "3"), Response(200)]
+    sent_at = []
+
+    def get(url, **kw):
+        sent_at.append(clock.now)
+        return replies.pop(0)
+
+    monkeypatch.delenv("POLYGON_MODE", raising=False)
+    client = polygon_client.PolygonClient(max_concurrency=1, governor=governor(tmp_path))
+    monkeypatch.setattr(client.session, "get", get)
+
+    assert client.request("/v2/aggs/grouped/locale/us/market/stocks/2025-06-02").status_code == 200
+    assert sent_at[1] - sent_at[0] == pytest.approx(3.0)  # the retry waited out Retry-After
+    assert rg.retry_after_seconds(Response(429, "abc")) is None
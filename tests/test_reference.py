@@ -0,0 +1,84 @@
+"""Reference snapshot refresh: adds, delists, relists and the per-refresh detail cap"""
+import pandas as pd
+import pytest
+
+from data.providers import alpha_providers
+from data.providers import reference as ref
+
+
+def listing(*tickers):
+    return pd.DataFrame([{"ticker": t, "name": f"{t} Inc", "type": "CS", "primary_exchange": "XNAS",
+                          "locale": "us", "currency_name": "usd", "cik": "1", "market": "stocks"}
+                         for t in tickers], columns=ref.LIST_FIELDS)
+
+
+@pytest.fixture
+def world(tmp_path, monkeypatch):
+    state = {"today": "2025-07-14", "listing": listing(), "detail_calls": []}
+
+    def fetch_details(tickers):
+        state["detail_calls"].append(list(tickers))
+        return {t: {"sector": "Technology", "market_cap": 1e9, "shares_outstanding": 5e7} for t in tickers}
+
+    monkeypatch.setattr(ref, "REF_DIR", tmp_path)
+    monkeypatch.setattr(ref, "SNAPSHOT", tmp_path / "tickers.parquet")
+    monkeypatch.setattr(ref, "META", tmp_path / "tickers_meta.json")
+    monkeypatch.setattr(ref, "DETAIL_MAX", 3)
+    monkeypatch.setattr(ref, "today_iso", lambda: state["today"])
+    monkeypatch.setattr(ref, "_fetch_active_listing", lambda: state["listing"])
+    monkeypatch.setattr(ref, "_fetch_details", fetch_details)
+    monkeypatch.setattr(alpha_providers, "POLYGON", "test-key")
+    return state
+
+
+def rows(df):
+    return {r["ticker"]: r for r in df.to_dict("records")}
+
+
+def test_refresh_diffs_adds_delists_relists(world):
+    world["listing"] = listing("AAA", "BBB", "CCC", "DDD", "EEE")
+    df = ref.refresh_reference()
+    assert sorted(df["ticker"]) == ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    assert df["active"].all() and (df["first_seen"] == "2025-07-14").all()
+    # detail lookups are capped per refresh; the rest are backfilled later
+    assert world["detail_calls"] == [["AAA", "BBB", "CCC"]]
+    assert df["details_asof"].notna().sum() == 3
+    assert ref.read_meta() == {"as_of": "2025-07-14", "count": 5, "adds": 5, "delists": 0, "details_fetched": 3}
+
+    # same day: served from the snapshot, nothing fetched
+    world["listing"] = None
+    assert len(ref.refresh_reference()) == 5 and len(world["detail_calls"]) == 1
+
+    # next day: BBB vanishes, FFF lists; the new name is enriched before the backlog
+    world["today"] = "2025-07-15"
+    world["listing"] = listing("AAA", "CCC", "DDD", "EEE", "FFF")
+    r = rows(ref.refresh_reference())
+    assert not r["BBB"]["active"] and r["BBB"]["delisted_on"] == "2025-07-15"
+    assert r["BBB"]["last_seen"] == "2025-07-14"
+    assert r["FFF"]["active"] and r["FFF"]["first_seen"] == "2025-07-15"
+    assert r["AAA"]["last_seen"] == "2025-07-15" and r["AAA"]["first_seen"] == "2025-07-14"
+    assert world["detail_calls"][-1] == ["FFF", "DDD", "EEE"]
+    assert ref.read_meta()["delists"] == 1 and ref.read_meta()["adds"] == 1
+    assert sorted(ref.load_reference()["ticker"]) == ["AAA", "CCC", "DDD", "EEE", "FFF"]
+
+    # BBB relists: reactivated in place, not appended again, details kept
+    world["today"] = "2025-07-16"
+    world["listing"] = listing("AAA", "BBB", "CCC", "DDD", "EEE", "FFF")
+    df = ref.refresh_reference()
+    r = rows(df)
+    assert (df["ticker"] == "BBB").sum() == 1
+    assert r["BBB"]["active"] and pd.isna(r["BBB"]["delisted_on"])
+    assert r["BBB"]["first_seen"] == "2025-07-14" and r["BBB"]["last_seen"] == "2025-07-16"
+    assert r["BBB"]["details_asof"] == "2025-07-14"
+    assert len(world["detail_calls"]) == 2  # every active name has details now
+    assert ref.read_meta()["adds"] == 0 and ref.read_meta()["delists"] == 0
+
+
+def test_failed_listing_keeps_snapshot(world):
+    world["listing"] = listing("AAA", "BBB")
+    ref.refresh_reference()
+    world["today"] = "2025-07-15"
+    world["listing"] = None
+    df = ref.refresh_reference()
+    assert df["active"].all() and sorted(df["ticker"]) == ["AAA", "BBB"]
+    assert ref.read_meta()["as_of"] == "2025-07-14"
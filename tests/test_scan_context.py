@@ -0,0 +1,68 @@
+"""ScanContext runs each detector once per (signal, symbol) however often scoring asks"""
+import signal
+from collections import Counter
+
+import numpy as np
+
+from data.providers.alpha_providers import MinuteBarsBatch
+
+# The screener installs SIGTERM/SIGINT handlers on import; keep pytest's own
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+ROWS = [
+    {"symbol": "AAA", "price": 11.0, "prev_close": 10.0, "sector": "Technology"},
+    {"symbol": "BBB", "price": 5.0, "prev_close": 4.0, "sector": "Healthcare", "live_price": 6.0},
+    {"symbol": "CCC", "price": 2.0, "prev_close": None, "sector": None},
+]
+
+
+def counting(monkeypatch, calls, name):
+    real = getattr(us, name)
+
+    def wrapper(symbol, *args, **kwargs):
+        calls[(name, symbol)] += 1
+        return real(symbol, *args, **kwargs)
+    monkeypatch.setattr(us, name, wrapper)
+
+
+def test_detectors_run_once_per_signal_and_symbol(monkeypatch):
+    calls = Counter()
+    for name in ("detect_pr_catalyst", "detect_premarket_spark", "detect_options_gex_nudge",
+                 "theme_boost_sector_herd"):
+        counting(monkeypatch, calls, name)
+    drift = Counter()
+    real_drift = us.live_vs_cached_drift_guard
+    monkeypatch.setattr(us, "live_vs_cached_drift_guard",
+                        lambda live, cached: drift.update([(live, cached)]) or real_drift(live, cached))
+    monkeypatch.setattr(us, "short_metrics", lambda symbol: calls.update([("short_metrics", symbol)]) or {})
+
+    v = np.full(40, 100.0)
+    batch = MinuteBarsBatch(["AAA"], np.array([0, 40]), np.arange(40), v, np.full(40, np.nan))
+    ctx = us.ScanContext("v1", batch)
+    ctx.minute(["AAA", "BBB", "CCC"], [1e6, 1e6, 1e6])
+
+    first = [ctx.signals(r) for r in ROWS]
+    ctx.bonuses(ROWS)
+    for r in ROWS:
+        us.score_row(r, ctx.relvol(r["symbol"]), ctx=ctx)
+        ctx.short(r["symbol"])
+        ctx.short(r["symbol"])
+    assert [ctx.signals(r) for r in ROWS] == first
+
+    detectors = ("detect_pr_catalyst", "detect_premarket_spark", "detect_options_gex_nudge",
+                 "theme_boost_sector_herd", "short_metrics")
+    assert calls == Counter({(name, r["symbol"]): 1 for name in detectors for r in ROWS})
+    assert sum(drift.values()) == len(ROWS)
+
+
+def test_new_context_recomputes(monkeypatch):
+    calls = Counter()
+    counting(monkeypatch, calls, "detect_pr_catalyst")
+    for version in ("v1", "v2"):
+        ctx = us.ScanContext(version)
+        ctx.catalyst("AAA")
+        ctx.catalyst("AAA")
+    assert calls == Counter({("detect_pr_catalyst", "AAA"): 2})
@@ -0,0 +1,97 @@
+"""score_frame (column-wise) must score every row exactly as score_row does"""
+import signal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.providers.alpha_providers import MinuteBarsBatch
+
+# The screener installs SIGTERM/SIGINT handlers on import; keep pytest's own
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+# Values per column: missing (None / NaN) plus both sides of every threshold
+VALUES = {
+    "ret_5d": [None, np.nan, 0.0, -0.05, 0.02, 0.021, 0.1, 0.25, 0.3],
+    "ret_21d": [None, np.nan, 0.0, -0.1, 0.08, 0.2, 0.4, 0.5],
+    "atr_pct": [None, np.nan, 0.0, 0.019, 0.02, 0.029, 0.03, 0.08],
+    "avg_dollar": [None, np.nan, 0.0, 19_999_999.0, 20_000_000.0, 49_999_999.0, 50_000_000.0, 1e9],
+    "breakout20": [True, False, None, np.nan],
+    "float": [None, np.nan, 5e6, 20_000_000.0, 20_000_001.0, 1e9],
+    "short_interest_pct": [None, np.nan, 0.0, 14.9, 15.0, 40.0],
+    "borrow_fee_pct": [None, np.nan, 0.0, 29.9, 30.0, 49.9, 50.0, 120.0],
+    "adv": [None, np.nan, 0.0, -1.0, 1e6],
+    "premarket_gap_pct": [None, np.nan, 9.9, 10.0, 25.0],
+    "relvol_pm": [None, np.nan, 1.49, 1.5, 3.0],
+    "recent_news": [None, "", "FDA approval granted", "Quarterly update", "new LICENSING deal", "uplist"],
+    "price": [None, np.nan, 0.0, 1.0, 5.0, 20.0, 99.5],
+    "bid_ask_spread_pct": [None, np.nan, 1.2, 1.21, 2.0, 2.01],
+    "hod_drawdown_pct": [None, np.nan, 19.9, 20.0, 35.0],
+    "drawdown_from_hod": [None, np.nan, 0.19, 0.2, 0.3],
+    "rsi_14": [None, np.nan, 50.0, 75.0, 75.01, 90.0],
+    "ema9_ge_ema20": [True, False, None],
+    "sector": [None, np.nan, "Technology", "Biotechnology"],
+}
+# Multipliers of other columns (NaN = missing): short_shares / adv (days to cover),
+# price / prev_close - 1 (gap), live_price / price (drift), live_vwap / price
+RATIOS = {
+    "short_shares": ("adv", [np.nan, 0.0, 1.9, 2.0, 3.9, 4.0, 10.0]),
+    "prev_close": ("price", [np.nan, 0.0, 1 / 1.1, 1 / 0.9, 1 / 1.05, 1 / 1.2, 1.0]),
+    "live_price": ("price", [np.nan, 0.0, 1.1, 0.9, 1.0, 1.05, 1.2]),
+    "live_vwap": ("price", [np.nan, 0.99, 1.0, 1.01]),
+}
+RELVOL = [np.nan, 0.0, 1.49, 1.5, 1.69, 1.7, 1.99, 2.0, 5.0]
+NON_NUMERIC = ("breakout20", "ema9_ge_ema20", "recent_news", "sector")
+
+
+def synthetic_frame(n=4000, seed=0):
+    """Seeded shortlist mixing the values above, with relvol and a MinuteBarsBatch"""
+    rng = np.random.default_rng(seed)
+    pick = lambda vals: [vals[i] for i in rng.integers(len(vals), size=n)]
+    df = pd.DataFrame({"symbol": [f"SYN{i:05d}" for i in range(n)]})
+    for col, vals in VALUES.items():
+        df[col] = pd.Series(pick(vals), dtype=object)
+    for col, (base, ratios) in RATIOS.items():
+        df[col] = pd.Series([None if b is None or b != b or r != r else b * r
+                             for b, r in zip(df[base], pick(ratios))], dtype=object)
+    relvol = np.array(pick(RELVOL), dtype=float)
+
+    # Minute volumes: none, too few, flat (relvol_pm 1), 3:1 front-loaded (exactly 1.5), all zero, random
+    patterns = [np.empty(0), np.ones(4), np.ones(30), np.r_[np.full(15, 3.0), np.ones(15)], np.zeros(30), None]
+    vols = [p if p is not None else rng.lognormal(8, 1.5, rng.integers(5, 390)) for p in pick(patterns)]
+    offsets = np.concatenate(([0], np.cumsum([len(v) for v in vols])))
+    flat = np.concatenate(vols)
+    batch = MinuteBarsBatch(df["symbol"].tolist(), offsets, np.arange(len(flat)), flat, np.full(len(flat), np.nan))
+    return df, relvol, batch
+
+
+def numeric(df):
+    out = df.copy()
+    for col in list(VALUES) + list(RATIOS):
+        if col not in NON_NUMERIC:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(float)
+    return out
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return synthetic_frame()
+
+
+@pytest.mark.parametrize("variant", ["object", "float64", "live_rsi"])
+def test_score_frame_matches_score_row(frame, variant):
+    df, relvol, batch = frame
+    if variant != "object":
+        df = numeric(df)
+    if variant == "live_rsi":
+        df = df.assign(live_rsi=np.resize([np.nan, 50.0, 75.0, 75.01, 90.0], len(df)))
+
+    expected = np.array([float(us.score_row(r, rv, batch)) for r, rv in zip(df.to_dict("records"), relvol)])
+    _, relvol_pm = us.minute_signals(df["symbol"].tolist(), us._num(df, "adv"), batch)
+    got = us.score_frame(df, relvol, relvol_pm)
+
+    bad = np.nonzero(got != expected)[0]
+    assert not len(bad), f"score_frame disagrees with score_row on {df['symbol'].iloc[bad[:10]].tolist()}"
@@ -0,0 +1,54 @@
+"""Short store: compile the JSON sources, reopen the memory-mapped columns, look symbols up"""
+import json
+
+import numpy as np
+import pytest
+
+from data.providers import short_store as ss
+
+
+@pytest.fixture
+def provider(tmp_path):
+    d = tmp_path / "providers"
+    d.mkdir()
+    (d / "shortinterest.json").write_text(json.dumps({
+        "abcd": {"short_interest_shares": 1_200_000, "short_interest_pct": 31.5, "days_to_cover": 4.2},
+        "EFGH": {"short_interest_pct": 8.0, "days_to_cover": "n/a"},
+    }))
+    (d / "borrow.json").write_text(json.dumps({"ABCD": {"borrow_fee_pct": 55.0, "utilization_pct": 97.0}}))
+    (d / "finra_shortvol_20250101.json").write_text(json.dumps({"ABCD": {"svr_5d": 0.1}}))
+    (d / "finra_shortvol_20250102.json").write_text(json.dumps({"ABCD": {"svr_5d": 0.6}}))
+    return d
+
+
+def test_round_trip(provider, tmp_path, monkeypatch):
+    store_dir = tmp_path / "store"
+    first = ss.ShortStore(provider_dir=provider, store_dir=store_dir)
+    row = first.row("ABCD")
+    assert {p.name for p in store_dir.iterdir()} == {"symbols.npy", "values.npy", "meta.json"}
+
+    # a fresh instance (another process) maps the compiled columns instead of rebuilding them
+    monkeypatch.setattr(ss.ShortStore, "_build", lambda *a: pytest.fail("store rebuilt although sources did not change"))
+    store = ss.ShortStore(provider_dir=provider, store_dir=store_dir)
+    assert store.row("abcd") == row
+    assert isinstance(store.values, np.memmap)
+
+    assert row["short_interest_pct"] == 31.5 and row["short_interest_shares"] == 1_200_000
+    assert row["borrow_fee_pct"] == 55.0 and row["utilization_pct"] == 97.0
+    assert row["svr_5d"] == 0.6  # latest FINRA file only
+    assert row["borrow_fee_trend_pp7d"] is None
+    assert store.row("EFGH")["days_to_cover"] is None  # non-numeric values are dropped
+
+    assert store.row("ZZZZ") is None
+    assert store.row(None) is None
+    got = store.column("short_interest_pct", ["EFGH", "ZZZZ", "abcd"])
+    np.testing.assert_array_equal(got, [8.0, np.nan, 31.5])
+
+
+def test_changed_source_is_recompiled(provider, tmp_path):
+    store_dir = tmp_path / "store"
+    assert ss.ShortStore(provider_dir=provider, store_dir=store_dir).row("NEWS") is None
+    (provider / "shortinterest.json").write_text(json.dumps({"NEWS": {"short_interest_pct": 12.5}}))
+    store = ss.ShortStore(provider_dir=provider, store_dir=store_dir)
+    assert store.row("NEWS")["short_interest_pct"] == 12.5
+    assert store.row("EFGH") is None
@@ -0,0 +1,48 @@
+"""Reference/short-store fields the builder attaches, and how the screener emits them"""
+import json
+import signal
+
+import numpy as np
+import pandas as pd
+
+from data.providers.short_store import ShortStore
+import scripts.build_universe_v2 as build
+
+_handlers = {s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT)}
+from agents import universe_screener as us
+for _sig, _h in _handlers.items():
+    signal.signal(_sig, _h)
+
+
+def attach(monkeypatch, tmp_path):
+    provider = tmp_path / "providers"
+    provider.mkdir()
+    (provider / "shortinterest.json").write_text(json.dumps({"LOWS": {"short_interest_pct": 25.0}}))
+    store = ShortStore(provider_dir=provider, store_dir=tmp_path / "store")
+    ref = pd.DataFrame({"ticker": ["LOWS", "BIG"], "sector": ["Biotechnology", None],
+                        "shares_outstanding": [12_000_000.0, 900_000_000.0]})
+    monkeypatch.setattr(build, "load_reference", lambda active_only=True: ref)
+    monkeypatch.setattr(build, "get_short_store", lambda: store)
+    return build.attach_static_fields(pd.DataFrame({"symbol": ["LOWS", "BIG", "NOREF"], "price": [5.0, 5.0, 5.0]}))
+
+
+def test_shares_outstanding_is_not_float(monkeypatch, tmp_path):
+    fdf = attach(monkeypatch, tmp_path)
+    assert fdf["shares_outstanding"].tolist()[:2] == [12_000_000.0, 900_000_000.0]
+    assert np.isnan(fdf["shares_outstanding"].iloc[2])
+    assert fdf["float"].isna().all()
+
+    # 12M shares outstanding must not earn the low-float (<= 20M) squeeze bonus
+    row = fdf.iloc[0].to_dict()
+    assert us.score_row(row) == us.score_row({**row, "shares_outstanding": np.nan})
+    assert us.indicator_fields(row, 0.0)["float"] == 0
+
+
+def test_short_interest_pct_stays_in_percent(monkeypatch, tmp_path):
+    fdf = attach(monkeypatch, tmp_path)
+    assert fdf["short_interest_pct"].iloc[0] == 25.0
+    assert np.isnan(fdf["short_interest_pct"].iloc[1])
+
+    rows = fdf.to_dict("records")
+    assert us.indicator_fields(rows[0], 0.0)["short_interest_pct"] == 25.0
+    assert us.indicator_fields(rows[1], 0.0)["short_interest_pct"] == 0